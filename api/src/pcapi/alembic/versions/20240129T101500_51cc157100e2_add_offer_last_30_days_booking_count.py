@@ -0,0 +1,92 @@
+"""Add offer_last_30_days_booking_count table, maintained by a trigger on booking
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from pcapi import settings
+
+
+# pre/post deployment: pre
+# revision identifiers, used by Alembic.
+revision = "51cc157100e2"
+down_revision = "d3bd3af52558"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "offer_last_30_days_booking_count",
+        sa.Column("offerId", sa.BigInteger(), nullable=False),
+        sa.Column("bookingCount", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["offerId"], ["offer.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("offerId"),
+    )
+    op.execute(
+        """
+    CREATE OR REPLACE FUNCTION update_offer_last_30_days_booking_count()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        booking_count_delta integer := 0;
+    BEGIN
+        IF NEW."dateCreated" < (NOW() AT TIME ZONE 'UTC') - INTERVAL '30 days' THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP = 'INSERT' THEN
+            IF NEW.status != 'CANCELLED' THEN
+                booking_count_delta := 1;
+            END IF;
+        ELSIF OLD.status = 'CANCELLED' AND NEW.status != 'CANCELLED' THEN
+            booking_count_delta := 1;
+        ELSIF OLD.status != 'CANCELLED' AND NEW.status = 'CANCELLED' THEN
+            booking_count_delta := -1;
+        END IF;
+        IF booking_count_delta != 0 THEN
+            INSERT INTO offer_last_30_days_booking_count ("offerId", "bookingCount")
+            SELECT stock."offerId", GREATEST(booking_count_delta, 0) FROM stock WHERE stock.id = NEW."stockId"
+            ON CONFLICT ("offerId") DO UPDATE
+            SET "bookingCount" = GREATEST(offer_last_30_days_booking_count."bookingCount" + booking_count_delta, 0);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS booking_update_offer_last_30_days_booking_count ON booking;
+    CREATE TRIGGER booking_update_offer_last_30_days_booking_count
+    AFTER INSERT OR UPDATE OF status ON booking
+    FOR EACH ROW
+    EXECUTE PROCEDURE update_offer_last_30_days_booking_count()
+    """
+    )
+
+    # Backfill the table outside of the transaction that created the
+    # trigger, so that bookings are not blocked while it runs. Bookings
+    # made in the meantime may be missed: this is fixed by the next run
+    # of the `refresh_offers_last_30_days_booking_count` cron job.
+    op.execute("COMMIT")
+    op.execute("""SET SESSION statement_timeout = '300s'""")
+    op.execute(
+        """
+    INSERT INTO offer_last_30_days_booking_count ("offerId", "bookingCount")
+    SELECT stock."offerId", count(*)
+    FROM booking
+    JOIN stock ON stock.id = booking."stockId"
+    WHERE booking."dateCreated" >= (NOW() AT TIME ZONE 'UTC') - INTERVAL '30 days'
+    AND booking.status != 'CANCELLED'
+    GROUP BY stock."offerId"
+    ON CONFLICT ("offerId") DO UPDATE
+    SET "bookingCount" = EXCLUDED."bookingCount"
+    """
+    )
+    op.execute(
+        f"""
+            SET SESSION statement_timeout={settings.DATABASE_STATEMENT_TIMEOUT}
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS booking_update_offer_last_30_days_booking_count ON booking")
+    op.execute("DROP FUNCTION IF EXISTS update_offer_last_30_days_booking_count")
+    op.drop_table("offer_last_30_days_booking_count")
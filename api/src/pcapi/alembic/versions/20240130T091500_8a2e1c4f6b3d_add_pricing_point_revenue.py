@@ -0,0 +1,120 @@
+"""Add pricing_point_revenue table, maintained by triggers on pricing and booking
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# pre/post deployment: pre
+# revision identifiers, used by Alembic.
+revision = "8a2e1c4f6b3d"
+down_revision = "51cc157100e2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pricing_point_revenue",
+        sa.Column("pricingPointId", sa.BigInteger(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.BigInteger(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["pricingPointId"], ["venue.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("pricingPointId", "year"),
+    )
+    op.execute(
+        """
+    CREATE OR REPLACE FUNCTION add_to_pricing_point_revenue(
+        pricing_point_id bigint, value_date timestamp, revenue_delta bigint
+    )
+    RETURNS void AS $$
+    BEGIN
+        IF revenue_delta IS NULL OR revenue_delta = 0 THEN
+            RETURN;
+        END IF;
+        INSERT INTO pricing_point_revenue ("pricingPointId", year, revenue)
+        VALUES (
+            pricing_point_id,
+            EXTRACT(YEAR FROM (value_date AT TIME ZONE 'UTC') AT TIME ZONE 'Europe/Paris'),
+            revenue_delta
+        )
+        ON CONFLICT ("pricingPointId", year) DO UPDATE
+        SET revenue = pricing_point_revenue.revenue + revenue_delta;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION update_pricing_point_revenue()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            IF OLD."bookingId" IS NOT NULL AND OLD.status NOT IN ('cancelled', 'rejected') THEN
+                PERFORM add_to_pricing_point_revenue(
+                    OLD."pricingPointId", OLD."valueDate", -(booking.amount * booking.quantity * 100)::bigint
+                )
+                FROM booking WHERE booking.id = OLD."bookingId";
+            END IF;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            IF NEW."bookingId" IS NOT NULL AND NEW.status NOT IN ('cancelled', 'rejected') THEN
+                PERFORM add_to_pricing_point_revenue(
+                    NEW."pricingPointId", NEW."valueDate", (booking.amount * booking.quantity * 100)::bigint
+                )
+                FROM booking WHERE booking.id = NEW."bookingId";
+            END IF;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS pricing_insert_or_delete_update_pricing_point_revenue ON pricing;
+    CREATE TRIGGER pricing_insert_or_delete_update_pricing_point_revenue
+    AFTER INSERT OR DELETE ON pricing
+    FOR EACH ROW
+    EXECUTE PROCEDURE update_pricing_point_revenue();
+
+    DROP TRIGGER IF EXISTS pricing_update_update_pricing_point_revenue ON pricing;
+    CREATE TRIGGER pricing_update_update_pricing_point_revenue
+    AFTER UPDATE OF status, "bookingId", "pricingPointId", "valueDate" ON pricing
+    FOR EACH ROW
+    WHEN (
+        (OLD.status IN ('cancelled', 'rejected')) IS DISTINCT FROM (NEW.status IN ('cancelled', 'rejected'))
+        OR OLD."bookingId" IS DISTINCT FROM NEW."bookingId"
+        OR OLD."pricingPointId" IS DISTINCT FROM NEW."pricingPointId"
+        OR OLD."valueDate" IS DISTINCT FROM NEW."valueDate"
+    )
+    EXECUTE PROCEDURE update_pricing_point_revenue();
+
+    -- The price of bookings that have already been priced may be
+    -- changed (see `offers.api.update_used_stock_price()`).
+    CREATE OR REPLACE FUNCTION update_pricing_point_revenue_on_booking_amount()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        PERFORM add_to_pricing_point_revenue(
+            pricing."pricingPointId",
+            pricing."valueDate",
+            ((NEW.amount * NEW.quantity - OLD.amount * OLD.quantity) * 100)::bigint
+        )
+        FROM pricing
+        WHERE pricing."bookingId" = NEW.id AND pricing.status NOT IN ('cancelled', 'rejected');
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS booking_amount_update_pricing_point_revenue ON booking;
+    CREATE TRIGGER booking_amount_update_pricing_point_revenue
+    AFTER UPDATE OF amount, quantity ON booking
+    FOR EACH ROW
+    WHEN (OLD.amount IS DISTINCT FROM NEW.amount OR OLD.quantity IS DISTINCT FROM NEW.quantity)
+    EXECUTE PROCEDURE update_pricing_point_revenue_on_booking_amount()
+    """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS booking_amount_update_pricing_point_revenue ON booking")
+    op.execute("DROP TRIGGER IF EXISTS pricing_update_update_pricing_point_revenue ON pricing")
+    op.execute("DROP TRIGGER IF EXISTS pricing_insert_or_delete_update_pricing_point_revenue ON pricing")
+    op.execute("DROP FUNCTION IF EXISTS update_pricing_point_revenue_on_booking_amount")
+    op.execute("DROP FUNCTION IF EXISTS update_pricing_point_revenue")
+    op.execute("DROP FUNCTION IF EXISTS add_to_pricing_point_revenue")
+    op.drop_table("pricing_point_revenue")
@@ -21,6 +21,7 @@ from pcapi.utils.decorators import retry
 
 logger = logging.getLogger(__name__)
 ATTEMPTS_LIMIT = 2
+SHARED_SESSION_NAME = "boost"
 
 
 def invalid_token_handler(
@@ -72,7 +73,12 @@ def login(cinema_details: BoostCinemaDetails, ignore_device: bool = True) -> str
     url = cinema_details.cinemaUrl + LOGIN_ENDPOINT
     request_date = datetime.datetime.utcnow()
     try:
-        response = requests.post(url=url, json=auth_payload, params={"ignore_device": ignore_device})
+        response = requests.post(
+            url=url,
+            json=auth_payload,
+            params={"ignore_device": ignore_device},
+            shared_session=SHARED_SESSION_NAME,
+        )
     except requests.exceptions.RequestException as exc:
         logger.exception("Network error on Boost API", extra={"exc": exc, "url": url})
         raise BoostAPIException(f"Network error on Boost API: {url}") from exc
@@ -138,7 +144,10 @@ def _perform_get_resource(
     """
     token = get_token(cinema_details)
     response = requests.get(
-        url=build_url(cinema_details.cinemaUrl, resource, pattern_values), headers=headers(token), params=params
+        url=build_url(cinema_details.cinemaUrl, resource, pattern_values),
+        headers=headers(token),
+        params=params,
+        shared_session=SHARED_SESSION_NAME,
     )
     _check_response_is_ok(response, token, f"GET {resource}")
     return response.json()
@@ -164,7 +173,10 @@ def _perform_put_resource(
     """
     token = get_token(cinema_details)
     response = requests.put(
-        url=build_url(cinema_details.cinemaUrl, resource), headers=headers(token), data=body.json(by_alias=True)
+        url=build_url(cinema_details.cinemaUrl, resource),
+        headers=headers(token),
+        data=body.json(by_alias=True),
+        shared_session=SHARED_SESSION_NAME,
     )
     _check_response_is_ok(response, token, f"PUT {resource}")
     response_headers = response.headers.get("Content-Type")
@@ -191,7 +203,10 @@ def _perform_post_resource(
 ) -> dict | list[dict] | list | None:
     token = get_token(cinema_details)
     response = requests.post(
-        url=build_url(cinema_details.cinemaUrl, resource), headers=headers(token), data=body.json(by_alias=True)
+        url=build_url(cinema_details.cinemaUrl, resource),
+        headers=headers(token),
+        data=body.json(by_alias=True),
+        shared_session=SHARED_SESSION_NAME,
     )
     _check_response_is_ok(response, token, f"POST {resource}")
     response_headers = response.headers.get("Content-Type")
@@ -16,11 +16,15 @@ from pcapi.utils.crypto import decrypt
 
 logger = logging.getLogger(__name__)
 
+SHARED_SESSION_NAME = "cgr"
+
 
 def get_cgr_service_proxy(cinema_url: str) -> ServiceProxy:
     # https://docs.python-zeep.org/en/master/transport.html#caching
     cache = InMemoryCache()
-    transport = requests.CustomZeepTransport(cache=cache, timeout=10, operation_timeout=10)
+    transport = requests.CustomZeepTransport(
+        cache=cache, timeout=10, operation_timeout=10, session=requests.get_shared_session(SHARED_SESSION_NAME)
+    )
     client = Client(wsdl=f"{cinema_url}?wsdl", transport=transport)
     service = client.create_service(binding_name="{urn:GestionCinemaWS}GestionCinemaWSSOAPBinding", address=cinema_url)
     return service
@@ -6,6 +6,9 @@ from pcapi.routes.serialization import BaseModel
 from pcapi.utils import requests
 
 
+SHARED_SESSION_NAME = "cds"
+
+
 class ResourceCDS(enum.Enum):
     CINEMAS = "cinemas"
     TARIFFS = "tariffs"
@@ -48,7 +51,7 @@ def get_resource(
     path_params: dict[str, Any] | None = None,
 ) -> dict | list[dict] | list:
     url = _build_url(api_url, account_id, cinema_api_token, resource, path_params)
-    response = requests.get(url)
+    response = requests.get(url, shared_session=SHARED_SESSION_NAME)
 
     _check_response_is_ok(response, cinema_api_token, f"GET {resource}")
 
@@ -60,7 +63,7 @@ def put_resource(
 ) -> dict | list[dict] | list | None:
     url = _build_url(api_url, account_id, cinema_api_token, resource)
     headers = {"Content-Type": "application/json"}
-    response = requests.put(url, headers=headers, data=body.json(by_alias=True))
+    response = requests.put(url, headers=headers, data=body.json(by_alias=True), shared_session=SHARED_SESSION_NAME)
 
     _check_response_is_ok(response, cinema_api_token, f"PUT {resource}")
 
@@ -75,7 +78,7 @@ def post_resource(
 ) -> dict:
     url = _build_url(api_url, account_id, cinema_api_token, resource)
     headers = {"Content-Type": "application/json"}
-    response = requests.post(url, headers=headers, data=body.json(by_alias=True))
+    response = requests.post(url, headers=headers, data=body.json(by_alias=True), shared_session=SHARED_SESSION_NAME)
 
     _check_response_is_ok(response, cinema_api_token, f"POST {resource}")
 
@@ -16,6 +16,9 @@ from pcapi.core.external_bookings.exceptions import ExternalBookingSoldOutError
 from pcapi.utils import requests
 
 
+SHARED_SESSION_NAME = "ems"
+
+
 class EMSAPIException(Exception):
     pass
 
@@ -104,7 +107,7 @@ class EMSBookingConnector:
 
         headers = self._build_headers()
         url = self._build_url(endpoint, payload)
-        return requests.post(url, headers=headers, json=payload)
+        return requests.post(url, headers=headers, json=payload, shared_session=SHARED_SESSION_NAME)
 
     def raise_for_status(self, response: Response) -> None:
         response.raise_for_status()
@@ -21,6 +21,7 @@ proper backend is chosen depending on the environment (see
 """
 
 from io import BytesIO
+import os
 import pathlib
 
 import googleapiclient.discovery
@@ -31,6 +32,13 @@ from pcapi import settings
 from pcapi.utils.module_loading import import_string
 
 
+# Files that are larger than this size are uploaded in chunks of this
+# size, through a resumable upload. It must be a multiple of 256 KB.
+UPLOAD_CHUNK_SIZE = 10 * 1024 * 1024
+# Number of retries of each request of a resumable upload.
+UPLOAD_NUM_RETRIES = 5
+
+
 def get_backend() -> "BaseBackend":
     backend_class = import_string(settings.GOOGLE_DRIVE_BACKEND)
     return backend_class()
@@ -124,16 +132,24 @@ class GoogleDriveBackend(BaseBackend):
 
     def create_file(self, parent_folder_id: str, name: str, local_path: pathlib.Path) -> str:
         """Create a new file and return its id."""
+        resumable = os.path.getsize(local_path) > UPLOAD_CHUNK_SIZE
         request = self.service.files().create(
             body={
                 "parents": [parent_folder_id],
                 "name": name,
             },
-            media_body=MediaFileUpload(filename=str(local_path)),
+            media_body=MediaFileUpload(filename=str(local_path), chunksize=UPLOAD_CHUNK_SIZE, resumable=resumable),
             fields="id",  # yes, it's a string, not a list
             supportsAllDrives=True,
         )
-        response = request.execute()
+        if not resumable:
+            response = request.execute()
+        else:
+            # Upload the file chunk by chunk: the whole file is never
+            # loaded in memory, and a failing chunk is retried alone.
+            response = None
+            while response is None:
+                _status, response = request.next_chunk(num_retries=UPLOAD_NUM_RETRIES)
         return response["id"]
 
     def download_file(self, file_id: str, content_type: str | None = None) -> BytesIO:
@@ -15,14 +15,26 @@ def create_thumb(
     ratio: ImageRatio = ImageRatio.PORTRAIT,
     keep_ratio: bool = False,
 ) -> None:
-    if keep_ratio:
-        image_as_bytes = process_original_image(image_as_bytes)
-    else:
-        image_as_bytes = standardize_image(image_as_bytes, ratio=ratio, crop_params=crop_params)
+    image_as_bytes = process_thumb(image_as_bytes, crop_params=crop_params, ratio=ratio, keep_ratio=keep_ratio)
     model_with_thumb.thumbCount += 1
+    store_thumb(model_with_thumb.get_thumb_storage_id(storage_id_suffix_str), image_as_bytes)
+
+
+def process_thumb(
+    image_as_bytes: bytes,
+    crop_params: CropParams | None = None,
+    ratio: ImageRatio = ImageRatio.PORTRAIT,
+    keep_ratio: bool = False,
+) -> bytes:
+    if keep_ratio:
+        return process_original_image(image_as_bytes)
+    return standardize_image(image_as_bytes, ratio=ratio, crop_params=crop_params)
+
+
+def store_thumb(storage_id: str, image_as_bytes: bytes) -> None:
     object_storage.store_public_object(
         folder=settings.THUMBS_FOLDER_NAME,
-        object_id=model_with_thumb.get_thumb_storage_id(storage_id_suffix_str),
+        object_id=storage_id,
         blob=image_as_bytes,
         content_type="image/jpeg",
     )
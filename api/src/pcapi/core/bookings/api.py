@@ -412,8 +412,14 @@ def _cancel_booking(
     reason: BookingCancellationReasons,
     cancel_even_if_used: bool = False,
     raise_if_error: bool = False,
+    update_external_data: bool = True,
 ) -> bool:
-    """Cancel booking and update a user's credit information on Batch"""
+    """Cancel booking and update a user's credit information on Batch
+
+    If `update_external_data` is False, the caller must update external
+    data and reindex the offer itself (see
+    `_update_external_data_of_cancelled_bookings()`).
+    """
     try:
         if not _execute_cancel_booking(booking, reason, cancel_even_if_used, raise_if_error):
             return False
@@ -440,13 +446,23 @@ def _cancel_booking(
     amplitude_events.track_cancel_booking_event(booking, reason)
     _send_external_booking_notification_if_necessary(booking, BookingAction.CANCEL)
 
-    update_external_user(booking.user)
-    update_external_pro(booking.venue.bookingEmail)
+    if update_external_data:
+        _update_external_data_of_cancelled_bookings([booking])
+    return True
+
+
+def _update_external_data_of_cancelled_bookings(bookings: list[Booking]) -> None:
+    """Update external data of the users and venues of cancelled
+    bookings, and reindex their offers, once for each of them.
+    """
+    for user in dict.fromkeys(booking.user for booking in bookings):
+        update_external_user(user)
+    for booking_email in dict.fromkeys(booking.venue.bookingEmail for booking in bookings):
+        update_external_pro(booking_email)
     search.async_index_offer_ids(
-        [booking.stock.offerId],
+        list(dict.fromkeys(booking.stock.offerId for booking in bookings)),
         reason=search.IndexationReason.BOOKING_CANCELLATION,
     )
-    return True
 
 
 def _execute_cancel_booking(
@@ -617,6 +633,49 @@ def cancel_bookings_from_rejected_offer(offer: offers_models.Offer) -> list[Book
     return cancelled_bookings
 
 
+def cancel_bookings_from_rejected_offers(offer_ids: list[int]) -> list[Booking]:
+    """Cancel the bookings of several rejected offers.
+
+    Bookings are loaded with a single query. Each booking is still
+    cancelled in its own transaction, as cancellation may need to call
+    external ticketing systems and to update finance events. External
+    data of users and venues is then updated, and offers are
+    reindexed, once for all bookings.
+    """
+    bookings = (
+        Booking.query.join(Booking.stock)
+        .filter(Stock.offerId.in_(offer_ids), Booking.status != BookingStatus.CANCELLED)
+        .options(
+            sa.orm.contains_eager(Booking.stock).joinedload(Stock.offer),
+            joinedload(Booking.user),
+            joinedload(Booking.venue),
+            joinedload(Booking.externalBookings),
+        )
+        .order_by(Booking.id)
+        .all()
+    )
+    cancelled_bookings = [
+        booking
+        for booking in bookings
+        if _cancel_booking(
+            booking,
+            BookingCancellationReasons.FRAUD,
+            cancel_even_if_used=typing.cast(bool, booking.stock.offer.isEvent),
+            update_external_data=False,
+        )
+    ]
+    if cancelled_bookings:
+        _update_external_data_of_cancelled_bookings(cancelled_bookings)
+    logger.info(
+        "Cancelled bookings for rejected offers",
+        extra={
+            "bookings": [b.id for b in cancelled_bookings],
+            "offers": offer_ids,
+        },
+    )
+    return cancelled_bookings
+
+
 def cancel_booking_for_fraud(booking: Booking) -> None:
     validation.check_booking_can_be_cancelled(booking)
     cancelled = _cancel_booking(booking, BookingCancellationReasons.FRAUD)
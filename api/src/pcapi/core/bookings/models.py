@@ -469,3 +469,40 @@ Booking.trig_update_cancellationDate_on_isCancelled_ddl = f"""
     """
 
 event.listen(Booking.__table__, "after_create", DDL(Booking.trig_update_cancellationDate_on_isCancelled_ddl))
+
+Booking.trig_update_offer_booking_count_ddl = f"""
+    CREATE OR REPLACE FUNCTION update_offer_last_30_days_booking_count()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        booking_count_delta integer := 0;
+    BEGIN
+        IF NEW."dateCreated" < (NOW() AT TIME ZONE 'UTC') - INTERVAL '30 days' THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP = 'INSERT' THEN
+            IF NEW.status != '{BookingStatus.CANCELLED.value}' THEN
+                booking_count_delta := 1;
+            END IF;
+        ELSIF OLD.status = '{BookingStatus.CANCELLED.value}' AND NEW.status != '{BookingStatus.CANCELLED.value}' THEN
+            booking_count_delta := 1;
+        ELSIF OLD.status != '{BookingStatus.CANCELLED.value}' AND NEW.status = '{BookingStatus.CANCELLED.value}' THEN
+            booking_count_delta := -1;
+        END IF;
+        IF booking_count_delta != 0 THEN
+            INSERT INTO offer_last_30_days_booking_count ("offerId", "bookingCount")
+            SELECT stock."offerId", GREATEST(booking_count_delta, 0) FROM stock WHERE stock.id = NEW."stockId"
+            ON CONFLICT ("offerId") DO UPDATE
+            SET "bookingCount" = GREATEST(offer_last_30_days_booking_count."bookingCount" + booking_count_delta, 0);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS booking_update_offer_last_30_days_booking_count ON booking;
+    CREATE TRIGGER booking_update_offer_last_30_days_booking_count
+    AFTER INSERT OR UPDATE OF status ON booking
+    FOR EACH ROW
+    EXECUTE PROCEDURE update_offer_last_30_days_booking_count()
+    """
+
+event.listen(Booking.__table__, "after_create", DDL(Booking.trig_update_offer_booking_count_ddl))
@@ -1,3 +1,4 @@
+import codecs
 import csv
 from datetime import date
 from datetime import datetime
@@ -7,6 +8,7 @@ from io import BytesIO
 from io import StringIO
 import math
 from operator import and_
+import tempfile
 import typing
 from typing import Iterable
 
@@ -34,6 +36,7 @@ from pcapi.core.bookings.models import BookingStatusFilter
 from pcapi.core.bookings.models import ExternalBooking
 from pcapi.core.bookings.utils import _apply_departement_timezone
 from pcapi.core.bookings.utils import convert_booking_dates_utc_to_venue_timezone
+from pcapi.core.bookings.utils import get_booking_venue_departement_code
 from pcapi.core.categories import subcategories_v2 as subcategories
 from pcapi.core.educational import models as educational_models
 from pcapi.core.offerers.models import Offerer
@@ -53,6 +56,8 @@ from pcapi.utils.token import random_token
 
 
 DUO_QUANTITY = 2
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FILE_CHUNK_SIZE = 64 * 1024
 
 
 BOOKING_STATUS_LABELS = {
@@ -337,6 +342,42 @@ def get_export(
     offer_type: OfferType | None = None,
     export_type: BookingExportType | None = BookingExportType.CSV,
 ) -> str | bytes:
+    bookings_query = _get_export_query(user, booking_period, status_filter, event_date, venue_id, offer_id, offer_type)
+    if export_type == BookingExportType.EXCEL:
+        return _serialize_excel_report(bookings_query)
+    return _serialize_csv_report(bookings_query)
+
+
+def stream_export(
+    user: User,
+    booking_period: tuple[date, date] | None = None,
+    status_filter: BookingStatusFilter | None = BookingStatusFilter.BOOKED,
+    event_date: date | None = None,
+    venue_id: int | None = None,
+    offer_id: int | None = None,
+    offer_type: OfferType | None = None,
+    export_type: BookingExportType | None = BookingExportType.CSV,
+) -> typing.Iterator[bytes]:
+    """Same as `get_export()`, but yield the file in chunks, so that it
+    can be sent in a streamed response without being held in memory.
+
+    The CSV file is encoded in UTF-8 with a BOM (for Excel).
+    """
+    bookings_query = _get_export_query(user, booking_period, status_filter, event_date, venue_id, offer_id, offer_type)
+    if export_type == BookingExportType.EXCEL:
+        return _stream_excel_report(bookings_query)
+    return _stream_csv_report(bookings_query)
+
+
+def _get_export_query(
+    user: User,
+    booking_period: tuple[date, date] | None,
+    status_filter: BookingStatusFilter | None,
+    event_date: date | None,
+    venue_id: int | None,
+    offer_id: int | None,
+    offer_type: OfferType | None,
+) -> BaseQuery:
     bookings_query = _get_filtered_booking_report(
         pro_user=user,
         period=booking_period,
@@ -346,10 +387,7 @@ def get_export(
         offer_id=offer_id,
         offer_type=offer_type,
     )
-    bookings_query = _duplicate_booking_when_quantity_is_two(bookings_query)
-    if export_type == BookingExportType.EXCEL:
-        return _serialize_excel_report(bookings_query)
-    return _serialize_csv_report(bookings_query)
+    return _duplicate_booking_when_quantity_is_two(bookings_query)
 
 
 # FIXME (Gautier, 03-25-2022): also used in collective_booking. SHould we move it to core or some other place?
@@ -603,45 +641,69 @@ def _get_booking_status(status: BookingStatus, is_confirmed: bool) -> str:
     return BOOKING_STATUS_LABELS[status]
 
 
-def _serialize_csv_report(query: BaseQuery) -> str:
+def _get_csv_report_row(booking: Booking) -> tuple:
+    departement_code = get_booking_venue_departement_code(booking)
+    return (
+        booking.venueName,
+        booking.offerName,
+        _apply_departement_timezone(booking.stockBeginningDatetime, departement_code),
+        booking.ean,
+        f"{booking.beneficiaryLastName} {booking.beneficiaryFirstName}",
+        booking.beneficiaryEmail,
+        booking.beneficiaryPhoneNumber,
+        _apply_departement_timezone(booking.bookedAt, departement_code),
+        _apply_departement_timezone(booking.usedAt, departement_code),
+        booking_recap_utils.get_booking_token(
+            booking.token,
+            booking.status,
+            booking.isExternal,
+            booking.stockBeginningDatetime,
+        ),
+        booking.priceCategoryLabel or "",
+        booking.amount,
+        _get_booking_status(booking.status, booking.isConfirmed),
+        _apply_departement_timezone(booking.reimbursedAt, departement_code),
+        # This method is still used in the old Payment model
+        serialize_offer_type_educational_or_individual(offer_is_educational=False),
+        booking.beneficiaryPostalCode or "",
+        "Oui" if booking.quantity == DUO_QUANTITY else "Non",
+    )
+
+
+def _iter_csv_report(query: BaseQuery) -> typing.Iterator[str]:
+    """Yield the CSV report by chunks of `EXPORT_BATCH_SIZE` rows.
+
+    The first chunk is only yielded once the first batch has been
+    fetched, so that the query is run before anything is sent.
+    """
     output = StringIO()
     writer = csv.writer(output, dialect=csv.excel, delimiter=";", quoting=csv.QUOTE_NONNUMERIC)
     writer.writerow(BOOKING_EXPORT_HEADER)
-    for booking in query.yield_per(1000):
-        writer.writerow(
-            (
-                booking.venueName,
-                booking.offerName,
-                convert_booking_dates_utc_to_venue_timezone(booking.stockBeginningDatetime, booking),
-                booking.ean,
-                f"{booking.beneficiaryLastName} {booking.beneficiaryFirstName}",
-                booking.beneficiaryEmail,
-                booking.beneficiaryPhoneNumber,
-                convert_booking_dates_utc_to_venue_timezone(booking.bookedAt, booking),
-                convert_booking_dates_utc_to_venue_timezone(booking.usedAt, booking),
-                booking_recap_utils.get_booking_token(
-                    booking.token,
-                    booking.status,
-                    booking.isExternal,
-                    booking.stockBeginningDatetime,
-                ),
-                booking.priceCategoryLabel or "",
-                booking.amount,
-                _get_booking_status(booking.status, booking.isConfirmed),
-                convert_booking_dates_utc_to_venue_timezone(booking.reimbursedAt, booking),
-                # This method is still used in the old Payment model
-                serialize_offer_type_educational_or_individual(offer_is_educational=False),
-                booking.beneficiaryPostalCode or "",
-                "Oui" if booking.quantity == DUO_QUANTITY else "Non",
-            )
-        )
+    for index, booking in enumerate(query.yield_per(EXPORT_BATCH_SIZE), 1):
+        writer.writerow(_get_csv_report_row(booking))
+        if index % EXPORT_BATCH_SIZE == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    if output.tell():
+        yield output.getvalue()
 
-    return output.getvalue()
 
+def _serialize_csv_report(query: BaseQuery) -> str:
+    return "".join(_iter_csv_report(query))
+
+
+def _stream_csv_report(query: BaseQuery) -> typing.Iterator[bytes]:
+    chunks = _iter_csv_report(query)
+    yield codecs.BOM_UTF8 + next(chunks).encode("utf-8")
+    for chunk in chunks:
+        yield chunk.encode("utf-8")
 
-def _serialize_excel_report(query: BaseQuery) -> bytes:
-    output = BytesIO()
-    workbook = xlsxwriter.Workbook(output)
+
+def _write_excel_report(query: BaseQuery, output: typing.BinaryIO) -> None:
+    # In `constant_memory` mode, rows are flushed to a temporary file
+    # as soon as the next row is written: they must be written in order.
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
 
     bold = workbook.add_format({"bold": 1})
     currency_format = workbook.add_format({"num_format": "###0.00[$€-fr-FR]"})
@@ -654,18 +716,17 @@ def _serialize_excel_report(query: BaseQuery) -> bytes:
         worksheet.write(row, col_num, title, bold)
         worksheet.set_column(col_num, col_num, col_width)
     row = 1
-    for booking in query.yield_per(1000):
+    for booking in query.yield_per(EXPORT_BATCH_SIZE):
+        departement_code = get_booking_venue_departement_code(booking)
         worksheet.write(row, 0, booking.venueName)
         worksheet.write(row, 1, booking.offerName)
-        worksheet.write(
-            row, 2, str(convert_booking_dates_utc_to_venue_timezone(booking.stockBeginningDatetime, booking))
-        )
+        worksheet.write(row, 2, str(_apply_departement_timezone(booking.stockBeginningDatetime, departement_code)))
         worksheet.write(row, 3, booking.ean)
         worksheet.write(row, 4, f"{booking.beneficiaryLastName} {booking.beneficiaryFirstName}")
         worksheet.write(row, 5, booking.beneficiaryEmail)
         worksheet.write(row, 6, booking.beneficiaryPhoneNumber)
-        worksheet.write(row, 7, str(convert_booking_dates_utc_to_venue_timezone(booking.bookedAt, booking)))
-        worksheet.write(row, 8, str(convert_booking_dates_utc_to_venue_timezone(booking.usedAt, booking)))
+        worksheet.write(row, 7, str(_apply_departement_timezone(booking.bookedAt, departement_code)))
+        worksheet.write(row, 8, str(_apply_departement_timezone(booking.usedAt, departement_code)))
         worksheet.write(
             row,
             9,
@@ -679,7 +740,7 @@ def _serialize_excel_report(query: BaseQuery) -> bytes:
         worksheet.write(row, 10, booking.priceCategoryLabel)
         worksheet.write(row, 11, booking.amount, currency_format)
         worksheet.write(row, 12, _get_booking_status(booking.status, booking.isConfirmed))
-        worksheet.write(row, 13, str(convert_booking_dates_utc_to_venue_timezone(booking.reimbursedAt, booking)))
+        worksheet.write(row, 13, str(_apply_departement_timezone(booking.reimbursedAt, departement_code)))
         worksheet.write(row, 14, serialize_offer_type_educational_or_individual(offer_is_educational=False))
         worksheet.write(row, 15, booking.beneficiaryPostalCode)
         worksheet.write(
@@ -690,9 +751,24 @@ def _serialize_excel_report(query: BaseQuery) -> bytes:
         row += 1
 
     workbook.close()
+
+
+def _serialize_excel_report(query: BaseQuery) -> bytes:
+    output = BytesIO()
+    _write_excel_report(query, output)
     return output.getvalue()
 
 
+def _stream_excel_report(query: BaseQuery) -> typing.Iterator[bytes]:
+    # An XLSX file is a zip archive, which can only be sent once
+    # complete: write it to a temporary file instead of memory.
+    with tempfile.TemporaryFile() as output:
+        _write_excel_report(query, output)
+        output.seek(0)
+        while chunk := output.read(EXPORT_FILE_CHUNK_SIZE):
+            yield chunk
+
+
 def get_soon_expiring_bookings(expiration_days_delta: int) -> typing.Generator[Booking, None, None]:
     """
     Find soon expiring bookings that will expire in exactly
@@ -1,9 +1,10 @@
 from datetime import datetime
+from datetime import tzinfo
+import functools
 from hashlib import sha256
 import hmac
 import typing
-
-from dateutil import tz
+from zoneinfo import ZoneInfo
 
 import pcapi.utils.date as date_utils
 import pcapi.utils.postal_code as postal_code_utils
@@ -35,8 +36,20 @@ def convert_real_booking_dates_utc_to_venue_timezone(
     return _apply_departement_timezone(naive_datetime=date_without_timezone, departement_code=offerer_department_code)
 
 
+@functools.lru_cache(maxsize=256)
+def get_departement_tzinfo(departement_code: str | None) -> tzinfo:
+    # `ZoneInfo` converts dates much faster than `dateutil.tz`, which
+    # matters when exporting many bookings.
+    return ZoneInfo(date_utils.get_department_timezone(departement_code))
+
+
+@functools.lru_cache(maxsize=8192)
+def _get_postal_code_departement_code(postal_code: str) -> str:
+    return postal_code_utils.PostalCode(postal_code).get_departement_code()
+
+
 def _apply_departement_timezone(naive_datetime: datetime | None, departement_code: str) -> datetime | None:
-    departement_tz = tz.gettz(date_utils.get_department_timezone(departement_code))
+    departement_tz = get_departement_tzinfo(departement_code)
     return naive_datetime.astimezone(departement_tz) if naive_datetime is not None else None
 
 
@@ -47,5 +60,15 @@ def convert_booking_dates_utc_to_venue_timezone(
         return _apply_departement_timezone(
             naive_datetime=date_without_timezone, departement_code=booking.venueDepartmentCode
         )
-    offerer_department_code = postal_code_utils.PostalCode(booking.offererPostalCode).get_departement_code()
+    offerer_department_code = _get_postal_code_departement_code(booking.offererPostalCode)
     return _apply_departement_timezone(naive_datetime=date_without_timezone, departement_code=offerer_department_code)
+
+
+def get_booking_venue_departement_code(booking: "CollectiveBooking | Booking") -> str:
+    """Return the department of the venue of a booking row, as used by
+    `convert_booking_dates_utc_to_venue_timezone()`.
+
+    Resolve it once per row and convert all dates of the row with
+    `_apply_departement_timezone()`.
+    """
+    return booking.venueDepartmentCode or _get_postal_code_departement_code(booking.offererPostalCode)
@@ -1,6 +1,8 @@
 import datetime
 import json
 import logging
+import threading
+import typing
 
 import pydantic.v1 as pydantic_v1
 
@@ -20,7 +22,6 @@ import pcapi.core.providers.exceptions as providers_exceptions
 import pcapi.core.providers.models as providers_models
 import pcapi.core.providers.repository as providers_repository
 import pcapi.core.users.models as users_models
-from pcapi.models import db
 from pcapi.models import feature
 from pcapi.utils import requests
 from pcapi.utils.queue import add_to_queue
@@ -62,30 +63,57 @@ def book_cinema_ticket(
 
 
 def disable_external_bookings() -> None:
-    feature.Feature.query.filter(feature.Feature.name.in_([ff.name for ff in EXTERNAL_BOOKINGS_FF])).update(
-        {"isActive": True}, synchronize_session=False
-    )
-    db.session.commit()
+    feature.set_feature_flags({ff.name: True for ff in EXTERNAL_BOOKINGS_FF})
+
+
+# Clients are shared by all requests of the process, see `_get_client()`.
+_clients: dict[tuple, external_bookings_models.ExternalBookingsClientAPI] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(
+    key: tuple, factory: typing.Callable[[], external_bookings_models.ExternalBookingsClientAPI]
+) -> external_bookings_models.ExternalBookingsClientAPI:
+    """Return the client of a cinema, building it on first use.
+
+    The key must include all the configuration of the client (e.g. the
+    CDS token), so that a client is rebuilt when it changes.
+    """
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = factory()
+        return client
+
+
+def clear_clients() -> None:
+    with _clients_lock:
+        _clients.clear()
 
 
 def _get_external_bookings_client_api(venue_id: int) -> external_bookings_models.ExternalBookingsClientAPI:
     cinema_venue_provider = get_active_cinema_venue_provider(venue_id)
     cinema_id = cinema_venue_provider.venueIdAtOfferProvider
-    match cinema_venue_provider.provider.localClass:
+    local_class = cinema_venue_provider.provider.localClass
+    match local_class:
         case "CDSStocks":
             api_url = settings.CDS_API_URL
             cds_cinema_details = providers_repository.get_cds_cinema_details(cinema_id)
             cinema_api_token = cds_cinema_details.cinemaApiToken
             account_id = cds_cinema_details.accountId
-            return CineDigitalServiceAPI(cinema_id, account_id, api_url, cinema_api_token)
+            return _get_client(
+                (local_class, cinema_id, account_id, api_url, cinema_api_token),
+                lambda: CineDigitalServiceAPI(cinema_id, account_id, api_url, cinema_api_token),
+            )
         case "BoostStocks":
-            return BoostClientAPI(cinema_id)
+            return _get_client((local_class, cinema_id), lambda: BoostClientAPI(cinema_id))
         case "CGRStocks":
+            # Not shared: the client holds the (database) details of the cinema.
             return CGRClientAPI(cinema_id)
         case "EMSStocks":
-            return EMSClientAPI(cinema_id)
+            return _get_client((local_class, cinema_id), lambda: EMSClientAPI(cinema_id))
         case _:
-            raise ValueError(f"Unknown Provider: {cinema_venue_provider.provider.localClass}")
+            raise ValueError(f"Unknown Provider: {local_class}")
 
 
 def get_active_cinema_venue_provider(venue_id: int) -> providers_models.VenueProvider:
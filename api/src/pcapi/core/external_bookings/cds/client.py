@@ -1,5 +1,4 @@
 import datetime
-from functools import lru_cache
 import json
 import logging
 import math
@@ -44,12 +43,12 @@ class CineDigitalServiceAPI(external_bookings_models.ExternalBookingsClientAPI):
     def get_film_showtimes_stocks(self, film_id: str) -> dict:
         return {}
 
-    @lru_cache
+    @property
+    def cache_key(self) -> tuple:
+        return (type(self).__name__, self.api_url, self.account_id, self.cinema_id)
+
+    @external_bookings_models.cache_in_process
     def get_internet_sale_gauge_active(self) -> bool:
-        """
-        lru_cache is a feature in Python that can significantly improve the performance of functions
-        by caching their results based on their input arguments, thus avoiding costly recomputations.
-        """
         data = get_resource(self.api_url, self.account_id, self.token, ResourceCDS.CINEMAS)
         cinemas = parse_obj_as(list[cds_serializers.CinemaCDS], data)
         for cinema in cinemas:
@@ -120,7 +119,7 @@ class CineDigitalServiceAPI(external_bookings_models.ExternalBookingsClientAPI):
             f" & url={self.api_url}"
         )
 
-    @lru_cache
+    @external_bookings_models.cache_in_process
     def get_pc_voucher_types(self) -> list[cds_serializers.VoucherTypeCDS]:
         data = get_resource(self.api_url, self.account_id, self.token, ResourceCDS.VOUCHER_TYPE)
         voucher_types = parse_obj_as(list[cds_serializers.VoucherTypeCDS], data)
@@ -130,11 +129,13 @@ class CineDigitalServiceAPI(external_bookings_models.ExternalBookingsClientAPI):
             if voucher_type.code == cds_constants.PASS_CULTURE_VOUCHER_CODE and voucher_type.tariff
         ]
 
-    def get_screen(self, screen_id: int) -> cds_serializers.ScreenCDS:
+    @external_bookings_models.cache_in_process
+    def _get_screens(self) -> list[cds_serializers.ScreenCDS]:
         data = get_resource(self.api_url, self.account_id, self.token, ResourceCDS.SCREENS)
-        screens = parse_obj_as(list[cds_serializers.ScreenCDS], data)
+        return parse_obj_as(list[cds_serializers.ScreenCDS], data)
 
-        for screen in screens:
+    def get_screen(self, screen_id: int) -> cds_serializers.ScreenCDS:
+        for screen in self._get_screens():
             if screen.id == screen_id:
                 return screen
         raise cds_exceptions.CineDigitalServiceAPIException(
@@ -373,7 +374,7 @@ class CineDigitalServiceAPI(external_bookings_models.ExternalBookingsClientAPI):
             f"Cinema not found in Cine Digital Service API " f"for cinemaId={self.cinema_id} & url={self.api_url}"
         )
 
-    @lru_cache
+    @external_bookings_models.cache_in_process
     def get_media_options(self) -> dict[int, str]:
         data = get_resource(self.api_url, self.account_id, self.token, ResourceCDS.MEDIA_OPTIONS)
         media_options = parse_obj_as(list[cds_serializers.MediaOptionCDS], data)
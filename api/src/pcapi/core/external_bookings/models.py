@@ -2,8 +2,11 @@ from dataclasses import dataclass
 from functools import partial
 from functools import wraps
 import json
+import threading
+import time
 import typing
 
+from pcapi import settings
 import pcapi.core.bookings.models as bookings_models
 import pcapi.core.users.models as users_models
 from pcapi.utils.cache import get_from_cache
@@ -30,6 +33,13 @@ class ExternalBookingsClientAPI:
     def __init__(self, cinema_id: str) -> None:
         self.cinema_id = cinema_id
 
+    @property
+    def cache_key(self) -> tuple:
+        """Identify the cinema in the process-wide cache of metadata,
+        see `cache_in_process`.
+        """
+        return (type(self).__name__, self.cinema_id)
+
     # Fixme (yacine, 2022-12-19) remove this method from ExternalBookingsClientAPI. Unlike CDS, on Boost API
     #  we can't get shows remaining places from list of shows ids
     def get_shows_remaining_places(self, shows_id: list[int]) -> dict[str, int]:
@@ -71,3 +81,42 @@ def cache_external_call(key_template: str, expire: int | None = None) -> typing.
         return func_to_cache
 
     return decorator
+
+
+_process_cache: dict[tuple, tuple[float, typing.Any]] = {}
+_process_cache_lock = threading.Lock()
+
+
+def cache_in_process(func: typing.Callable) -> typing.Callable:
+    """
+    Cache the result of an external call to a provider in memory, for
+    `EXTERNAL_BOOKINGS_METADATA_CACHE_TTL` seconds.
+    Uses the `cache_key` of ClientAPI instance and the arguments passed
+    to the function as key, so that the cache is shared by all clients
+    of the same cinema in the process.
+
+    Only use it for slow-changing data (e.g. voucher types or screens),
+    never for stocks or seat availability.
+    """
+
+    @wraps(func)
+    def func_to_cache(instance: ExternalBookingsClientAPI, *args: typing.Any) -> typing.Any:
+        expire = settings.EXTERNAL_BOOKINGS_METADATA_CACHE_TTL
+        if not expire:
+            return func(instance, *args)
+        key = (func.__qualname__, instance.cache_key, *args)
+        with _process_cache_lock:
+            cached = _process_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        result = func(instance, *args)
+        with _process_cache_lock:
+            _process_cache[key] = (time.monotonic() + expire, result)
+        return result
+
+    return func_to_cache
+
+
+def clear_process_cache() -> None:
+    with _process_cache_lock:
+        _process_cache.clear()
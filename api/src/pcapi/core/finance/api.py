@@ -27,9 +27,11 @@ from collections import defaultdict
 import csv
 import datetime
 import decimal
+import io
 import itertools
 import logging
 import math
+import multiprocessing
 import pathlib
 import secrets
 import tempfile
@@ -72,6 +74,7 @@ from pcapi.models.feature import FeatureToggle
 from pcapi.repository import transaction
 from pcapi.tasks import finance_tasks
 from pcapi.utils import human_ids
+from pcapi.utils.chunks import get_chunks
 import pcapi.utils.date as date_utils
 import pcapi.utils.db as db_utils
 import pcapi.utils.pdf as pdf_utils
@@ -91,6 +94,13 @@ RECREDIT_UNDERAGE_USERS_BATCH_SIZE = 1000
 # Prior bookings have been priced manually.
 MIN_DATE_TO_PRICE = datetime.datetime(2021, 12, 31, 23, 0)  # UTC
 PRICE_EVENTS_BATCH_SIZE = 100
+# Number of events that are priced in the same transaction, while the
+# pricing point is locked.
+PRICE_EVENTS_COMMIT_SIZE = 20
+# Number of rows that are fetched at once when writing finance files.
+FINANCE_FILES_YIELD_PER = 1_000
+PRICING_POINT_REVENUE_BACKFILL_BATCH_SIZE = 100
+INVOICE_GENERATION_CHUNK_SIZE = 100
 CASHFLOW_BATCH_LABEL_PREFIX = "VIR"
 
 
@@ -247,7 +257,7 @@ def price_events(
     # resulting in a very large session that is updated on each
     # commit, which takes a lot of time (up to 1 or 2 seconds per
     # commit).
-    event_query = _get_events_to_price(window)
+    event_query = _get_ordered_events_to_price(window)
     loops = math.ceil(event_query.count() / batch_size)
 
     def _get_loop_query(
@@ -304,6 +314,125 @@ def price_events(
                     db.session.expunge(event)
 
 
+def price_events_in_parallel(
+    worker_count: int,
+    min_date: datetime.datetime = MIN_DATE_TO_PRICE,
+    batch_size: int = PRICE_EVENTS_BATCH_SIZE,
+) -> None:
+    """Price finance events that are ready to be priced, in
+    ``worker_count`` processes.
+
+    Pricing points are independent from each other: the revenue (and
+    hence the reimbursement rule) of a pricing point only depends on
+    its own events. Pricing points are thus split in partitions of
+    similar sizes (in number of events), and each partition is priced
+    by its own process.
+    """
+    # See `price_events()` about the upper bound.
+    threshold = datetime.datetime.utcnow() - datetime.timedelta(minutes=1)
+    window = (min_date, threshold)
+
+    event_count_by_pricing_point = (
+        _get_events_to_price(window)
+        .group_by(models.FinanceEvent.pricingPointId)
+        .with_entities(models.FinanceEvent.pricingPointId, sqla.func.count(models.FinanceEvent.id))
+        .all()
+    )
+    partitions: list[list[int]] = [[] for _ in range(min(worker_count, len(event_count_by_pricing_point)))]
+    partition_sizes = [0] * len(partitions)
+    # Assign the largest pricing points first, each to the smallest partition.
+    for pricing_point_id, event_count in sorted(event_count_by_pricing_point, key=lambda row: -row[1]):
+        index = partition_sizes.index(min(partition_sizes))
+        partitions[index].append(pricing_point_id)
+        partition_sizes[index] += event_count
+    logger.info(
+        "Split finance events to price in partitions",
+        extra={"partition_sizes": partition_sizes, "pricing_point_count": len(event_count_by_pricing_point)},
+    )
+    if len(partitions) <= 1:
+        for partition in partitions:
+            _price_partition_events(window, partition, batch_size, partition_index=0)
+        return
+
+    # Forked workers must not share database connections with the
+    # parent process: they will open their own.
+    db.session.remove()
+    db.engine.dispose()
+
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(
+            target=_price_partition_events,
+            args=(window, partition, batch_size, index),
+            name=f"price-events-worker-{index}",
+        )
+        for index, partition in enumerate(partitions)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        if worker.exitcode != 0:
+            logger.error(
+                "Finance event pricing worker failed",
+                extra={"worker": worker.name, "exitcode": worker.exitcode},
+            )
+
+
+def _price_partition_events(
+    window: tuple[datetime.datetime, datetime.datetime],
+    pricing_point_ids: list[int],
+    batch_size: int,
+    partition_index: int,
+) -> None:
+    start = time.perf_counter()
+    priced_count = 0
+    errored_pricing_point_ids = set()
+    event_query = _get_ordered_events_to_price(window, pricing_point_ids)
+    last_key = None
+    while True:
+        # Keyset pagination: events that could not be priced are left
+        # behind instead of being fetched again in the next batch.
+        query = event_query
+        if last_key:
+            query = query.filter(
+                sqla.func.ROW(models.FinanceEvent.pricingOrderingDate, models.FinanceEvent.id)
+                > sqla.func.ROW(*last_key)
+            )
+        events = query.limit(batch_size).all()
+        if not events:
+            break
+        last_key = (events[-1].pricingOrderingDate, events[-1].id)
+
+        events_by_pricing_point = defaultdict(list)
+        for event in events:
+            if event.pricingPointId not in errored_pricing_point_ids:
+                events_by_pricing_point[event.pricingPointId].append(event)
+        for pricing_point_id, pricing_point_events in events_by_pricing_point.items():
+            try:
+                priced_count += price_events_of_pricing_point(pricing_point_id, pricing_point_events)
+            except Exception as exc:  # pylint: disable=broad-except
+                errored_pricing_point_ids.add(pricing_point_id)
+                logger.exception(
+                    "Could not price event, ignoring further events from pricing point",
+                    extra={"pricing_point": pricing_point_id, "exc": str(exc)},
+                )
+        db.session.expunge_all()
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Priced partition of finance events",
+        extra={
+            "partition": partition_index,
+            "pricing_point_count": len(pricing_point_ids),
+            "priced_count": priced_count,
+            "errored_pricing_point_count": len(errored_pricing_point_ids),
+            "elapsed": round(elapsed, 2),
+            "events_per_second": round(priced_count / elapsed, 2) if elapsed else None,
+        },
+    )
+
+
 def get_pricing_point_link(
     booking: bookings_models.Booking | educational_models.CollectiveBooking,
 ) -> offerers_models.VenuePricingPointLink:
@@ -333,8 +462,11 @@ def get_pricing_point_link(
     raise ValueError(f"Could not find pricing point for booking {booking.id}")
 
 
-def _get_events_to_price(window: tuple[datetime.datetime, datetime.datetime]) -> BaseQuery:
-    return (
+def _get_events_to_price(
+    window: tuple[datetime.datetime, datetime.datetime],
+    pricing_point_ids: typing.Collection[int] | None = None,
+) -> BaseQuery:
+    query = (
         models.FinanceEvent.query.filter(
             models.FinanceEvent.pricingPointId.is_not(None),
             models.FinanceEvent.status == models.FinanceEventStatus.READY,
@@ -344,6 +476,18 @@ def _get_events_to_price(window: tuple[datetime.datetime, datetime.datetime]) ->
         .filter(
             models.Pricing.id.is_(None) | (models.Pricing.status == models.PricingStatus.CANCELLED),
         )
+    )
+    if pricing_point_ids is not None:
+        query = query.filter(models.FinanceEvent.pricingPointId.in_(pricing_point_ids))
+    return query
+
+
+def _get_ordered_events_to_price(
+    window: tuple[datetime.datetime, datetime.datetime],
+    pricing_point_ids: typing.Collection[int] | None = None,
+) -> BaseQuery:
+    return (
+        _get_events_to_price(window, pricing_point_ids)
         .order_by(models.FinanceEvent.pricingOrderingDate, models.FinanceEvent.id)
         .options(
             sqla.orm.joinedload(models.FinanceEvent.booking),
@@ -392,83 +536,131 @@ def price_event(event: models.FinanceEvent) -> models.Pricing | None:
     assert event.pricingPointId  # helps mypy
     with transaction():
         lock_pricing_point(event.pricingPointId)
+        pricing, _created = _price_event_with_lock(event)
+    return pricing
 
-        # Now that we have acquired a lock, fetch the event from the
-        # database again so that we can make some final checks before
-        # actually pricing it.
-        if event.bookingId:
-            event = (
-                models.FinanceEvent.query.filter_by(id=event.id)
-                .options(
-                    sqla_orm.joinedload(models.FinanceEvent.booking, innerjoin=True)
-                    .joinedload(bookings_models.Booking.stock, innerjoin=True)
-                    .joinedload(
-                        offers_models.Stock.offer,
-                        innerjoin=True,
-                    ),
-                    sqla_orm.joinedload(models.FinanceEvent.booking, innerjoin=True)
-                    .joinedload(bookings_models.Booking.venue, innerjoin=True)
-                    .joinedload(offerers_models.Venue.pricing_point_links, innerjoin=True)
-                    .joinedload(offerers_models.VenuePricingPointLink.venue, innerjoin=True),
-                )
-                .one()
-            )
-        elif event.collectiveBookingId:
-            event = (
-                models.FinanceEvent.query.filter_by(id=event.id)
-                .options(
-                    sqla_orm.joinedload(models.FinanceEvent.collectiveBooking, innerjoin=True)
-                    .joinedload(educational_models.CollectiveBooking.collectiveStock, innerjoin=True)
-                    .joinedload(educational_models.CollectiveStock.collectiveOffer, innerjoin=True),
-                    sqla_orm.joinedload(models.FinanceEvent.collectiveBooking, innerjoin=True)
-                    .joinedload(educational_models.CollectiveBooking.venue, innerjoin=True)
-                    .joinedload(offerers_models.Venue.pricing_point_links, innerjoin=True)
-                    .joinedload(offerers_models.VenuePricingPointLink.venue, innerjoin=True),
-                )
-                .one()
+
+def price_events_of_pricing_point(
+    pricing_point_id: int,
+    events: typing.Iterable[models.FinanceEvent],
+    commit_size: int = PRICE_EVENTS_COMMIT_SIZE,
+) -> int:
+    """Price events of a single pricing point, in the given order, and
+    return the number of new pricings.
+
+    Pricings are committed every ``commit_size`` events, which also
+    releases the lock on the pricing point, so that other operations on
+    the pricing point do not wait for all events. If an event cannot be
+    priced, the events that have already been priced are kept, the
+    following events are not priced (their revenue depends on the
+    failing event), and the error is raised.
+    """
+    priced_count = 0
+    error = None
+    for chunk in get_chunks(events, commit_size):
+        with transaction():
+            lock_pricing_point(pricing_point_id)
+            for event in chunk:
+                assert event.pricingPointId == pricing_point_id
+                try:
+                    with db.session.begin_nested():
+                        _pricing, created = _price_event_with_lock(event)
+                except Exception as exc:  # pylint: disable=broad-except
+                    error = exc
+                    break
+                if created:
+                    priced_count += 1
+        if error:
+            raise error
+    return priced_count
+
+
+def _price_event_with_lock(event: models.FinanceEvent) -> tuple[models.Pricing | None, bool]:
+    """Price an event. The caller must have locked its pricing point and
+    must commit.
+
+    Return the pricing of the event (if it has been priced), and whether
+    it is a new one.
+    """
+    # Now that we have acquired a lock, fetch the event from the
+    # database again so that we can make some final checks before
+    # actually pricing it.
+    if event.bookingId:
+        event = (
+            models.FinanceEvent.query.filter_by(id=event.id)
+            .options(
+                sqla_orm.joinedload(models.FinanceEvent.booking, innerjoin=True)
+                .joinedload(bookings_models.Booking.stock, innerjoin=True)
+                .joinedload(
+                    offers_models.Stock.offer,
+                    innerjoin=True,
+                ),
+                sqla_orm.joinedload(models.FinanceEvent.booking, innerjoin=True)
+                .joinedload(bookings_models.Booking.venue, innerjoin=True)
+                .joinedload(offerers_models.Venue.pricing_point_links, innerjoin=True)
+                .joinedload(offerers_models.VenuePricingPointLink.venue, innerjoin=True),
             )
-        elif event.bookingFinanceIncidentId:
-            event = (
-                models.FinanceEvent.query.filter_by(id=event.id)
-                .options(
-                    sqla_orm.joinedload(models.FinanceEvent.bookingFinanceIncident, innerjoin=True),
-                )
-                .one()
+            .one()
+        )
+    elif event.collectiveBookingId:
+        event = (
+            models.FinanceEvent.query.filter_by(id=event.id)
+            .options(
+                sqla_orm.joinedload(models.FinanceEvent.collectiveBooking, innerjoin=True)
+                .joinedload(educational_models.CollectiveBooking.collectiveStock, innerjoin=True)
+                .joinedload(educational_models.CollectiveStock.collectiveOffer, innerjoin=True),
+                sqla_orm.joinedload(models.FinanceEvent.collectiveBooking, innerjoin=True)
+                .joinedload(educational_models.CollectiveBooking.venue, innerjoin=True)
+                .joinedload(offerers_models.Venue.pricing_point_links, innerjoin=True)
+                .joinedload(offerers_models.VenuePricingPointLink.venue, innerjoin=True),
             )
-        else:
-            raise ValueError(
-                "Finance event should be linked to an individual booking, a collectiveBooking or a booking finance incident."
+            .one()
+        )
+    elif event.bookingFinanceIncidentId:
+        event = (
+            models.FinanceEvent.query.filter_by(id=event.id)
+            .options(
+                sqla_orm.joinedload(models.FinanceEvent.bookingFinanceIncident, innerjoin=True),
             )
+            .one()
+        )
+    else:
+        raise ValueError(
+            "Finance event should be linked to an individual booking, a collectiveBooking or a booking finance incident."
+        )
 
-        # Perhaps the event has been cancelled (because the booking
-        # has been marked as unused) after we acquired the lock?
-        if event.status != models.FinanceEventStatus.READY:
-            return None
+    # Perhaps the event has been cancelled (because the booking
+    # has been marked as unused) after we acquired the lock?
+    if event.status != models.FinanceEventStatus.READY:
+        return None, False
+
+    # Pricing the same event twice is not allowed (and would be
+    # rejected by a database constraint, anyway), unless the
+    # existing pricing has been cancelled.
+    pricing = models.Pricing.query.filter(
+        models.Pricing.event == event,
+        models.Pricing.status != models.PricingStatus.CANCELLED,
+    ).one_or_none()
+    if pricing:
+        return pricing, False
 
-        # Pricing the same event twice is not allowed (and would be
-        # rejected by a database constraint, anyway), unless the
-        # existing pricing has been cancelled.
-        pricing = models.Pricing.query.filter(
-            models.Pricing.event == event,
-            models.Pricing.status != models.PricingStatus.CANCELLED,
-        ).one_or_none()
-        if pricing:
-            return pricing
+    _delete_dependent_event_pricings(event, "Deleted pricings priced too early")
 
-        _delete_dependent_event_pricings(event, "Deleted pricings priced too early")
+    pricing = _price_event(event)
+    db.session.add(pricing)
+    event.status = models.FinanceEventStatus.PRICED
+    return pricing, True
 
-        pricing = _price_event(event)
-        db.session.add(pricing)
-        event.status = models.FinanceEventStatus.PRICED
-        db.session.commit()
-    return pricing
+
+def _get_revenue_year(value_date: datetime.datetime) -> int:
+    return value_date.replace(tzinfo=pytz.utc).astimezone(utils.ACCOUNTING_TIMEZONE).year
 
 
 def _get_revenue_period(value_date: datetime.datetime) -> tuple[datetime.datetime, datetime.datetime]:
     """Return a datetime (year) period for the given value date, i.e. the
     first and last seconds of the year of the ``value_date``.
     """
-    year = value_date.replace(tzinfo=pytz.utc).astimezone(utils.ACCOUNTING_TIMEZONE).year
+    year = _get_revenue_year(value_date)
     first_second = utils.ACCOUNTING_TIMEZONE.localize(
         datetime.datetime.combine(
             datetime.date(year, 1, 1),
@@ -488,6 +680,19 @@ def _get_current_revenue(event: models.FinanceEvent) -> int:
     """Return the current year revenue for the pricing point of an
     event, NOT including the given event.
     """
+    if FeatureToggle.ENABLE_PRICING_POINT_REVENUE_TABLE.is_active():
+        # The event has not been priced yet (or its pricing has been
+        # cancelled), so that it is not included in the stored revenue.
+        revenue = (
+            models.PricingPointRevenue.query.filter_by(
+                pricingPointId=event.pricingPointId,
+                year=_get_revenue_year(event.valueDate),
+            )
+            .with_entities(models.PricingPointRevenue.revenue)
+            .scalar()
+        )
+        return revenue or 0
+
     revenue_period = _get_revenue_period(event.valueDate)
     # Collective bookings must not be included in revenue.
     current_revenue = (
@@ -767,6 +972,126 @@ def _delete_dependent_event_pricings(event: models.FinanceEvent, log_message: st
     )
 
 
+def _get_expected_pricing_point_revenues_query(
+    pricing_point_ids: typing.Collection[int] | None = None,
+) -> sqla.sql.Select:
+    """Return a query that computes the revenue of pricing points from
+    their pricings, as stored in `PricingPointRevenue` (see the
+    triggers that maintain it).
+    """
+    year = sqla.cast(
+        sqla.extract(
+            "year",
+            sqla.func.timezone(utils.ACCOUNTING_TIMEZONE.zone, sqla.func.timezone("UTC", models.Pricing.valueDate)),
+        ),
+        sqla.Integer,
+    )
+    query = (
+        sqla.select(
+            models.Pricing.pricingPointId.label("pricingPointId"),
+            year.label("year"),
+            sqla.cast(
+                sqla.func.sum(bookings_models.Booking.amount * bookings_models.Booking.quantity * 100),
+                sqla.BigInteger,
+            ).label("revenue"),
+        )
+        .select_from(models.Pricing)
+        .join(bookings_models.Booking, models.Pricing.bookingId == bookings_models.Booking.id)
+        .where(models.Pricing.status.notin_(models.NON_REVENUE_PRICING_STATUSES))
+        .group_by(models.Pricing.pricingPointId, year)
+    )
+    if pricing_point_ids is not None:
+        query = query.where(models.Pricing.pricingPointId.in_(pricing_point_ids))
+    return query
+
+
+def get_pricing_point_revenue_discrepancies(
+    pricing_point_ids: typing.Collection[int] | None = None,
+) -> list[tuple[int, int, int, int]]:
+    """Compare the stored revenue of pricing points with the revenue
+    computed from their pricings, and return discrepancies as
+    ``(pricing_point_id, year, stored_revenue, expected_revenue)``
+    tuples.
+
+    Both are read in the same statement, hence from the same snapshot.
+    """
+    expected = _get_expected_pricing_point_revenues_query(pricing_point_ids).subquery()
+    stored = models.PricingPointRevenue.__table__
+    stored_revenue = sqla.func.coalesce(stored.c.revenue, 0)
+    expected_revenue = sqla.func.coalesce(expected.c.revenue, 0)
+    query = (
+        sqla.select(
+            sqla.func.coalesce(stored.c.pricingPointId, expected.c.pricingPointId).label("pricing_point_id"),
+            sqla.func.coalesce(stored.c.year, expected.c.year).label("year"),
+            stored_revenue.label("stored_revenue"),
+            expected_revenue.label("expected_revenue"),
+        )
+        .select_from(
+            stored.join(
+                expected,
+                sqla.and_(
+                    stored.c.pricingPointId == expected.c.pricingPointId,
+                    stored.c.year == expected.c.year,
+                ),
+                full=True,
+            )
+        )
+        .where(stored_revenue != expected_revenue)
+        .order_by("pricing_point_id", "year")
+    )
+    if pricing_point_ids is not None:
+        query = query.where(
+            sqla.func.coalesce(stored.c.pricingPointId, expected.c.pricingPointId).in_(pricing_point_ids)
+        )
+    return [tuple(row) for row in db.session.execute(query)]
+
+
+def rebuild_pricing_point_revenues(pricing_point_ids: typing.Collection[int]) -> None:
+    """Recompute the stored revenue of the requested pricing points
+    from their pricings.
+    """
+    with transaction():
+        # Pricings are created and cancelled while holding the lock
+        # of their pricing point, let's not miss any of them.
+        for pricing_point_id in sorted(pricing_point_ids):
+            lock_pricing_point(pricing_point_id)
+        models.PricingPointRevenue.query.filter(
+            models.PricingPointRevenue.pricingPointId.in_(pricing_point_ids)
+        ).delete(synchronize_session=False)
+        db.session.execute(
+            sqla.insert(models.PricingPointRevenue).from_select(
+                ["pricingPointId", "year", "revenue"],
+                _get_expected_pricing_point_revenues_query(pricing_point_ids),
+            )
+        )
+
+
+def backfill_pricing_point_revenues(
+    pricing_point_ids: typing.Collection[int] | None = None,
+    batch_size: int = PRICING_POINT_REVENUE_BACKFILL_BATCH_SIZE,
+) -> int:
+    """Recompute the stored revenue of all pricing points (or of the
+    requested ones), in batches, and return the number of pricing
+    points that have been processed.
+    """
+    if pricing_point_ids is None:
+        pricing_point_ids = [
+            pricing_point_id
+            for pricing_point_id, in models.Pricing.query.with_entities(models.Pricing.pricingPointId)
+            .distinct()
+            .order_by(models.Pricing.pricingPointId)
+        ]
+    count = 0
+    for batch in get_chunks(pricing_point_ids, batch_size):
+        rebuild_pricing_point_revenues(batch)
+        count += len(batch)
+        logger.info(
+            "Rebuilt revenue of pricing points",
+            extra={"first_pricing_point": batch[0], "last_pricing_point": batch[-1], "count": count},
+        )
+    return count
+
+
 def update_finance_event_pricing_date(stock: offers_models.Stock) -> None:
     """Update pricing ordering date of finance events linked to a stock when its date is modified.
 
@@ -1389,27 +1714,53 @@ def _write_csv(
     row_formatter: typing.Callable[[typing.Iterable], typing.Iterable] = lambda row: row,
     compress: bool = False,
 ) -> pathlib.Path:
+    """Write rows to a new CSV file and return its path.
+
+    Rows are written as they are read: queries should be passed through
+    `_stream_rows()` so that they are not loaded in memory. If `compress`
+    is set, the CSV file is directly written in a ZIP archive (and
+    never written uncompressed on disk).
+    """
     local_now = pytz.utc.localize(datetime.datetime.utcnow()).astimezone(utils.ACCOUNTING_TIMEZONE)
     filename = filename_base + local_now.strftime("_%Y%m%d_%H%M%S") + ".csv"
     # Store file in a dedicated directory within "/tmp". It's easier
     # to clean files in tests that way.
     path = pathlib.Path(tempfile.mkdtemp()) / filename
-    with open(path, "w+", encoding="utf-8") as fp:
-        writer = csv.writer(fp, quoting=csv.QUOTE_NONNUMERIC)
-        writer.writerow(header)
-        if rows is not None:
-            writer.writerows(row_formatter(row) for row in rows)
-    if compress:
-        compressed_path = pathlib.Path(str(path) + ".zip")
-        with zipfile.ZipFile(
-            compressed_path,
-            "w",
-            compression=zipfile.ZIP_DEFLATED,
-            compresslevel=9,
-        ) as zfile:
-            zfile.write(path, arcname=path.name)
-        path = compressed_path
-    return path
+    if not compress:
+        with open(path, "w+", encoding="utf-8") as fp:
+            _write_csv_rows(fp, header, rows, row_formatter)
+        return path
+
+    compressed_path = pathlib.Path(str(path) + ".zip")
+    with zipfile.ZipFile(
+        compressed_path,
+        "w",
+        compression=zipfile.ZIP_DEFLATED,
+        compresslevel=settings.FINANCE_FILES_COMPRESSION_LEVEL,
+    ) as zfile:
+        # The size of the file is not known in advance: allow it to
+        # exceed 2 GB.
+        with zfile.open(path.name, "w", force_zip64=True) as zipped_file:
+            with io.TextIOWrapper(zipped_file, encoding="utf-8") as fp:
+                _write_csv_rows(fp, header, rows, row_formatter)
+    return compressed_path
+
+
+def _stream_rows(query: BaseQuery) -> BaseQuery:
+    """Fetch rows of the query in batches, through a server-side cursor."""
+    return query.execution_options(stream_results=True).yield_per(FINANCE_FILES_YIELD_PER)
+
+
+def _write_csv_rows(
+    fp: typing.TextIO,
+    header: typing.Iterable,
+    rows: typing.Iterable,
+    row_formatter: typing.Callable[[typing.Iterable], typing.Iterable],
+) -> None:
+    writer = csv.writer(fp, quoting=csv.QUOTE_NONNUMERIC)
+    writer.writerow(header)
+    if rows is not None:
+        writer.writerows(row_formatter(row) for row in rows)
 
 
 def _generate_reimbursement_points_file(cutoff: datetime.datetime) -> pathlib.Path:
@@ -1445,7 +1796,7 @@ def _generate_reimbursement_points_file(cutoff: datetime.datetime) -> pathlib.Pa
         _clean_for_accounting(row.iban),
         _clean_for_accounting(row.bic),
     )
-    return _write_csv("reimbursement_points", header, rows=query, row_formatter=row_formatter)
+    return _write_csv("reimbursement_points", header, rows=_stream_rows(query), row_formatter=row_formatter)
 
 
 def _generate_bank_accounts_file(cutoff: datetime.datetime) -> pathlib.Path:
@@ -1483,7 +1834,7 @@ def _generate_bank_accounts_file(cutoff: datetime.datetime) -> pathlib.Path:
         _clean_for_accounting(row.iban),
         _clean_for_accounting(row.bic),
     )
-    return _write_csv("bank_accounts", header, rows=query, row_formatter=row_formatter)
+    return _write_csv("bank_accounts", header, rows=_stream_rows(query), row_formatter=row_formatter)
 
 
 def _clean_for_accounting(value: str) -> str:
@@ -1592,10 +1943,10 @@ def _generate_payments_file(batch_id: int) -> pathlib.Path:
         "down_payment",
         header,
         rows=itertools.chain(
-            bookings_query,
-            collective_bookings_query,
-            finance_incident_bookings_query,
-            finance_incident_collective_bookings_query,
+            _stream_rows(bookings_query),
+            _stream_rows(collective_bookings_query),
+            _stream_rows(finance_incident_bookings_query),
+            _stream_rows(finance_incident_collective_bookings_query),
         ),
         row_formatter=_payment_details_row_formatter,
     )
@@ -1694,10 +2045,10 @@ def _generate_payments_file_legacy(batch_id: int) -> pathlib.Path:
         "down_payment",
         header,
         rows=itertools.chain(
-            bookings_query,
-            collective_bookings_query,
-            finance_incident_bookings_query,
-            finance_incident_collective_bookings_query,
+            _stream_rows(bookings_query),
+            _stream_rows(collective_bookings_query),
+            _stream_rows(finance_incident_bookings_query),
+            _stream_rows(finance_incident_collective_bookings_query),
         ),
         row_formatter=_payment_details_row_formatter,
     )
@@ -1734,7 +2085,6 @@ def find_reimbursement_rule(rule_reference: str | int) -> models.ReimbursementRu
 def _make_invoice_line(
     group: models.RuleGroup, pricings: list, line_rate: decimal.Decimal | None = None, is_incident_line: bool = False
 ) -> tuple[models.InvoiceLine, int]:
-    reimbursed_amount = 0
     flat_lines = list(itertools.chain.from_iterable(pricing.lines for pricing in pricings))
     # ingoing
     contribution_amount = sum(
@@ -1748,7 +2098,25 @@ def _make_invoice_line(
         line.amount for line in flat_lines if line.category == models.PricingLineCategory.PASS_CULTURE_COMMISSION
     )
 
-    reimbursed_amount += offerer_revenue + contribution_amount + passculture_commission
+    return _make_invoice_line_from_amounts(
+        group,
+        contribution_amount=contribution_amount,
+        offerer_revenue=offerer_revenue,
+        passculture_commission=passculture_commission,
+        line_rate=line_rate,
+        is_incident_line=is_incident_line,
+    )
+
+
+def _make_invoice_line_from_amounts(
+    group: models.RuleGroup,
+    contribution_amount: int,
+    offerer_revenue: int,
+    passculture_commission: int,
+    line_rate: decimal.Decimal | None = None,
+    is_incident_line: bool = False,
+) -> tuple[models.InvoiceLine, int]:
+    reimbursed_amount = offerer_revenue + contribution_amount + passculture_commission
     if offerer_revenue:
         # A rate is calculated for this line if we are using a
         # CustomRule with an amount instead of a rate.
@@ -1849,8 +2217,14 @@ def _get_cashflows_by_bank_accounts(batch: models.CashflowBatch) -> list:
     return rows
 
 
-def generate_invoices(batch: models.CashflowBatch) -> None:
-    """Generate (and store) all invoices."""
+def generate_invoices(batch: models.CashflowBatch, worker_count: int = 1) -> None:
+    """Generate (and store) all invoices.
+
+    Invoices are first generated in bulk (see
+    `_generate_invoices_in_bulk()`). They are then rendered, stored
+    and sent, by ``worker_count`` processes if it is greater than 1
+    (see `_store_and_send_invoices_in_parallel()`).
+    """
 
     if not FeatureToggle.WIP_ENABLE_NEW_BANK_DETAILS_JOURNEY.is_active():
         _generate_invoices_legacy(batch)
@@ -1858,31 +2232,134 @@ def generate_invoices(batch: models.CashflowBatch) -> None:
 
     rows = _get_cashflows_by_bank_accounts(batch)
 
-    for row in rows:
+    with log_elapsed(logger, "Generated invoice model instances", extra={"bank_account_count": len(rows)}):
+        invoice_ids = _generate_invoices_in_bulk(rows)
+
+    start = time.perf_counter()
+    if worker_count > 1 and len(invoice_ids) > 1:
+        batch_id = batch.id
+        stored_count, errored_count = _store_and_send_invoices_in_parallel(invoice_ids, worker_count)
+        # The session has been removed before forking workers.
+        batch = models.CashflowBatch.query.get(batch_id)
+    else:
+        stored_count, errored_count = _store_and_send_invoices(invoice_ids)
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Generated invoices",
+        extra={
+            "batch": batch.id,
+            "worker_count": worker_count,
+            "generated_count": len(invoice_ids),
+            "stored_count": stored_count,
+            "errored_count": errored_count,
+            "elapsed": round(elapsed, 2),
+            "invoices_per_minute": round(60 * stored_count / elapsed) if elapsed else None,
+        },
+    )
+
+    with log_elapsed(logger, "Generated CSV invoices file"):
+        path = generate_invoice_file(batch)
+    drive_folder_name = _get_drive_folder_name(batch)
+    with log_elapsed(logger, "Uploaded CSV invoices file to Google Drive"):
+        _upload_files_to_google_drive(drive_folder_name, [path])
+
+
+def _store_and_send_invoices(invoice_ids: list[int]) -> tuple[int, int]:
+    """Render, store and send the given invoices, and return the
+    number of stored and errored invoices.
+    """
+    stored_count = errored_count = 0
+    for invoice_id in invoice_ids:
         try:
             with transaction():
-                extra = {"bank_account_id": row.bank_account_id}
-                with log_elapsed(logger, "Generated and sent invoice", extra):
-                    generate_and_store_invoice(
-                        bank_account_id=row.bank_account_id,
-                        cashflow_ids=row.cashflow_ids,
-                    )
+                extra = {"invoice_id": invoice_id}
+                with log_elapsed(logger, "Stored and sent invoice", extra):
+                    invoice = models.Invoice.query.get(invoice_id)
+                    _store_and_send_invoice(invoice)
+            stored_count += 1
         except Exception as exc:  # pylint: disable=broad-except
             if settings.IS_RUNNING_TESTS:
                 raise
+            errored_count += 1
             logger.exception(
-                "Could not generate invoice",
+                "Could not store and send invoice",
                 extra={
-                    "bank_account_id": row.bank_account_id,
-                    "cashflow_ids": row.cashflow_ids,
+                    "invoice_id": invoice_id,
                     "exc": str(exc),
                 },
             )
-    with log_elapsed(logger, "Generated CSV invoices file"):
-        path = generate_invoice_file(batch)
-    drive_folder_name = _get_drive_folder_name(batch)
-    with log_elapsed(logger, "Uploaded CSV invoices file to Google Drive"):
-        _upload_files_to_google_drive(drive_folder_name, [path])
+    return stored_count, errored_count
+
+
+def _store_and_send_invoices_in_parallel(invoice_ids: list[int], worker_count: int) -> tuple[int, int]:
+    """Render, store and send invoices in ``worker_count`` processes.
+
+    PDF rendering is what takes most of the time: processes share an
+    on-disk cache of the files that weasyprint fetches (stylesheets,
+    fonts and logos), and each process keeps its fonts configuration
+    from one invoice to the next.
+    """
+    partitions = [invoice_ids[index::worker_count] for index in range(worker_count)]
+    partitions = [partition for partition in partitions if partition]
+
+    # Forked workers must not share database connections with the
+    # parent process: they will open their own.
+    db.session.remove()
+    db.engine.dispose()
+
+    context = multiprocessing.get_context("fork")
+    # Number of stored and errored invoices, for each worker.
+    counts = context.Array("i", 2 * len(partitions))
+    with tempfile.TemporaryDirectory(prefix="invoices_pdf_cache_") as cache_dir:
+        workers = [
+            context.Process(
+                target=_store_and_send_invoices_partition,
+                args=(partition, pathlib.Path(cache_dir), counts, index),
+                name=f"store-invoices-worker-{index}",
+            )
+            for index, partition in enumerate(partitions)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            if worker.exitcode != 0:
+                logger.error(
+                    "Invoice storage worker failed",
+                    extra={"worker": worker.name, "exitcode": worker.exitcode},
+                )
+    stored_count = sum(counts[2 * index] for index in range(len(partitions)))
+    errored_count = sum(counts[2 * index + 1] for index in range(len(partitions)))
+    # Invoices of crashed workers may not have been processed at all.
+    unprocessed_count = len(invoice_ids) - stored_count - errored_count
+    if unprocessed_count:
+        logger.error(
+            "Some invoices have not been processed by invoice storage workers",
+            extra={"unprocessed_count": unprocessed_count},
+        )
+    return stored_count, errored_count + unprocessed_count
+
+
+def _store_and_send_invoices_partition(
+    invoice_ids: list[int],
+    cache_dir: pathlib.Path,
+    counts: typing.Any,  # a `multiprocessing.Array`
+    partition_index: int,
+) -> None:
+    pdf_utils.use_shared_cache(cache_dir)
+    start = time.perf_counter()
+    stored_count, errored_count = _store_and_send_invoices(invoice_ids)
+    counts[2 * partition_index] = stored_count
+    counts[2 * partition_index + 1] = errored_count
+    logger.info(
+        "Stored partition of invoices",
+        extra={
+            "partition": partition_index,
+            "stored_count": stored_count,
+            "errored_count": errored_count,
+            "elapsed": round(time.perf_counter() - start, 2),
+        },
+    )
 
 
 def async_generate_invoices(batch: models.CashflowBatch) -> None:
@@ -1997,7 +2474,12 @@ def generate_invoice_file_legacy(batch: models.CashflowBatch) -> pathlib.Path:
     return _write_csv(
         "invoices",
         header,
-        rows=itertools.chain(query, collective_query, incident_query, incident_collective_query),
+        rows=itertools.chain(
+            _stream_rows(query),
+            _stream_rows(collective_query),
+            _stream_rows(incident_query),
+            _stream_rows(incident_collective_query),
+        ),
         row_formatter=_invoice_row_formatter,
         compress=True,
     )
@@ -2083,7 +2565,12 @@ def generate_invoice_file(batch: models.CashflowBatch) -> pathlib.Path:
     return _write_csv(
         "invoices",
         header,
-        rows=itertools.chain(query, collective_query, incident_query, incident_collective_query),
+        rows=itertools.chain(
+            _stream_rows(query),
+            _stream_rows(collective_query),
+            _stream_rows(incident_query),
+            _stream_rows(incident_collective_query),
+        ),
         row_formatter=_invoice_row_formatter,
         compress=True,
     )
@@ -2159,6 +2646,11 @@ def generate_and_store_invoice(
         if not invoice:
             return
 
+    _store_and_send_invoice(invoice)
+
+
+def _store_and_send_invoice(invoice: models.Invoice) -> None:
+    log_extra = {"bank_account": invoice.bankAccountId}
     # The cashflows all come from the same cashflow batch,
     # so batch_id should be the same for every cashflow
     batch = (
@@ -2456,6 +2948,202 @@ def _generate_invoice(
     db.session.bulk_save_objects(invoice_lines)
     cf_links = [models.InvoiceCashflow(invoiceId=invoice.id, cashflowId=cashflow.id) for cashflow in cashflows]
     db.session.bulk_save_objects(cf_links)
+    _mark_cashflows_as_invoiced(cashflow_ids)
+
+    db.session.commit()
+    return invoice
+
+
+def _generate_invoices_in_bulk(rows: list) -> list[int]:
+    """Generate the invoices of the given bank accounts and return
+    their ids.
+
+    Bank accounts are processed by chunks, each in its own transaction
+    (see `_generate_invoice_chunk()`). If a chunk fails, its bank
+    accounts are processed one by one, so that a single faulty bank
+    account does not prevent the invoicing of the others.
+    """
+    invoice_ids = []
+    for chunk in get_chunks(rows, INVOICE_GENERATION_CHUNK_SIZE):
+        try:
+            invoice_ids += _generate_invoice_chunk(chunk)
+            continue
+        except Exception as exc:  # pylint: disable=broad-except
+            db.session.rollback()
+            if settings.IS_RUNNING_TESTS:
+                raise
+            logger.exception(
+                "Could not generate chunk of invoices, generating them one by one",
+                extra={"bank_account_ids": [row.bank_account_id for row in chunk], "exc": str(exc)},
+            )
+        for row in chunk:
+            try:
+                invoice = _generate_invoice(bank_account_id=row.bank_account_id, cashflow_ids=row.cashflow_ids)
+            except Exception as exc:  # pylint: disable=broad-except
+                db.session.rollback()
+                logger.exception(
+                    "Could not generate invoice",
+                    extra={"bank_account_id": row.bank_account_id, "cashflow_ids": row.cashflow_ids, "exc": str(exc)},
+                )
+                continue
+            if invoice:
+                invoice_ids.append(invoice.id)
+    return invoice_ids
+
+
+def _generate_invoice_chunk(rows: list) -> list[int]:
+    """Generate the invoices of the given bank accounts, as
+    `_generate_invoice()` does for a single bank account, but with a
+    constant number of queries: amounts of pricing lines are summed by
+    SQL, and invoices, invoice lines and links to cashflows are
+    inserted in bulk.
+    """
+    # See `_generate_invoice()` about the lock. Always lock in the
+    # same order to avoid deadlocks with a concurrent call.
+    for bank_account_id in sorted(row.bank_account_id for row in rows):
+        lock_bank_account(bank_account_id)
+    requested_cashflow_ids = [cashflow_id for row in rows for cashflow_id in row.cashflow_ids]
+    cashflows = _filter_invoiceable_cashflows(
+        db.session.query(models.Cashflow.id, models.Cashflow.bankAccountId).filter(
+            models.Cashflow.id.in_(requested_cashflow_ids)
+        )
+    ).all()
+    if not cashflows:
+        # Another instance of the `generate_invoices` command has
+        # already processed these bank accounts. Release locks.
+        db.session.commit()
+        return []
+    cashflow_ids_by_bank_account = defaultdict(list)
+    for cashflow_id, bank_account_id in cashflows:
+        cashflow_ids_by_bank_account[bank_account_id].append(cashflow_id)
+    cashflow_ids = [cashflow_id for cashflow_id, _ in cashflows]
+
+    def _sum_amounts(category: models.PricingLineCategory) -> sqla.sql.ColumnElement:
+        return sqla_func.coalesce(
+            sqla_func.sum(sqla.case((models.PricingLine.category == category, models.PricingLine.amount), else_=0)),
+            0,
+        )
+
+    is_incident = models.FinanceEvent.bookingFinanceIncidentId.is_not(None)
+    amounts = (
+        db.session.query(
+            models.Cashflow.bankAccountId,
+            models.Pricing.standardRule,
+            models.Pricing.customRuleId,
+            is_incident.label("is_incident"),
+            _sum_amounts(models.PricingLineCategory.OFFERER_CONTRIBUTION).label("contribution_amount"),
+            _sum_amounts(models.PricingLineCategory.OFFERER_REVENUE).label("offerer_revenue"),
+            _sum_amounts(models.PricingLineCategory.PASS_CULTURE_COMMISSION).label("passculture_commission"),
+        )
+        .join(models.CashflowPricing, models.CashflowPricing.cashflowId == models.Cashflow.id)
+        .join(models.Pricing, models.Pricing.id == models.CashflowPricing.pricingId)
+        .outerjoin(models.FinanceEvent, models.FinanceEvent.id == models.Pricing.eventId)
+        .outerjoin(models.PricingLine, models.PricingLine.pricingId == models.Pricing.id)
+        .filter(models.Cashflow.id.in_(cashflow_ids))
+        .group_by(models.Cashflow.bankAccountId, models.Pricing.standardRule, models.Pricing.customRuleId, is_incident)
+        .order_by(models.Cashflow.bankAccountId, models.Pricing.standardRule, models.Pricing.customRuleId, is_incident)
+    ).all()
+
+    # Sum amounts by invoice line, as `_generate_invoice()` does:
+    # regular rules are grouped by rule group and rate, custom rules
+    # have their own lines, and incidents are on separate lines.
+    rules: dict[str | int, models.ReimbursementRule] = {}
+    line_amounts_by_bank_account: dict[int, dict[tuple, list]] = {
+        bank_account_id: {} for bank_account_id in cashflow_ids_by_bank_account
+    }
+    for row in amounts:
+        rule_reference = row.standardRule or row.customRuleId
+        if rule_reference not in rules:
+            rules[rule_reference] = find_reimbursement_rule(rule_reference)
+        rule = rules[rule_reference]
+        if isinstance(rule, models.CustomReimbursementRule):
+            key: tuple = (rule.id, row.is_incident)
+        else:
+            key = (rule.group, rule.rate, row.is_incident)  # type: ignore [attr-defined]
+        line_amounts = line_amounts_by_bank_account[row.bankAccountId].setdefault(
+            key, [rule.group, rule.rate, row.is_incident, 0, 0, 0]  # type: ignore [attr-defined]
+        )
+        line_amounts[3] += row.contribution_amount
+        line_amounts[4] += row.offerer_revenue
+        line_amounts[5] += row.passculture_commission
+
+    invoice_lines_by_bank_account = {}
+    invoice_amounts = {}
+    for bank_account_id, bank_account_line_amounts in line_amounts_by_bank_account.items():
+        invoice_lines = []
+        total_reimbursed_amount = 0
+        for (
+            group,
+            rate,
+            is_incident_line,
+            contribution_amount,
+            offerer_revenue,
+            commission,
+        ) in bank_account_line_amounts.values():
+            invoice_line, reimbursed_amount = _make_invoice_line_from_amounts(
+                group,
+                contribution_amount=contribution_amount,
+                offerer_revenue=offerer_revenue,
+                passculture_commission=commission,
+                line_rate=None if is_incident_line else rate,
+                is_incident_line=is_incident_line,
+            )
+            invoice_lines.append(invoice_line)
+            total_reimbursed_amount += reimbursed_amount
+        invoice_lines_by_bank_account[bank_account_id] = invoice_lines
+        invoice_amounts[bank_account_id] = total_reimbursed_amount
+
+    bank_account_ids = sorted(line_amounts_by_bank_account)
+    scheme = reference_models.ReferenceScheme.get_and_lock(name="invoice.reference", year=datetime.date.today().year)
+    references = scheme.get_formatted_references(len(bank_account_ids))
+    scheme.increment_after_use(len(bank_account_ids))
+    inserted_invoices = db.session.execute(
+        sqla.insert(models.Invoice)
+        .values(
+            [
+                {
+                    "bankAccountId": bank_account_id,
+                    "reference": reference,
+                    "amount": invoice_amounts[bank_account_id],
+                    # As of Python 3.9, DEFAULT_ENTROPY is 32 bytes
+                    "token": secrets.token_urlsafe(),
+                }
+                for bank_account_id, reference in zip(bank_account_ids, references)
+            ]
+        )
+        .returning(models.Invoice.id, models.Invoice.bankAccountId)
+    ).all()
+    invoice_ids_by_bank_account = {bank_account_id: invoice_id for invoice_id, bank_account_id in inserted_invoices}
+
+    invoice_line_rows = [
+        {
+            "invoiceId": invoice_ids_by_bank_account[bank_account_id],
+            "label": line.label,
+            "group": line.group,
+            "contributionAmount": line.contributionAmount,
+            "reimbursedAmount": line.reimbursedAmount,
+            "rate": line.rate,
+        }
+        for bank_account_id, invoice_lines in invoice_lines_by_bank_account.items()
+        for line in invoice_lines
+    ]
+    if invoice_line_rows:
+        db.session.execute(sqla.insert(models.InvoiceLine), invoice_line_rows)
+    db.session.execute(
+        sqla.insert(models.InvoiceCashflow),
+        [
+            {"invoiceId": invoice_ids_by_bank_account[bank_account_id], "cashflowId": cashflow_id}
+            for bank_account_id, bank_account_cashflow_ids in cashflow_ids_by_bank_account.items()
+            for cashflow_id in bank_account_cashflow_ids
+        ],
+    )
+    _mark_cashflows_as_invoiced(cashflow_ids)
+
+    db.session.commit()
+    return [invoice_ids_by_bank_account[bank_account_id] for bank_account_id in bank_account_ids]
+
+
+def _mark_cashflows_as_invoiced(cashflow_ids: typing.Collection[int]) -> None:
     # Cashflow.status: UNDER_REVIEW -> ACCEPTED
     models.Cashflow.query.filter(models.Cashflow.id.in_(cashflow_ids)).update(
         {"status": models.CashflowStatus.ACCEPTED},
@@ -2529,9 +3217,6 @@ def _generate_invoice(
             },
         )
 
-    db.session.commit()
-    return invoice
-
 
 def get_invoice_period(
     batch_cutoff_date: datetime.datetime,
@@ -25,11 +25,15 @@ logger = logging.getLogger(__name__)
 
 
 @blueprint.cli.command("price_finance_events")
+@click.option("--workers", help="Number of processes that price events at the same time", type=int, default=1)
 @cron_decorators.log_cron_with_transaction
 @cron_decorators.cron_require_feature(FeatureToggle.PRICE_FINANCE_EVENTS)
-def price_finance_events() -> None:
+def price_finance_events(workers: int) -> None:
     """Price finance events that have recently been created."""
-    finance_api.price_events()
+    if workers > 1:
+        finance_api.price_events_in_parallel(workers)
+    else:
+        finance_api.price_events()
 
 
 @blueprint.cli.command("generate_cashflows_and_payment_files")
@@ -47,7 +51,8 @@ def generate_cashflows_and_payment_files(override_feature_flag: bool) -> None:
 
 @blueprint.cli.command("generate_invoices")
 @click.option("--batch-id", type=int, required=True)
-def generate_invoices(batch_id: int) -> None:
+@click.option("--workers", help="Number of processes that generate invoices at the same time", type=int, default=1)
+def generate_invoices(batch_id: int, workers: int) -> None:
     """Generate (and store) all invoices of a CashflowBatch.
 
     This command can be run multiple times.
@@ -58,7 +63,7 @@ def generate_invoices(batch_id: int) -> None:
         print(f"Could not generate invoices for this batch, as it doesn't exist :{batch_id}")
         return
 
-    finance_api.generate_invoices(batch)
+    finance_api.generate_invoices(batch, worker_count=workers)
     if settings.SLACK_GENERATE_INVOICES_FINISHED_CHANNEL:
         send_internal_message(
             channel=settings.SLACK_GENERATE_INVOICES_FINISHED_CHANNEL,
@@ -188,6 +193,55 @@ def move_siret(
         print("DRY RUN: NO CHANGES HAVE BEEN MADE")
 
 
+@blueprint.cli.command("check_pricing_point_revenues")
+@click.option(
+    "--pricing-point-id", "pricing_point_ids", type=int, multiple=True, help="Check only these pricing points"
+)
+@click.option("--fix", is_flag=True, default=False, help="Rebuild the revenue of inconsistent pricing points")
+def check_pricing_point_revenues(pricing_point_ids: tuple[int, ...], fix: bool) -> None:
+    """Compare the stored yearly revenue of pricing points with the
+    revenue computed from their pricings.
+    """
+    discrepancies = finance_api.get_pricing_point_revenue_discrepancies(pricing_point_ids or None)
+    for pricing_point_id, year, stored_revenue, expected_revenue in discrepancies:
+        logger.warning(
+            "Found inconsistent pricing point revenue",
+            extra={
+                "pricing_point": pricing_point_id,
+                "year": year,
+                "stored_revenue": stored_revenue,
+                "expected_revenue": expected_revenue,
+            },
+        )
+    print(f"Found {len(discrepancies)} inconsistent pricing point revenues")
+    if discrepancies and fix:
+        inconsistent_pricing_point_ids = {pricing_point_id for pricing_point_id, *_ in discrepancies}
+        finance_api.backfill_pricing_point_revenues(sorted(inconsistent_pricing_point_ids))
+        print(f"Rebuilt revenue of {len(inconsistent_pricing_point_ids)} pricing points")
+
+
+@blueprint.cli.command("backfill_pricing_point_revenues")
+@click.option(
+    "--pricing-point-id", "pricing_point_ids", type=int, multiple=True, help="Rebuild only these pricing points"
+)
+@click.option(
+    "--batch-size",
+    type=int,
+    default=finance_api.PRICING_POINT_REVENUE_BACKFILL_BATCH_SIZE,
+    help="Number of pricing points that are locked and rebuilt in the same transaction",
+)
+def backfill_pricing_point_revenues(pricing_point_ids: tuple[int, ...], batch_size: int) -> None:
+    """(Re)compute the stored yearly revenue of pricing points from
+    their pricings.
+
+    It must be run once before activating
+    ENABLE_PRICING_POINT_REVENUE_TABLE. It can be run again at any
+    time.
+    """
+    count = finance_api.backfill_pricing_point_revenues(pricing_point_ids or None, batch_size=batch_size)
+    print(f"Rebuilt revenue of {count} pricing points")
+
+
 @blueprint.cli.command("recredit_underage_users")
 @cron_decorators.log_cron_with_transaction
 def recredit_underage_users() -> None:
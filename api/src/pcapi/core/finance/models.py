@@ -484,6 +484,128 @@ class PricingLog(Base, Model):
     reason: PricingLogReason = sqla.Column(db_utils.MagicEnum(PricingLogReason), nullable=False)
 
 
+# Pricings of these statuses are not included in the revenue of
+# their pricing point.
+NON_REVENUE_PRICING_STATUSES = (PricingStatus.CANCELLED, PricingStatus.REJECTED)
+
+
+class PricingPointRevenue(Base, Model):
+    """Revenue of a pricing point over a (calendar) year, in euro cents.
+
+    It is the sum of the amounts of the individual bookings whose
+    pricing has not been cancelled or rejected. It is used to select
+    the reimbursement rule when pricing a booking, instead of summing
+    all pricings of the pricing point since the beginning of the year.
+
+    Rows are maintained by triggers on the `pricing` and `booking`
+    tables (see `Pricing.trig_update_pricing_point_revenue_ddl`), so
+    that they follow all inserts, status changes and deletions of
+    pricings. They can be checked and rebuilt with the
+    `check_pricing_point_revenues` and
+    `backfill_pricing_point_revenues` commands.
+    """
+
+    __tablename__ = "pricing_point_revenue"
+
+    pricingPointId: int = sqla.Column(
+        sqla.BigInteger, sqla.ForeignKey("venue.id", ondelete="CASCADE"), primary_key=True, nullable=False
+    )
+    year: int = sqla.Column(sqla.Integer, primary_key=True, nullable=False)
+    revenue: int = sqla.Column(sqla.BigInteger, nullable=False, server_default="0")
+
+
+_non_revenue_pricing_statuses_sql = ", ".join(f"'{status.value}'" for status in NON_REVENUE_PRICING_STATUSES)
+
+Pricing.trig_update_pricing_point_revenue_ddl = f"""
+    CREATE OR REPLACE FUNCTION add_to_pricing_point_revenue(
+        pricing_point_id bigint, value_date timestamp, revenue_delta bigint
+    )
+    RETURNS void AS $$
+    BEGIN
+        IF revenue_delta IS NULL OR revenue_delta = 0 THEN
+            RETURN;
+        END IF;
+        INSERT INTO pricing_point_revenue ("pricingPointId", year, revenue)
+        VALUES (
+            pricing_point_id,
+            EXTRACT(YEAR FROM (value_date AT TIME ZONE 'UTC') AT TIME ZONE '{utils.ACCOUNTING_TIMEZONE.zone}'),
+            revenue_delta
+        )
+        ON CONFLICT ("pricingPointId", year) DO UPDATE
+        SET revenue = pricing_point_revenue.revenue + revenue_delta;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION update_pricing_point_revenue()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            IF OLD."bookingId" IS NOT NULL AND OLD.status NOT IN ({_non_revenue_pricing_statuses_sql}) THEN
+                PERFORM add_to_pricing_point_revenue(
+                    OLD."pricingPointId", OLD."valueDate", -(booking.amount * booking.quantity * 100)::bigint
+                )
+                FROM booking WHERE booking.id = OLD."bookingId";
+            END IF;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            IF NEW."bookingId" IS NOT NULL AND NEW.status NOT IN ({_non_revenue_pricing_statuses_sql}) THEN
+                PERFORM add_to_pricing_point_revenue(
+                    NEW."pricingPointId", NEW."valueDate", (booking.amount * booking.quantity * 100)::bigint
+                )
+                FROM booking WHERE booking.id = NEW."bookingId";
+            END IF;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS pricing_insert_or_delete_update_pricing_point_revenue ON pricing;
+    CREATE TRIGGER pricing_insert_or_delete_update_pricing_point_revenue
+    AFTER INSERT OR DELETE ON pricing
+    FOR EACH ROW
+    EXECUTE PROCEDURE update_pricing_point_revenue();
+
+    DROP TRIGGER IF EXISTS pricing_update_update_pricing_point_revenue ON pricing;
+    CREATE TRIGGER pricing_update_update_pricing_point_revenue
+    AFTER UPDATE OF status, "bookingId", "pricingPointId", "valueDate" ON pricing
+    FOR EACH ROW
+    WHEN (
+        (OLD.status IN ({_non_revenue_pricing_statuses_sql})) IS DISTINCT FROM (NEW.status IN ({_non_revenue_pricing_statuses_sql}))
+        OR OLD."bookingId" IS DISTINCT FROM NEW."bookingId"
+        OR OLD."pricingPointId" IS DISTINCT FROM NEW."pricingPointId"
+        OR OLD."valueDate" IS DISTINCT FROM NEW."valueDate"
+    )
+    EXECUTE PROCEDURE update_pricing_point_revenue();
+
+    -- The price of bookings that have already been priced may be
+    -- changed (see `offers.api.update_used_stock_price()`).
+    CREATE OR REPLACE FUNCTION update_pricing_point_revenue_on_booking_amount()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        PERFORM add_to_pricing_point_revenue(
+            pricing."pricingPointId",
+            pricing."valueDate",
+            ((NEW.amount * NEW.quantity - OLD.amount * OLD.quantity) * 100)::bigint
+        )
+        FROM pricing
+        WHERE pricing."bookingId" = NEW.id AND pricing.status NOT IN ({_non_revenue_pricing_statuses_sql});
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS booking_amount_update_pricing_point_revenue ON booking;
+    CREATE TRIGGER booking_amount_update_pricing_point_revenue
+    AFTER UPDATE OF amount, quantity ON booking
+    FOR EACH ROW
+    WHEN (OLD.amount IS DISTINCT FROM NEW.amount OR OLD.quantity IS DISTINCT FROM NEW.quantity)
+    EXECUTE PROCEDURE update_pricing_point_revenue_on_booking_amount()
+    """
+
+# The `pricing` table is created after `booking` (because of a foreign
+# key), so that both triggers can be created here.
+sqla.event.listen(Pricing.__table__, "after_create", sqla.DDL(Pricing.trig_update_pricing_point_revenue_ddl))
+
+
 # TODO(fseguin|dbaty, 2022-01-11): maybe merge with core.categories.subcategories.ReimbursementRuleChoices ?
 class RuleGroup(enum.Enum):
     STANDARD = dict(
@@ -1,5 +1,6 @@
 import datetime
 import logging
+import typing
 
 from flask_sqlalchemy import BaseQuery
 import pytz
@@ -143,6 +144,21 @@ def has_active_or_future_custom_reimbursement_rule(offer: offers_models.Offer) -
     return db.session.query(query).scalar()
 
 
+def get_offer_ids_with_active_or_future_custom_reimbursement_rule(offer_ids: typing.Collection[int]) -> set[int]:
+    """Same as `has_active_or_future_custom_reimbursement_rule()`, for
+    many offers at once.
+    """
+    if not offer_ids:
+        return set()
+    now = datetime.datetime.utcnow()
+    timespan = db_utils.make_timerange(start=now, end=None)
+    query = db.session.query(models.CustomReimbursementRule.offerId).filter(
+        models.CustomReimbursementRule.offerId.in_(offer_ids),
+        models.CustomReimbursementRule.timespan.overlaps(timespan),
+    )
+    return {offer_id for offer_id, in query}
+
+
 def find_all_offerer_payments(
     offerer_id: int,
     reimbursement_period: tuple[datetime.date, datetime.date],
@@ -1,3 +1,5 @@
+import io
+import itertools
 import logging
 import os.path
 import pathlib
@@ -8,13 +10,19 @@ import py7zr
 import pyproj
 
 from pcapi.models import db
+from pcapi.utils.chunks import get_chunks
 
 from . import constants
 from . import models
+from . import repository
 
 
 logger = logging.getLogger(__name__)
 
+# Number of IRIS whose coordinates are transformed and that are loaded
+# (with COPY) at once.
+IMPORT_BATCH_SIZE = 1_000
+
 
 def import_iris_from_7z(path: str) -> None:
     if not os.path.exists(path):
@@ -39,35 +47,66 @@ def import_iris_from_shp_file(path: pathlib.Path) -> int:
             shapefile.crs,
             constants.WGS_SPATIAL_REFERENCE_IDENTIFIER,
         )
-        for feature in shapefile.values():
-            iris = models.IrisFrance(
-                code=feature.properties["CODE_IRIS"],
-                shape=_to_wkt(feature.geometry, transformer),
-            )
-            db.session.add(iris)
-            count += 1
+        for features in get_chunks(shapefile.values(), IMPORT_BATCH_SIZE):
+            codes = [feature.properties["CODE_IRIS"] for feature in features]
+            shapes = _to_wkts([feature.geometry for feature in features], transformer)
+            _copy_iris(codes, shapes)
+            count += len(features)
+    # Cached lookups may refer to previous IRIS.
+    repository.clear_iris_cache()
     return count
 
 
+def _copy_iris(codes: list[str], shapes: list[str]) -> None:
+    table = models.IrisFrance.__table__.name
+    data = io.StringIO(
+        "".join(
+            f"{code}\tSRID={constants.WGS_SPATIAL_REFERENCE_IDENTIFIER};{shape}\n" for code, shape in zip(codes, shapes)
+        )
+    )
+    cursor = db.session.connection().connection.cursor()
+    cursor.copy_expert(f"COPY {table} (code, shape) FROM STDIN", data)
+
+
+def _to_wkt(geometry: fiona.Geometry, transformer: pyproj.Transformer) -> str:
+    return _to_wkts([geometry], transformer)[0]
+
+
 # If this function ever gets too complex, we could use the `geomet`
 # Python package instead.
-def _to_wkt(geometry: fiona.Geometry, transformer: pyproj.Transformer) -> str:
+def _to_wkts(geometries: list[fiona.Geometry], transformer: pyproj.Transformer) -> list[str]:
+    """Return the WKT representation of the given geometries, once
+    transformed with ``transformer``.
+
+    Points of all geometries are transformed at once, which is much
+    faster than transforming them one by one.
+    """
+    polygons_of_geometries = []
+    for geometry in geometries:
+        if geometry.type == "Polygon":
+            polygons_of_geometries.append([geometry.coordinates])
+        elif geometry.type == "MultiPolygon":
+            polygons_of_geometries.append(geometry.coordinates)
+        else:
+            raise ValueError(f"Unsupported type of geometry: {geometry.type}")
+
+    points = [
+        point for polygons in polygons_of_geometries for polygon in polygons for ring in polygon for point in ring
+    ]
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    lats, lons = transformer.transform(xs, ys)
+    # /!\ Order must be the same as in `get_iris_from_coordinates()`.
+    formatted_points = (f"{lon} {lat}" for lat, lon in zip(lats, lons))
+
     def _polygon(rings: list) -> str:
-        s = ""
-        for ring in rings:
-            s += "("
-            for point in ring:
-                lat, lon = transformer.transform(*point)
-                # /!\ Order must be the same as in `get_iris_from_coordinates()`.
-                s += f"{lon} {lat}, "
-            s = s.rstrip(", ")
-            s += "), "
-        s = s.rstrip(", ")
-        return s
-
-    if geometry.type == "Polygon":
-        return "POLYGON (%s)" % _polygon(geometry.coordinates)
-    if geometry.type == "MultiPolygon":
-        s = ", ".join(["(%s)" % _polygon(polygon) for polygon in geometry.coordinates])
-        return f"MULTIPOLYGON ({s})"
-    raise ValueError(f"Unsupported type of geometry: {geometry.type}")
+        return ", ".join("(%s)" % ", ".join(itertools.islice(formatted_points, len(ring))) for ring in rings)
+
+    wkts = []
+    for geometry, polygons in zip(geometries, polygons_of_geometries):
+        if geometry.type == "Polygon":
+            wkts.append("POLYGON (%s)" % _polygon(polygons[0]))
+        else:
+            s = ", ".join(["(%s)" % _polygon(polygon) for polygon in polygons])
+            wkts.append(f"MULTIPOLYGON ({s})")
+    return wkts
@@ -1,13 +1,106 @@
+import collections
+import threading
+import typing
+
+import sqlalchemy as sa
+
 from pcapi.connectors.api_adresse import NoResultException
 from pcapi.connectors.api_adresse import get_address
 from pcapi.core.geography import models as geography_models
 from pcapi.core.geography.constants import WGS_SPATIAL_REFERENCE_IDENTIFIER
+from pcapi.models import db
+
+
+# Coordinates are rounded to 6 decimals (about 10 cm) to look up the
+# in-process cache of IRIS ids.
+CACHE_COORDINATES_PRECISION = 6
+IRIS_CACHE_MAX_SIZE = 10_000
+
+Coordinates = tuple[float, float]  # (longitude, latitude)
+
+# Rounded coordinates -> IRIS id (or None if not in any IRIS)
+_iris_cache: collections.OrderedDict[Coordinates, int | None] = collections.OrderedDict()
+_iris_cache_lock = threading.Lock()
+
+
+def clear_iris_cache() -> None:
+    with _iris_cache_lock:
+        _iris_cache.clear()
+
+
+def _round_coordinates(coordinates: Coordinates) -> Coordinates:
+    lon, lat = coordinates
+    return round(lon, CACHE_COORDINATES_PRECISION), round(lat, CACHE_COORDINATES_PRECISION)
 
 
 def get_iris_from_coordinates(*, lon: float, lat: float) -> geography_models.IrisFrance | None:
-    return geography_models.IrisFrance.query.filter(
-        geography_models.IrisFrance.shape.ST_contains(f"SRID={WGS_SPATIAL_REFERENCE_IDENTIFIER};POINT({lon} {lat})")
-    ).one_or_none()
+    return get_iris_from_coordinates_many([(lon, lat)])[(lon, lat)]
+
+
+def get_iris_from_coordinates_many(
+    coordinates: typing.Iterable[Coordinates],
+) -> dict[Coordinates, geography_models.IrisFrance | None]:
+    """Return the IRIS that contains each of the given (longitude,
+    latitude) pairs, or None if there is none.
+
+    Coordinates that are not in the cache are looked up in a single
+    query, and IRIS are then loaded in a single query.
+    """
+    rounded = {coords: _round_coordinates(coords) for coords in coordinates}
+    if not rounded:
+        return {}
+    iris_ids: dict[Coordinates, int | None] = {}
+    with _iris_cache_lock:
+        for key in rounded.values():
+            if key in _iris_cache:
+                iris_ids[key] = _iris_cache[key]
+                _iris_cache.move_to_end(key)
+
+    missing = set(rounded.values()) - iris_ids.keys()
+    if missing:
+        found = _find_iris_ids(missing)
+        with _iris_cache_lock:
+            for key in missing:
+                iris_ids[key] = _iris_cache[key] = found.get(key)
+                _iris_cache.move_to_end(key)
+            while len(_iris_cache) > IRIS_CACHE_MAX_SIZE:
+                _iris_cache.popitem(last=False)
+
+    ids = {iris_id for iris_id in iris_ids.values() if iris_id is not None}
+    iris_by_id = (
+        {iris.id: iris for iris in geography_models.IrisFrance.query.filter(geography_models.IrisFrance.id.in_(ids))}
+        if ids
+        else {}
+    )
+    if len(iris_by_id) < len(ids):
+        # Some IRIS have been deleted since they have been cached.
+        clear_iris_cache()
+        return get_iris_from_coordinates_many(rounded.keys())
+
+    return {coords: iris_by_id.get(iris_ids[key]) for coords, key in rounded.items()}
+
+
+def _find_iris_ids(coordinates: typing.Collection[Coordinates]) -> dict[Coordinates, int]:
+    lons, lats = zip(*coordinates)
+    points = (
+        sa.func.unnest(
+            sa.cast(sa.bindparam("lons", list(lons)), sa.ARRAY(sa.Float)),
+            sa.cast(sa.bindparam("lats", list(lats)), sa.ARRAY(sa.Float)),
+        )
+        .table_valued("lon", "lat")
+        .render_derived()
+    )
+    query = sa.select(points.c.lon, points.c.lat, geography_models.IrisFrance.id).join_from(
+        points,
+        geography_models.IrisFrance,
+        geography_models.IrisFrance.shape.ST_Contains(
+            sa.func.ST_SetSRID(sa.func.ST_MakePoint(points.c.lon, points.c.lat), WGS_SPATIAL_REFERENCE_IDENTIFIER)
+        ),
+    )
+    iris_ids: dict[Coordinates, int] = {}
+    for lon, lat, iris_id in db.session.execute(query):
+        iris_ids.setdefault((lon, lat), iris_id)
+    return iris_ids
 
 
 def get_iris_from_address(
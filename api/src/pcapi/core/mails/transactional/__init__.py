@@ -37,6 +37,7 @@ from .pro.invoice_available_to_pro import send_invoice_available_to_pro_email
 from .pro.new_offerer_validation import send_new_offerer_rejection_email_to_pro
 from .pro.new_offerer_validation import send_new_offerer_validation_email_to_pro
 from .pro.offer_validation_to_pro import send_offer_validation_status_update_email
+from .pro.offer_validation_to_pro import send_offers_validation_status_update_emails
 from .pro.offerer_attachment_invitation import send_offerer_attachment_invitation
 from .pro.offerer_attachment_invitation import send_offerer_attachment_invitation_accepted
 from .pro.offerer_attachment_validation import send_offerer_attachment_rejection_email_to_pro
@@ -1,9 +1,13 @@
+import sqlalchemy as sa
+
 from pcapi.core import mails
 from pcapi.core.educational import models as educational_models
 from pcapi.core.mails import models
 from pcapi.core.mails.transactional.sendinblue_template_ids import TransactionalEmail
+from pcapi.core.offerers import models as offerers_models
 from pcapi.core.offers.models import Offer
 from pcapi.core.offers.models import OfferValidationStatus
+from pcapi.core.users import models as users_models
 from pcapi.utils.urls import build_pc_pro_offer_link
 
 
@@ -80,3 +84,40 @@ def send_offer_validation_status_update_email(
         else:
             offer_data = retrieve_data_for_offer_rejection_email(offer)
         mails.send(recipients=recipient_emails, data=offer_data)
+
+
+def send_offers_validation_status_update_emails(
+    old_status_by_offer_id: dict[int, OfferValidationStatus],
+    validation_status: OfferValidationStatus,
+) -> None:
+    """Send the emails of a batch validation (or rejection) of individual
+    offers.
+
+    Offers and their recipients are loaded with a single query, and the
+    recipients are computed once per venue.
+    """
+    offers = (
+        Offer.query.filter(Offer.id.in_(list(old_status_by_offer_id)))
+        .options(
+            sa.orm.joinedload(Offer.venue)
+            .joinedload(offerers_models.Venue.managingOfferer)
+            .joinedload(offerers_models.Offerer.UserOfferers)
+            .joinedload(offerers_models.UserOfferer.user)
+            .load_only(users_models.User.email)
+        )
+        .order_by(Offer.id)
+        .all()
+    )
+
+    recipients_by_venue_id: dict[int, list[str]] = {}
+    for offer in offers:
+        venue = offer.venue
+        if venue.id not in recipients_by_venue_id:
+            recipients_by_venue_id[venue.id] = (
+                [venue.bookingEmail]
+                if venue.bookingEmail
+                else [user_offerer.user.email for user_offerer in venue.managingOfferer.UserOfferers]
+            )
+        send_offer_validation_status_update_email(
+            offer, old_status_by_offer_id[offer.id], validation_status, recipients_by_venue_id[venue.id]
+        )
@@ -51,6 +51,7 @@ from pcapi.utils import image_conversion
 import pcapi.utils.db as db_utils
 import pcapi.utils.email as email_utils
 
+from . import api_key_cache
 from . import exceptions
 from . import models
 from . import repository as offerers_repository
@@ -618,7 +619,13 @@ def find_api_key(key: str) -> models.ApiKey | None:
     if not api_key:
         return None
 
-    return api_key if api_key.check_secret(clear_secret) else None
+    cached_api_key = api_key_cache.get(key)
+    if cached_api_key and cached_api_key.matches(api_key):
+        return api_key
+    if not api_key.check_secret(clear_secret):
+        return None
+    api_key_cache.add(key, api_key)
+    return api_key
 
 
 def _create_prefix(env: str, prefix_identifier: str) -> str:
@@ -632,6 +639,7 @@ def delete_api_key_by_user(user: users_models.User, api_key_prefix: str) -> None
         raise exceptions.ApiKeyDeletionDenied()
 
     db.session.delete(api_key)
+    api_key_cache.invalidate(api_key_ids={api_key.id})
 
 
 def _fill_in_offerer(
@@ -1021,6 +1029,7 @@ def reject_offerer(
 
     # Remove any API key which could have been created when user was waiting for validation
     models.ApiKey.query.filter(models.ApiKey.offererId == offerer.id).delete()
+    api_key_cache.invalidate(offerer_id=offerer.id)
 
     db.session.commit()
 
@@ -1873,6 +1882,7 @@ def delete_offerer(offerer_id: int) -> None:
     offerers_models.ApiKey.query.filter(offerers_models.ApiKey.offererId == offerer_id).delete(
         synchronize_session=False
     )
+    api_key_cache.invalidate(offerer_id=offerer_id)
 
     offerers_models.Offerer.query.filter(offerers_models.Offerer.id == offerer_id).delete()
 
@@ -0,0 +1,106 @@
+"""An in-process cache of verified API keys.
+
+Checking the secret of an API key is a bcrypt check, which is slow by
+design. Public API integrators send the same key on every request, so
+we remember successful verifications for a short time.
+
+Entries are indexed by a keyed hash (HMAC) of the presented key, so
+that clear secrets are never kept in memory. A cache hit only spares
+the secret check: the API key is still loaded from the database, and
+the entry is only used if the stored (hashed) secret, offerer and
+provider have not changed. A key that has been deleted (or
+regenerated) in another process is hence never accepted.
+"""
+
+import collections
+import dataclasses
+import hashlib
+import hmac
+import threading
+import time
+
+import prometheus_client
+
+from pcapi import settings
+
+from . import models
+
+
+cache_requests = prometheus_client.Counter(
+    "pcapi_api_key_cache_requests",
+    "Number of lookups in the cache of verified API keys",
+    ["result"],
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class CachedApiKey:
+    api_key_id: int
+    offerer_id: int
+    provider_id: int | None
+    secret: bytes
+    expires_at: float
+
+    def matches(self, api_key: models.ApiKey) -> bool:
+        return (
+            self.api_key_id == api_key.id
+            and self.offerer_id == api_key.offererId
+            and self.provider_id == api_key.providerId
+            and hmac.compare_digest(self.secret, api_key.secret)
+        )
+
+
+_cache: collections.OrderedDict[bytes, CachedApiKey] = collections.OrderedDict()
+_lock = threading.Lock()
+
+
+def _get_cache_key(key: str) -> bytes:
+    return hmac.new(settings.FLASK_SECRET.encode(), key.encode(), hashlib.sha256).digest()
+
+
+def get(key: str) -> CachedApiKey | None:
+    if not settings.API_KEY_CACHE_TTL:
+        return None
+    cache_key = _get_cache_key(key)
+    with _lock:
+        cached = _cache.get(cache_key)
+        if cached and cached.expires_at < time.monotonic():
+            del _cache[cache_key]
+            cached = None
+        if cached:
+            _cache.move_to_end(cache_key)
+    cache_requests.labels(result="hit" if cached else "miss").inc()
+    return cached
+
+
+def add(key: str, api_key: models.ApiKey) -> None:
+    if not settings.API_KEY_CACHE_TTL:
+        return
+    cached = CachedApiKey(
+        api_key_id=api_key.id,
+        offerer_id=api_key.offererId,
+        provider_id=api_key.providerId,
+        secret=api_key.secret,
+        expires_at=time.monotonic() + settings.API_KEY_CACHE_TTL,
+    )
+    cache_key = _get_cache_key(key)
+    with _lock:
+        _cache[cache_key] = cached
+        _cache.move_to_end(cache_key)
+        while len(_cache) > settings.API_KEY_CACHE_MAX_SIZE:
+            _cache.popitem(last=False)
+
+
+def invalidate(api_key_ids: set[int] | None = None, offerer_id: int | None = None) -> None:
+    """Remove entries of the given API keys or of all API keys of the
+    given offerer.
+    """
+    with _lock:
+        for cache_key, cached in list(_cache.items()):
+            if (api_key_ids and cached.api_key_id in api_key_ids) or cached.offerer_id == offerer_id:
+                del _cache[cache_key]
+
+
+def clear() -> None:
+    with _lock:
+        _cache.clear()
@@ -1,13 +1,16 @@
+import dataclasses
 import datetime
 import decimal
 import enum
 import logging
 import typing
 
+from flask import current_app
 from flask_sqlalchemy import BaseQuery
 from psycopg2.errorcodes import CHECK_VIOLATION
 from psycopg2.errorcodes import UNIQUE_VIOLATION
 from psycopg2.extras import DateTimeRange
+import redis
 import sentry_sdk
 import sqlalchemy as sa
 import sqlalchemy.exc as sqla_exc
@@ -34,6 +37,7 @@ from pcapi.core.external.attributes.api import update_external_pro
 import pcapi.core.external_bookings.api as external_bookings_api
 from pcapi.core.finance import api as finance_api
 from pcapi.core.finance import models as finance_models
+from pcapi.core.finance import repository as finance_repository
 import pcapi.core.finance.conf as finance_conf
 import pcapi.core.mails.transactional as transactional_mails
 from pcapi.core.offerers import api as offerers_api
@@ -53,7 +57,6 @@ from pcapi.repository import repository
 from pcapi.repository import transaction
 from pcapi.utils import image_conversion
 import pcapi.utils.cinema_providers as cinema_providers_utils
-from pcapi.utils.custom_logic import OPERATIONS
 from pcapi.workers import push_notification_job
 
 from . import exceptions
@@ -61,6 +64,7 @@ from . import models
 from . import repository as offers_repository
 from . import serialize as offers_serialize
 from . import validation
+from . import validation_rules
 
 
 logger = logging.getLogger(__name__)
@@ -71,13 +75,6 @@ OFFERS_RECAP_LIMIT = 501
 STOCK_LIMIT_TO_DELETE = 50
 
 
-OFFER_LIKE_MODELS = {
-    "Offer",
-    "CollectiveOffer",
-    "CollectiveOfferTemplate",
-}
-
-
 class T_UNCHANGED(enum.Enum):
     TOKEN = 0
 
@@ -1001,65 +998,43 @@ def deactivate_permanently_unavailable_products(ean: str) -> bool:
     return True
 
 
-def resolve_offer_validation_sub_rule(sub_rule: models.OfferValidationSubRule, offer: AnyOffer) -> bool:
-    if sub_rule.model:
-        if sub_rule.model.value in OFFER_LIKE_MODELS and type(offer).__name__ == sub_rule.model.value:
-            object_to_compare = offer
-        elif sub_rule.model.value == "CollectiveStock" and isinstance(offer, educational_models.CollectiveOffer):
-            object_to_compare = offer.collectiveStock
-        elif sub_rule.model.value == "Venue":
-            object_to_compare = offer.venue
-        elif sub_rule.model.value == "Offerer":
-            object_to_compare = offer.venue.managingOfferer
-        else:
-            raise exceptions.UnapplicableModel()
-
-        target_attribute = getattr(object_to_compare, sub_rule.attribute.value)
-    else:
-        target_attribute = type(offer).__name__
-
-    return OPERATIONS[sub_rule.operator.value](target_attribute, sub_rule.comparated["comparated"])  # type: ignore[operator]
-
-
-def rule_flags_offer(rule: models.OfferValidationRule, offer: AnyOffer) -> bool:
-    sub_rule_flags_offer = []
-    for sub_rule in rule.subRules:
-        try:
-            sub_rule_flags_offer.append(resolve_offer_validation_sub_rule(sub_rule, offer))
-        except exceptions.UnapplicableModel:
-            sub_rule_flags_offer.append(False)
-            break
-    is_offer_flagged = all(sub_rule_flags_offer)
-    return is_offer_flagged
-
-
 def set_offer_status_based_on_fraud_criteria(offer: AnyOffer) -> models.OfferValidationStatus:
-    offer_validation_rules = (
-        models.OfferValidationRule.query.options(
-            sa.orm.joinedload(models.OfferValidationSubRule, models.OfferValidationRule.subRules)
-        )
-        .filter(models.OfferValidationRule.isActive.is_(True))
-        .all()
-    )
+    return set_offers_status_based_on_fraud_criteria([offer])[0]
 
-    flagging_rules = []
-    for rule in offer_validation_rules:
-        if rule_flags_offer(rule, offer):
-            flagging_rules.append(rule)
 
-    if flagging_rules:
-        status = models.OfferValidationStatus.PENDING
-        offer.flaggingValidationRules = flagging_rules
-        if isinstance(offer, models.Offer):
-            compliance.update_offer_compliance_score(offer, is_primary=True)
+def set_offers_status_based_on_fraud_criteria(offers: typing.Sequence[AnyOffer]) -> list[models.OfferValidationStatus]:
+    """Compute the validation status of each offer with the (compiled
+    and cached) validation rules, and set the rules that flag them.
+    """
+    flagging_rule_ids = validation_rules.get_flagging_rule_ids(offers)
+    all_flagging_rule_ids = {rule_id for rule_ids in flagging_rule_ids for rule_id in rule_ids}
+    rule_by_id = {}
+    if all_flagging_rule_ids:
+        rule_by_id = {
+            rule.id: rule
+            for rule in models.OfferValidationRule.query.filter(
+                models.OfferValidationRule.id.in_(all_flagging_rule_ids)
+            )
+        }
+
+    statuses = []
+    for offer, rule_ids in zip(offers, flagging_rule_ids):
+        # A rule may have been deleted since the compiled rules were cached.
+        flagging_rules = [rule_by_id[rule_id] for rule_id in rule_ids if rule_id in rule_by_id]
+        if flagging_rules:
+            status = models.OfferValidationStatus.PENDING
+            offer.flaggingValidationRules = flagging_rules
+            if isinstance(offer, models.Offer):
+                compliance.update_offer_compliance_score(offer, is_primary=True)
 
-    else:
-        status = models.OfferValidationStatus.APPROVED
-        if isinstance(offer, models.Offer):
-            compliance.update_offer_compliance_score(offer, is_primary=False)
+        else:
+            status = models.OfferValidationStatus.APPROVED
+            if isinstance(offer, models.Offer):
+                compliance.update_offer_compliance_score(offer, is_primary=False)
 
-    logger.info("Computed offer validation", extra={"offer": offer.id, "status": status.value})
-    return status
+        logger.info("Computed offer validation", extra={"offer": offer.id, "status": status.value})
+        statuses.append(status)
+    return statuses
 
 
 def unindex_expired_offers(process_all_expired: bool = False) -> None:
@@ -1119,6 +1094,39 @@ def report_offer(
     transactional_mails.send_email_reported_offer_by_user(user, offer, reason, custom_reason)
 
 
+CINEMA_STOCK_REFRESH_KEY = "cinema_stock_refresh:offer:{offer_id}"
+
+
+def _get_cinema_stock_refresh_max_age(provider_local_class: str) -> int:
+    return {
+        "CDSStocks": settings.CDS_STOCK_REFRESH_MAX_AGE,
+        "BoostStocks": settings.BOOST_STOCK_REFRESH_MAX_AGE,
+        "CGRStocks": settings.CGR_STOCK_REFRESH_MAX_AGE,
+        "EMSStocks": settings.EMS_STOCK_REFRESH_MAX_AGE,
+    }.get(provider_local_class, 0)
+
+
+def should_refresh_cinema_stock(offer: models.Offer) -> bool:
+    """Return whether the stock of the given cinema offer is stale and
+    the caller should refresh it.
+
+    The Redis key is both the date of the last refresh and a lock: it
+    expires after the threshold of the provider, and only the first
+    caller after that gets `True`. Hence all views of a popular offer
+    (i.e. of all showtimes of a movie in a cinema) trigger a single
+    call to the cinema provider.
+    """
+    max_age = _get_cinema_stock_refresh_max_age(offer.lastProvider.localClass)
+    if not max_age:
+        return True
+    key = CINEMA_STOCK_REFRESH_KEY.format(offer_id=offer.id)
+    try:
+        return bool(current_app.redis_client.set(key, datetime.datetime.utcnow().isoformat(), nx=True, ex=max_age))
+    except redis.exceptions.RedisError:
+        logger.exception("Could not check the last refresh of cinema stock", extra={"offer": offer.id})
+        return False
+
+
 def update_stock_quantity_to_match_cinema_venue_provider_remaining_places(offer: models.Offer) -> None:
     try:
         venue_provider = external_bookings_api.get_active_cinema_venue_provider(offer.venueId)
@@ -1296,6 +1304,137 @@ def batch_delete_stocks(stocks_to_delete: list[models.Stock]) -> None:
         _delete_stock(stock)
 
 
+@dataclasses.dataclass(frozen=True)
+class StockUpsert:
+    price: decimal.Decimal
+    # Quantity that is still available, i.e. not counting existing
+    # bookings. `None` means unlimited.
+    quantity: int | None
+    booking_limit_datetime: datetime.datetime | None
+
+
+def batch_upsert_stocks(
+    offers: typing.Collection[models.Offer],
+    stock_data_by_offer_id: dict[int, StockUpsert],
+    provider: providers_models.Provider,
+) -> dict[int, dict[str, list[str]]]:
+    """Create or update the stock of each given (thing) offer.
+
+    Offers and their stocks must already be loaded. All stocks are
+    validated first, with a few queries for the whole batch, and then
+    written with one INSERT and one UPDATE. Return the errors of the
+    stocks that could not be saved, by offer id.
+    """
+    offer_ids = [offer.id for offer in offers]
+    offer_ids_with_custom_rule = finance_repository.get_offer_ids_with_active_or_future_custom_reimbursement_rule(
+        offer_ids
+    )
+    stocks = [stock for offer in offers for stock in offer.activeStocks]
+    activation_codes_expiration_by_stock_id = dict(
+        db.session.query(models.ActivationCode.stockId, models.ActivationCode.expirationDate)
+        .filter(models.ActivationCode.stockId.in_([stock.id for stock in stocks]))
+        .distinct(models.ActivationCode.stockId)
+    )
+
+    errors: dict[int, dict[str, list[str]]] = {}
+    stocks_to_create: list[dict] = []
+    stocks_to_update: list[models.Stock] = []
+    new_values: list[tuple[int, decimal.Decimal, int | None, datetime.datetime | None]] = []
+    for offer in offers:
+        data = stock_data_by_offer_id[offer.id]
+        existing_stock = next(iter(offer.activeStocks), None)
+        has_custom_reimbursement_rule = offer.id in offer_ids_with_custom_rule
+        try:
+            if existing_stock is None:
+                validation.check_required_dates_for_stock(offer, None, data.booking_limit_datetime)
+                validation.check_validation_status(offer)
+                validation.check_provider_can_create_stock(offer, provider)
+                validation.check_stock_price(
+                    data.price, offer, has_custom_reimbursement_rule=has_custom_reimbursement_rule
+                )
+                validation.check_stock_quantity(data.quantity)
+                stocks_to_create.append(
+                    {
+                        "offerId": offer.id,
+                        "price": data.price,
+                        "quantity": data.quantity,
+                        "bookingLimitDatetime": data.booking_limit_datetime,
+                    }
+                )
+                continue
+
+            quantity = None if data.quantity is None else data.quantity + existing_stock.dnBookedQuantity
+            if (existing_stock.price, existing_stock.quantity, existing_stock.bookingLimitDatetime) == (
+                data.price,
+                quantity,
+                data.booking_limit_datetime,
+            ):
+                continue
+            validation.check_stock_is_updatable(existing_stock, provider)
+            validation.check_booking_limit_datetime(
+                existing_stock, existing_stock.beginningDatetime, data.booking_limit_datetime
+            )
+            validation.check_required_dates_for_stock(
+                offer, existing_stock.beginningDatetime, data.booking_limit_datetime
+            )
+            if data.price != existing_stock.price:
+                validation.check_stock_price(
+                    data.price, offer, has_custom_reimbursement_rule=has_custom_reimbursement_rule
+                )
+            validation.check_stock_quantity(quantity, existing_stock.dnBookedQuantity)
+            if existing_stock.id in activation_codes_expiration_by_stock_id:
+                validation.check_activation_codes_expiration_datetime(
+                    activation_codes_expiration_by_stock_id[existing_stock.id], data.booking_limit_datetime
+                )
+            stocks_to_update.append(existing_stock)
+            new_values.append((existing_stock.id, data.price, data.quantity, data.booking_limit_datetime))
+        except (ApiErrors, exceptions.OfferCreationBaseException, exceptions.OfferEditionBaseException) as exc:
+            errors[offer.id] = exc.errors
+
+    if stocks_to_create:
+        db.session.execute(sa.insert(models.Stock), stocks_to_create)
+    if stocks_to_update:
+        values = sa.values(
+            sa.column("id", sa.BigInteger),
+            sa.column("price", sa.Numeric(10, 2)),
+            sa.column("quantity", sa.Integer),
+            sa.column("bookingLimitDatetime", sa.DateTime),
+            name="new_stock",
+        ).data(new_values)
+        db.session.execute(
+            sa.update(models.Stock)
+            .where(models.Stock.id == values.c.id)
+            .values(
+                # Cast values: PostgreSQL types a column of `NULL` values as text.
+                price=sa.cast(values.c.price, sa.Numeric(10, 2)),
+                # Available quantity is given: add bookings (as they are
+                # now, not as they were when stocks were loaded).
+                quantity=sa.cast(values.c.quantity, sa.Integer) + models.Stock.dnBookedQuantity,
+                bookingLimitDatetime=sa.cast(values.c.bookingLimitDatetime, sa.DateTime),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        for stock in stocks_to_update:
+            db.session.expire(stock)
+
+    logger.info(
+        "Batch upsert of stocks",
+        extra={
+            "provider_id": provider.id,
+            "created_stocks": len(stocks_to_create),
+            "updated_stocks": len(stocks_to_update),
+            "errors": len(errors),
+        },
+        technical_message_id="stocks.batch_upserted",
+    )
+    search.async_index_offer_ids(
+        {stock["offerId"] for stock in stocks_to_create} | {stock.offerId for stock in stocks_to_update},
+        reason=search.IndexationReason.STOCK_UPDATE,
+        log_extra={"source": "batch_upsert_stocks"},
+    )
+    return errors
+
+
 def get_or_create_label(label: str, venue: offerers_models.Venue) -> models.PriceCategoryLabel:
     price_category_label = models.PriceCategoryLabel.query.filter_by(label=label, venue=venue).one_or_none()
     if not price_category_label:
@@ -0,0 +1,98 @@
+"""Track the progress of asynchronous imports of product offers by EAN.
+
+A provider sends a (possibly large) list of EANs with their stock, and
+gets an import id right away. The import is then processed by a worker,
+chunk by chunk. The state of the import is kept in Redis for a few
+days, so that the provider can follow its progress and get the errors
+of each EAN.
+"""
+
+import dataclasses
+import enum
+import json
+import uuid
+
+from flask import current_app as app
+
+
+REDIS_KEY_PREFIX = "pcapi:offers:ean_imports"
+IMPORT_TTL = 60 * 60 * 24 * 3  # 3 days
+# Number of EANs that are processed (and committed) at once.
+CHUNK_SIZE = 500
+
+Errors = dict[str, list[str]]
+
+
+class EanImportStatus(enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclasses.dataclass
+class EanImport:
+    id: str
+    provider_id: int
+    venue_id: int
+    status: EanImportStatus
+    total: int
+    processed: int
+    errors: dict[str, Errors]
+
+
+def _get_key(import_id: str) -> str:
+    return f"{REDIS_KEY_PREFIX}:{import_id}"
+
+
+def _get_errors_key(import_id: str) -> str:
+    return f"{REDIS_KEY_PREFIX}:{import_id}:errors"
+
+
+def create_import(provider_id: int, venue_id: int, total: int) -> str:
+    import_id = uuid.uuid4().hex
+    key = _get_key(import_id)
+    pipeline = app.redis_client.pipeline()
+    pipeline.hset(
+        key,
+        mapping={
+            "provider_id": provider_id,
+            "venue_id": venue_id,
+            "status": EanImportStatus.PENDING.value,
+            "total": total,
+            "processed": 0,
+        },
+    )
+    pipeline.expire(key, IMPORT_TTL)
+    pipeline.execute()
+    return import_id
+
+
+def set_status(import_id: str, status: EanImportStatus) -> None:
+    app.redis_client.hset(_get_key(import_id), "status", status.value)
+
+
+def record_progress(import_id: str, processed: int, errors: dict[str, Errors]) -> None:
+    pipeline = app.redis_client.pipeline()
+    pipeline.hincrby(_get_key(import_id), "processed", processed)
+    if errors:
+        errors_key = _get_errors_key(import_id)
+        pipeline.hset(errors_key, mapping={ean: json.dumps(ean_errors) for ean, ean_errors in errors.items()})
+        pipeline.expire(errors_key, IMPORT_TTL)
+    pipeline.execute()
+
+
+def get_import(import_id: str) -> EanImport | None:
+    data = app.redis_client.hgetall(_get_key(import_id))
+    if not data:
+        return None
+    errors = app.redis_client.hgetall(_get_errors_key(import_id))
+    return EanImport(
+        id=import_id,
+        provider_id=int(data["provider_id"]),
+        venue_id=int(data["venue_id"]),
+        status=EanImportStatus(data["status"]),
+        total=int(data["total"]),
+        processed=int(data["processed"]),
+        errors={ean: json.loads(ean_errors) for ean, ean_errors in sorted(errors.items())},
+    )
@@ -247,7 +247,8 @@ class CollectiveOfferNotFound(Exception):
     pass
 
 
-class UnapplicableModel(Exception): ...  # pylint: disable=multiple-statements
+class UnsupportedOfferValidationSubRule(Exception):
+    """Raised when a sub-rule cannot be translated into SQL."""
 
 
 class UnexpectedCinemaProvider(Exception):
@@ -732,7 +732,9 @@ class Offer(PcObject, Base, Model, DeactivableMixin, ValidationMixin, Accessibil
 
     @property
     def visibleText(self) -> str:  # used in validation rule, do not remove
-        return f"{self.name} {self.description}"
+        # Must match the SQL translation in `validation_rules`: a missing
+        # description is an empty string, not "None".
+        return f"{self.name} {self.description or ''}"
 
     @hybrid_property
     def status(self) -> OfferStatus:
@@ -1059,6 +1061,31 @@ class BookMacroSection(PcObject, Base, Model):
     section: str = sa.Column(sa.Text, nullable=False, unique=True)
 
 
+class OfferLast30DaysBookingCount(Base, Model):
+    """Number of non-cancelled bookings of each offer over the last 30
+    days, used when indexing offers.
+
+    Counts are incremented and decremented by a trigger on the
+    `booking` table (see `Booking.trig_update_offer_booking_count_ddl`),
+    and recomputed by a cron job, which also takes care of bookings
+    that leave the 30-day window. Offers without any recent booking
+    may not have a row.
+
+    The trigger locks the row of the offer until the booking transaction
+    ends. Bookings of the same stock are already serialized by the lock
+    on the stock (see `get_and_lock_stock()`), and booking transactions
+    are short: this only adds contention between bookings of different
+    stocks of the same offer, which is acceptable.
+    """
+
+    __tablename__ = "offer_last_30_days_booking_count"
+
+    offerId: int = sa.Column(
+        sa.BigInteger, sa.ForeignKey("offer.id", ondelete="CASCADE"), primary_key=True, nullable=False
+    )
+    bookingCount: int = sa.Column(sa.Integer, nullable=False, server_default="0")
+
+
 class PriceCategoryLabel(PcObject, Base, Model):
     label: str = sa.Column(sa.Text(), nullable=False)
     priceCategory: sa_orm.Mapped["PriceCategory"] = sa.orm.relationship(
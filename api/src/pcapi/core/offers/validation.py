@@ -116,7 +116,12 @@ def check_stocks_price(
         check_stock_price(price, offer, error_key)
 
 
-def check_stock_price(price: decimal.Decimal, offer: models.Offer, error_key: str = "price") -> None:
+def check_stock_price(
+    price: decimal.Decimal,
+    offer: models.Offer,
+    error_key: str = "price",
+    has_custom_reimbursement_rule: bool | None = None,
+) -> None:
     if price < 0:
         errors = api_errors.ApiErrors()
         errors.add_error(error_key, "Le prix doit être positif")
@@ -134,7 +139,9 @@ def check_stock_price(price: decimal.Decimal, offer: models.Offer, error_key: st
     # Cache this part to avoid N+1 when creating many stocks on the same offer.
     cache_attribute = f"_cached_checked_custom_reimbursement_rules_{offer.id}"
     if not flask.has_request_context() or not getattr(flask.request, cache_attribute, False):
-        if finance_repository.has_active_or_future_custom_reimbursement_rule(offer):
+        if has_custom_reimbursement_rule is None:
+            has_custom_reimbursement_rule = finance_repository.has_active_or_future_custom_reimbursement_rule(offer)
+        if has_custom_reimbursement_rule:
             # We obviously look for active rules, but also future ones: if
             # a reimbursement rule has been negotiated that will enter in
             # effect tomorrow, we don't want to let the offerer change its
@@ -0,0 +1,350 @@
+"""Compile offer validation rules into Python predicates.
+
+Active rules and their sub-rules are loaded and compiled once, then
+cached in each process for `settings.OFFER_VALIDATION_RULES_CACHE_TTL`
+seconds. Editing a rule in the backoffice must call
+`invalidate_offer_validation_rules_cache()`, so that all processes
+compile the new rules.
+
+Compiled rules only hold plain data (ids and closures), never ORM
+objects, so that they can be shared across requests and sessions.
+
+Rules can also be translated into SQL filters on individual offers
+(see `simulate_rule()`), so that reviewers can see how many existing
+offers a rule would flag.
+"""
+
+import dataclasses
+import decimal
+import operator
+import typing
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from pcapi import settings
+from pcapi.core.categories import subcategories_v2 as subcategories
+from pcapi.core.educational import models as educational_models
+from pcapi.core.offerers import models as offerers_models
+from pcapi.core.offers import exceptions
+from pcapi.core.offers import models
+from pcapi.models import db
+from pcapi.utils import cache as cache_utils
+from pcapi.utils.custom_logic import compile_operation
+from pcapi.utils.custom_logic import sanitize_str
+
+
+if typing.TYPE_CHECKING:
+    from pcapi.core.offers.api import AnyOffer
+
+
+INVALIDATION_CHANNEL = "offer_validation_rules:invalidation"
+
+OFFER_LIKE_MODELS = {
+    models.OfferValidationModel.OFFER,
+    models.OfferValidationModel.COLLECTIVE_OFFER,
+    models.OfferValidationModel.COLLECTIVE_OFFER_TEMPLATE,
+}
+
+Predicate = typing.Callable[["AnyOffer"], bool]
+
+
+class _Unapplicable:
+    """Returned by getters when a sub-rule does not apply to an offer."""
+
+
+_UNAPPLICABLE = _Unapplicable()
+
+
+@dataclasses.dataclass(frozen=True)
+class CompiledRule:
+    id: int
+    name: str
+    sub_rules: tuple[Predicate, ...]
+
+    def flags_offer(self, offer: "AnyOffer") -> bool:
+        return all(sub_rule(offer) for sub_rule in self.sub_rules)
+
+
+def _get_object_getter(model: models.OfferValidationModel) -> typing.Callable[["AnyOffer"], typing.Any]:
+    if model in OFFER_LIKE_MODELS:
+        return lambda offer: offer if type(offer).__name__ == model.value else _UNAPPLICABLE
+    if model == models.OfferValidationModel.COLLECTIVE_STOCK:
+        return lambda offer: (
+            offer.collectiveStock if isinstance(offer, educational_models.CollectiveOffer) else _UNAPPLICABLE
+        )
+    if model == models.OfferValidationModel.VENUE:
+        return operator.attrgetter("venue")
+    if model == models.OfferValidationModel.OFFERER:
+        return operator.attrgetter("venue.managingOfferer")
+    return lambda offer: _UNAPPLICABLE
+
+
+def compile_sub_rule(sub_rule: models.OfferValidationSubRule) -> Predicate:
+    """Compile a sub-rule into a predicate, that applies its operator
+    to the attribute of the offer (or of its stock, venue or offerer).
+
+    The predicate returns False when the model of the sub-rule does not
+    apply to the offer (e.g. a `CollectiveOffer` sub-rule on an `Offer`).
+    """
+    apply_operation = compile_operation(sub_rule.operator.value, sub_rule.comparated["comparated"])
+
+    if not sub_rule.model:
+        return lambda offer: apply_operation(type(offer).__name__)
+
+    get_object = _get_object_getter(sub_rule.model)
+    get_attribute = operator.attrgetter(sub_rule.attribute.value)
+
+    def predicate(offer: "AnyOffer") -> bool:
+        object_to_compare = get_object(offer)
+        if object_to_compare is _UNAPPLICABLE:
+            return False
+        return apply_operation(get_attribute(object_to_compare))
+
+    return predicate
+
+
+def compile_rule(rule: models.OfferValidationRule) -> CompiledRule:
+    return CompiledRule(
+        id=rule.id,
+        name=rule.name,
+        sub_rules=tuple(compile_sub_rule(sub_rule) for sub_rule in rule.subRules),
+    )
+
+
+_rules_cache: cache_utils.InvalidatedProcessCache[list[CompiledRule]] = cache_utils.InvalidatedProcessCache(
+    INVALIDATION_CHANNEL, lambda: settings.OFFER_VALIDATION_RULES_CACHE_TTL
+)
+
+
+def get_compiled_rules() -> list[CompiledRule]:
+    """Return all active rules, compiled."""
+    if settings.OFFER_VALIDATION_RULES_CACHE_TTL:
+        _rules_cache.start_invalidation_listener()
+        compiled_rules = _rules_cache.get()
+        if compiled_rules is not None:
+            return compiled_rules
+    rules = (
+        models.OfferValidationRule.query.options(sa.orm.joinedload(models.OfferValidationRule.subRules))
+        .filter(models.OfferValidationRule.isActive.is_(True))
+        .order_by(models.OfferValidationRule.id)
+        .all()
+    )
+    compiled_rules = [compile_rule(rule) for rule in rules]
+    if settings.OFFER_VALIDATION_RULES_CACHE_TTL:
+        _rules_cache.set(compiled_rules)
+    return compiled_rules
+
+
+def invalidate_offer_validation_rules_cache() -> None:
+    """Clear the compiled rules in this process and ask other processes
+    to clear theirs.
+    """
+    _rules_cache.invalidate()
+
+
+def get_flagging_rule_ids(offers: typing.Sequence["AnyOffer"]) -> list[list[int]]:
+    """Return the ids of the rules that flag each offer (in the same
+    order as `offers`).
+    """
+    compiled_rules = get_compiled_rules()
+    return [[rule.id for rule in compiled_rules if rule.flags_offer(offer)] for offer in offers]
+
+
+# SQL translation of rules, to simulate a rule over existing individual
+# offers. Strings are compared once lowercased and unaccented, like
+# `custom_logic.sanitize_str()` does.
+
+SIMULATION_SAMPLE_SIZE = 20
+
+_TEXT = "text"
+_NUMBER = "number"
+
+
+@dataclasses.dataclass
+class RuleSimulation:
+    count: int
+    sample: list[models.Offer]
+
+
+def _negate(clause: sa.sql.ColumnElement) -> sa.sql.ColumnElement:
+    # A NULL attribute makes the positive clause NULL, whereas the
+    # negated Python operation is true.
+    return sa.not_(sa.func.coalesce(clause, sa.false()))
+
+
+def _is_number(value: typing.Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _get_text_filter(
+    expression: sa.sql.ColumnElement, operator_: models.OfferValidationRuleOperator, comparated: typing.Any
+) -> sa.sql.ColumnElement:
+    Operator = models.OfferValidationRuleOperator
+    sanitized = sa.func.unaccent(sa.func.lower(expression), type_=sa.Text)
+    if operator_ in (Operator.EQUALS, Operator.NOT_EQUALS):
+        if comparated is None:
+            clause = expression.is_(None)
+        elif isinstance(comparated, str):
+            clause = sanitized == sanitize_str(comparated)
+        else:
+            clause = sa.false()
+        return clause if operator_ == Operator.EQUALS else _negate(clause)
+    if not isinstance(comparated, list) or not all(isinstance(value, str) for value in comparated):
+        raise exceptions.UnsupportedOfferValidationSubRule(f"Unexpected value for '{operator_.value}': {comparated}")
+    values = [sanitize_str(value) for value in comparated]
+    if operator_ in (Operator.IN, Operator.NOT_IN):
+        clause = sanitized.in_(values)
+        return clause if operator_ == Operator.IN else _negate(clause)
+    if not values:
+        return sa.false()
+    if operator_ == Operator.CONTAINS:
+        return sa.and_(expression != "", sa.or_(*(sanitized.contains(value, autoescape=True) for value in values)))
+    if operator_ == Operator.CONTAINS_EXACTLY:
+        words = sa.func.regexp_split_to_array(sa.func.btrim(sanitized), r"\s+", type_=postgresql.ARRAY(sa.Text))
+        return words.overlap(sa.cast(postgresql.array(values), postgresql.ARRAY(sa.Text)))
+    raise exceptions.UnsupportedOfferValidationSubRule(f"Operator '{operator_.value}' is not supported on text")
+
+
+def _get_number_filter(
+    expression: sa.sql.ColumnElement, operator_: models.OfferValidationRuleOperator, comparated: typing.Any
+) -> sa.sql.ColumnElement:
+    Operator = models.OfferValidationRuleOperator
+    if operator_ in (Operator.EQUALS, Operator.NOT_EQUALS):
+        if comparated is None:
+            clause = expression.is_(None)
+        elif _is_number(comparated):
+            clause = expression == comparated
+        else:
+            clause = sa.false()
+        return clause if operator_ == Operator.EQUALS else _negate(clause)
+    if operator_ in (Operator.IN, Operator.NOT_IN) and isinstance(comparated, list):
+        clause = expression.in_([value for value in comparated if _is_number(value)])
+        return clause if operator_ == Operator.IN else _negate(clause)
+    if not _is_number(comparated):
+        raise exceptions.UnsupportedOfferValidationSubRule(f"Unexpected value for '{operator_.value}': {comparated}")
+    match operator_:
+        case Operator.GREATER_THAN:
+            return expression > comparated
+        case Operator.GREATER_THAN_OR_EQUAL_TO:
+            return expression >= comparated
+        case Operator.LESS_THAN:
+            return expression < comparated
+        case Operator.LESS_THAN_OR_EQUAL_TO:
+            return expression <= comparated
+    raise exceptions.UnsupportedOfferValidationSubRule(f"Operator '{operator_.value}' is not supported on numbers")
+
+
+def _get_column_kind(column: typing.Any) -> str:
+    try:
+        python_type = column.type.python_type
+    except (AttributeError, NotImplementedError):
+        python_type = None
+    if python_type is str:
+        return _TEXT
+    if python_type in (int, float, decimal.Decimal):
+        return _NUMBER
+    raise exceptions.UnsupportedOfferValidationSubRule(f"Unsupported attribute: {column}")
+
+
+def _get_offer_attribute(attribute: models.OfferValidationAttribute) -> tuple[sa.sql.ColumnElement, str]:
+    Attribute = models.OfferValidationAttribute
+    match attribute:
+        case Attribute.MAX_PRICE:
+            max_price = (
+                sa.select(sa.func.coalesce(sa.func.max(models.Stock.price), 0))
+                .where(models.Stock.offerId == models.Offer.id, models.Stock.isSoftDeleted.is_(False))
+                .correlate(models.Offer)
+                .scalar_subquery()
+            )
+            return max_price, _NUMBER
+        case Attribute.TEXT:
+            # Same as `Offer.visibleText`.
+            return sa.func.concat(models.Offer.name, " ", sa.func.coalesce(models.Offer.description, "")), _TEXT
+        case Attribute.SHOW_SUB_TYPE:
+            return models.Offer.extraData["showSubType"].astext, _TEXT
+    column = getattr(models.Offer, attribute.value, None)
+    if not isinstance(column, sa.orm.attributes.InstrumentedAttribute):
+        raise exceptions.UnsupportedOfferValidationSubRule(f"Unsupported attribute of Offer: {attribute.value}")
+    return column, _get_column_kind(column)
+
+
+def _get_subcategory_filter(sub_rule: models.OfferValidationSubRule) -> sa.sql.ColumnElement:
+    # Categories and subcategories are known in advance: apply the
+    # operation in Python on each subcategory instead.
+    predicate = compile_operation(sub_rule.operator.value, sub_rule.comparated["comparated"])
+    if sub_rule.attribute == models.OfferValidationAttribute.CATEGORY_ID:
+        subcategory_ids = [s.id for s in subcategories.ALL_SUBCATEGORIES if predicate(s.category.id)]
+    else:
+        subcategory_ids = [s.id for s in subcategories.ALL_SUBCATEGORIES if predicate(s.id)]
+    return models.Offer.subcategoryId.in_(subcategory_ids)
+
+
+def get_sub_rule_offer_filter(sub_rule: models.OfferValidationSubRule) -> sa.sql.ColumnElement:
+    """Return a SQL filter on `Offer`, that selects the individual
+    offers that the sub-rule flags.
+    """
+    comparated = sub_rule.comparated["comparated"]
+    if not sub_rule.model:
+        return sa.true() if compile_operation(sub_rule.operator.value, comparated)("Offer") else sa.false()
+
+    if sub_rule.model == models.OfferValidationModel.OFFER:
+        if sub_rule.attribute in (
+            models.OfferValidationAttribute.CATEGORY_ID,
+            models.OfferValidationAttribute.SUBCATEGORY_ID,
+        ):
+            return _get_subcategory_filter(sub_rule)
+        expression, kind = _get_offer_attribute(sub_rule.attribute)
+    elif sub_rule.model in (models.OfferValidationModel.VENUE, models.OfferValidationModel.OFFERER):
+        model = (
+            offerers_models.Venue if sub_rule.model == models.OfferValidationModel.VENUE else offerers_models.Offerer
+        )
+        column = getattr(model, sub_rule.attribute.value, None)
+        if not isinstance(column, sa.orm.attributes.InstrumentedAttribute):
+            raise exceptions.UnsupportedOfferValidationSubRule(
+                f"Unsupported attribute of {sub_rule.model.value}: {sub_rule.attribute.value}"
+            )
+        expression, kind = column, _get_column_kind(column)
+    else:
+        # Collective models and stocks do not apply to individual offers.
+        return sa.false()
+
+    if kind == _TEXT:
+        clause = _get_text_filter(expression, sub_rule.operator, comparated)
+    else:
+        clause = _get_number_filter(expression, sub_rule.operator, comparated)
+
+    if sub_rule.model == models.OfferValidationModel.VENUE:
+        return models.Offer.venueId.in_(sa.select(offerers_models.Venue.id).where(clause))
+    if sub_rule.model == models.OfferValidationModel.OFFERER:
+        return models.Offer.venueId.in_(
+            sa.select(offerers_models.Venue.id)
+            .join(offerers_models.Offerer, offerers_models.Venue.managingOfferer)
+            .where(clause)
+        )
+    return clause
+
+
+def get_rule_offer_filter(rule: models.OfferValidationRule) -> sa.sql.ColumnElement:
+    return sa.and_(sa.true(), *(get_sub_rule_offer_filter(sub_rule) for sub_rule in rule.subRules))
+
+
+def simulate_rule(rule: models.OfferValidationRule, sample_size: int = SIMULATION_SAMPLE_SIZE) -> RuleSimulation:
+    """Count the existing individual offers that the rule would flag,
+    and return the most recent ones, with a single query.
+
+    The rule does not need to be active, nor even saved.
+    """
+    count = sa.func.count().over().label("count")
+    rows = (
+        db.session.query(models.Offer, count)
+        .filter(get_rule_offer_filter(rule))
+        .options(
+            sa.orm.load_only(models.Offer.id, models.Offer.name, models.Offer.venueId, models.Offer.validation),
+            sa.orm.joinedload(models.Offer.venue).load_only(offerers_models.Venue.id, offerers_models.Venue.name),
+        )
+        .order_by(models.Offer.id.desc())
+        .limit(sample_size)
+        .all()
+    )
+    return RuleSimulation(count=rows[0].count if rows else 0, sample=[row.Offer for row in rows])
@@ -1,48 +1,16 @@
 import csv
-import json
-import os.path
 from pathlib import Path
 import typing
 from typing import TypedDict
 
-
-# Black is only used for the `flask update_gtl` command, which is only
-# used on development environments. We don't need (and thus don't
-# install) Black on production Docker image.
-try:
-    import black
-
-    HAS_BLACK = True
-except ImportError:
-    HAS_BLACK = False
-
 from pcapi import settings
 
 
 DIRECTORY = Path(__file__).resolve().parent
-FILENAME = "titelive_gtl.py"
+FILENAME = "titelive_gtl.tsv"
 FILE_PATH = DIRECTORY / FILENAME
 
 HEADER_LINES_COUNT = 2
-HEADER_DOCUMENTATION = f"""
-# pylint: skip-file
-# This source was generated 
-# DO NOT EDIT !
-# 
-# Tite live will provide an updated list of GTLs in an Excel file, a few times per year. In order to regenerate our Python file:
-# 
-# 1. Export the new Excel file to a CSV file with tab separators:
-#   - It should be exported totally without any edition
-#   - You should have {HEADER_LINES_COUNT} header rows
-#   - As an example, you can check GTL_2023.xlsx here: https://www.notion.so/passcultureapp/Mise-jour-de-titelive_things-synchronisation-version-2019-19-cddfb66ac8ee4e1bb935a40e7a8fa0e4 
-# 2. Run the following command:
-#     flask update_gtl --file GTL_2023.csv
-#
-# Intermediate levels:
-# - When value of level_02_code, level_03_code and level_04_code, level_02_code and level_03_code and level_04_code is "00", it means it is an intermediate GTL,
-# - When you have an intermediate GTL, level_02_label, level_03_label and level_04_label may be None.
-# 
-"""
 
 COLUMN_INDICES = {
     "LEVEL_01_LABEL": 1,
@@ -92,34 +60,33 @@ def _get_gtls_from_csv_reader(reader: typing.Any) -> dict[str, Gtl]:
     return gtls
 
 
+def write_gtls_to_file(gtls: dict[str, Gtl], path: Path = FILE_PATH) -> None:
+    """Write GTLs in the format read by `titelive_gtl`: one GTL per line,
+    sorted by id, with tab-separated id, label and labels of each
+    level (empty when missing).
+    """
+    with open(path, "w", newline="", encoding="utf-8") as gtl_file:
+        writer = csv.writer(gtl_file, delimiter="\t", lineterminator="\n", quoting=csv.QUOTE_NONE)
+        for gtl_id in sorted(gtls):
+            gtl = gtls[gtl_id]
+            writer.writerow(
+                (
+                    gtl_id,
+                    gtl["label"],
+                    gtl["level_01_label"],
+                    gtl["level_02_label"] or "",
+                    gtl["level_03_label"] or "",
+                    gtl["level_04_label"] or "",
+                )
+            )
+
+
 def generate_titelive_gtl_from_file(file: str) -> None:
     if not settings.IS_DEV:
         raise RuntimeError("Not DEV environment")
-    assert HAS_BLACK
-
-    import_str = "from .titelive_utils import Gtl"
-    method_str = """
-def get_gtl(gtl_id: str) -> Gtl | None:
-    gtl_id_8chars = gtl_id.zfill(8)
-    return GTLS.get(gtl_id_8chars)
-    """
 
     with open(file, newline="", encoding="utf-8") as gtl_csv_file:
         gtl_reader = csv.reader(gtl_csv_file, delimiter="\t")
         gtls = _get_gtls_from_csv_reader(gtl_reader)
 
-        if not os.path.isdir(DIRECTORY):
-            os.mkdir(DIRECTORY)
-
-        with open(FILE_PATH, "w", encoding="utf-8") as gtl_python_file:
-            gtl_file_content = black.format_str(
-                f"""{HEADER_DOCUMENTATION}
-{import_str}
-{method_str}
-GTLS: dict[str, Gtl] = {json.dumps(gtls).encode('ascii').decode('unicode-escape')}
-""".replace(
-                    ": null", ": None"  # To replace all null (JSON) with None (Python)
-                ),
-                mode=black.FileMode(),
-            )
-            gtl_python_file.write(gtl_file_content)
+    write_gtls_to_file(gtls)
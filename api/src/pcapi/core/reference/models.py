@@ -1,4 +1,5 @@
 import logging
+import typing
 
 import psycopg2.errors
 import sqlalchemy as sqla
@@ -81,7 +82,7 @@ class ReferenceScheme(Base, Model):
                 .one()
             )
 
-    def increment_after_use(self) -> None:
+    def increment_after_use(self, count: int = 1) -> None:
         # Here we do NOT wait for the lock to be available. If we're
         # trying to increment the reference while it's being locked by
         # another transaction, it means that the current code path did
@@ -90,7 +91,7 @@ class ReferenceScheme(Base, Model):
         # fail now. It could indicate a bug.
         try:
             self.query.with_for_update(nowait=True).filter_by(id=self.id).update(
-                {"nextNumber": ReferenceScheme.nextNumber + 1}
+                {"nextNumber": ReferenceScheme.nextNumber + count}
             )
         except sqla_exc.OperationalError as exc:
             if isinstance(exc.orig, psycopg2.errors.LockNotAvailable):
@@ -100,11 +101,21 @@ class ReferenceScheme(Base, Model):
 
     @property
     def formatted_reference(self) -> str:
+        return self._format_reference(self.nextNumber)
+
+    def get_formatted_references(self, count: int) -> list[str]:
+        """Return the next ``count`` references. The caller must then
+        call `increment_after_use(count)`.
+        """
+        next_number = typing.cast(int, self.nextNumber)
+        return [self._format_reference(next_number + offset) for offset in range(count)]
+
+    def _format_reference(self, number: int | None) -> str:
         # e.g. "F230000001" or "X0001"
         # fmt: off
         return (
             f"{self.prefix}"
             f"{self.year % 2000 if self.year else ''}"
-            f"{self.nextNumber:0{self.numberPadding}}"
+            f"{number:0{self.numberPadding}}"
         )
         # fmt: on
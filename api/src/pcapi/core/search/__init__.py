@@ -3,6 +3,8 @@ import dataclasses
 import datetime
 import enum
 import logging
+import multiprocessing
+import os
 from typing import Iterable
 
 from flask_sqlalchemy import BaseQuery
@@ -208,7 +210,11 @@ def async_index_offers_of_venue_ids(
         )
 
 
-def index_offers_in_queue(stop_only_when_empty: bool = False, from_error_queue: bool = False) -> None:
+def index_offers_in_queue(
+    stop_only_when_empty: bool = False,
+    from_error_queue: bool = False,
+    worker_id: str | None = None,
+) -> None:
     """Pop offers from indexation queue and reindex them.
 
     If ``from_error_queue`` is True, pop offers from the error queue
@@ -225,12 +231,16 @@ def index_offers_in_queue(stop_only_when_empty: bool = False, from_error_queue:
     If ``stop_only_when_empty`` is True (i.e. if called manually to
     process the whole queue), we pop from the queue and stop only when
     the queue is empty.
+
+    ``worker_id`` must be given if this function is run in multiple
+    processes at the same time, see `index_offers_in_queue_in_parallel()`.
     """
     backend = _get_backend()
     while True:
         with backend.pop_offer_ids_from_queue(
             count=settings.REDIS_OFFER_IDS_CHUNK_SIZE,
             from_error_queue=from_error_queue,
+            worker_id=worker_id,
         ) as offer_ids:
             if not offer_ids:
                 break
@@ -259,6 +269,57 @@ def index_offers_in_queue(stop_only_when_empty: bool = False, from_error_queue:
             break
 
 
+def index_offers_in_queue_in_parallel(
+    worker_count: int,
+    stop_only_when_empty: bool = False,
+    from_error_queue: bool = False,
+) -> None:
+    """Pop offers from indexation queue and reindex them, in
+    ``worker_count`` processes.
+
+    Each worker pops its own batches and moves them to its own
+    processing queue, so that workers never process the same batch.
+    If a worker crashes, its batch is moved back to the indexation
+    queue by `clean_processing_queues` (as for a single process).
+    """
+    if worker_count <= 1:
+        index_offers_in_queue(stop_only_when_empty=stop_only_when_empty, from_error_queue=from_error_queue)
+        return
+
+    # Forked workers must not share database connections with the
+    # parent process: they will open their own. (The Redis connection
+    # pool already handles forks.)
+    db.session.remove()
+    db.engine.dispose()
+
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(
+            target=index_offers_in_queue,
+            kwargs={
+                "stop_only_when_empty": stop_only_when_empty,
+                "from_error_queue": from_error_queue,
+                "worker_id": f"{os.getpid()}-{index}",
+            },
+            name=f"offer-indexation-worker-{index}",
+        )
+        for index in range(worker_count)
+    ]
+    for worker in workers:
+        worker.start()
+    logger.info(
+        "Started offer indexation workers",
+        extra={"worker_count": worker_count, "from_error_queue": from_error_queue},
+    )
+    for worker in workers:
+        worker.join()
+        if worker.exitcode != 0:
+            logger.error(
+                "Offer indexation worker failed",
+                extra={"worker": worker.name, "exitcode": worker.exitcode},
+            )
+
+
 def index_all_collective_offers_and_templates() -> None:
     """Force reindexation of all collective offers and templates."""
     backend = _get_backend()
@@ -468,6 +529,20 @@ class BookingsCount:
 def get_offers_booking_count_by_id(
     offer_ids: Iterable[int], days: int = DEFAULT_DAYS_FOR_LAST_BOOKINGS
 ) -> dict[int, int]:
+    if days == DEFAULT_DAYS_FOR_LAST_BOOKINGS and FeatureToggle.ENABLE_OFFER_BOOKING_COUNT_TABLE.is_active():
+        # Read precomputed counts instead of aggregating bookings.
+        return dict(
+            offers_models.OfferLast30DaysBookingCount.query.join(offers_models.Offer)
+            .filter(
+                offers_models.OfferLast30DaysBookingCount.offerId.in_(offer_ids),
+                offers_models.OfferLast30DaysBookingCount.bookingCount > 0,
+                offers_models.Offer.isActive.is_(True),
+            )
+            .with_entities(
+                offers_models.OfferLast30DaysBookingCount.offerId,
+                offers_models.OfferLast30DaysBookingCount.bookingCount,
+            )
+        )
     offer_booked_since_x_days = (
         offers_models.Offer.query.join(offers_models.Offer.stocks)
         .outerjoin(offers_models.Offer.product)
@@ -725,33 +800,80 @@ def update_products_last_30_days_booking_count() -> None:
         )
 
 
-def update_product_last_30_days_bookings() -> list[offers_models.Product]:
+def update_product_last_30_days_bookings() -> list[str]:
+    """Update booking counts of products from the counts by EAN, and
+    return EANs of updated products.
+    """
     booking_count_by_ean = get_last_30_days_bookings_for_eans()
+    eans = list(booking_count_by_ean)
     updated_eans = []
-    current_product_batch = []
-
-    batch_size = 100
-    for batch in range(0, len(booking_count_by_ean), batch_size):
-        ean_batch = list(booking_count_by_ean.keys())[batch : batch + batch_size]
-        for product in db.session.query(offers_models.Product).filter(
-            offers_models.Product.extraData["ean"].astext.in_(ean_batch)
-        ):
-            ean = product.extraData["ean"]
-            old_last_x_days_booking = product.last_30_days_booking
-            updated_last_x_days_booking = booking_count_by_ean.get(ean)
-
-            if old_last_x_days_booking != updated_last_x_days_booking:
-                product.last_30_days_booking = updated_last_x_days_booking
-                updated_eans.append(ean)
-                current_product_batch.append(product)
-        db.session.add_all(current_product_batch)
+
+    batch_size = 1000
+    for batch in range(0, len(eans), batch_size):
+        ean_batch = eans[batch : batch + batch_size]
+        # A single set-based statement per batch: only products whose
+        # count has changed are updated (and returned).
+        updated_eans_batch = [
+            ean
+            for ean, in db.session.execute(
+                sa.text(
+                    """
+                    UPDATE product
+                    SET last_30_days_booking = booking_count.count
+                    FROM unnest(CAST(:eans AS text[]), CAST(:counts AS integer[])) AS booking_count(ean, count)
+                    WHERE product."jsonData"->>'ean' = booking_count.ean
+                    AND product.last_30_days_booking IS DISTINCT FROM booking_count.count
+                    RETURNING booking_count.ean
+                    """
+                ),
+                {"eans": ean_batch, "counts": [booking_count_by_ean[ean] for ean in ean_batch]},
+            )
+        ]
         db.session.commit()
-        logger.info("Updated %s products", len(current_product_batch))
-        current_product_batch = []
+        updated_eans += updated_eans_batch
+        logger.info("Updated %s products", len(updated_eans_batch))
 
     return updated_eans
 
 
+def refresh_offers_last_30_days_booking_count() -> None:
+    """Recompute the number of bookings of each offer over the last 30
+    days (see `OfferLast30DaysBookingCount`).
+
+    Between two refreshes, counts are maintained by a trigger, which
+    does not know about bookings that leave the 30-day window.
+    """
+    since = datetime.datetime.utcnow() - datetime.timedelta(days=DEFAULT_DAYS_FOR_LAST_BOOKINGS)
+    result = db.session.execute(
+        sa.text(
+            f"""
+            WITH booking_count AS (
+                SELECT stock."offerId", count(*) AS count
+                FROM booking
+                JOIN stock ON stock.id = booking."stockId"
+                WHERE booking."dateCreated" >= :since
+                AND booking.status != '{bookings_models.BookingStatus.CANCELLED.value}'
+                GROUP BY stock."offerId"
+            ), deleted AS (
+                DELETE FROM offer_last_30_days_booking_count
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM booking_count
+                    WHERE booking_count."offerId" = offer_last_30_days_booking_count."offerId"
+                )
+            )
+            INSERT INTO offer_last_30_days_booking_count ("offerId", "bookingCount")
+            SELECT "offerId", count FROM booking_count
+            ON CONFLICT ("offerId") DO UPDATE
+            SET "bookingCount" = EXCLUDED."bookingCount"
+            WHERE offer_last_30_days_booking_count."bookingCount" != EXCLUDED."bookingCount"
+            """
+        ),
+        {"since": since},
+    )
+    db.session.commit()
+    logger.info("Refreshed last 30 days booking count of offers", extra={"updated_count": result.rowcount})
+
+
 def clean_processing_queues() -> None:
     backend = _get_backend()
     backend.clean_processing_queues()
@@ -1,10 +1,14 @@
+import base64
 import collections.abc
 import contextlib
 import datetime
 import decimal
 import enum
+import hashlib
+import json
 import logging
 import re
+import typing
 from typing import Iterable
 import urllib.parse
 
@@ -25,6 +29,7 @@ from pcapi.core.providers import titelive_gtl
 from pcapi.core.search.backends import base
 from pcapi.domain.music_types import MUSIC_TYPES_LABEL_BY_CODE
 from pcapi.domain.show_types import SHOW_TYPES_LABEL_BY_CODE
+from pcapi.utils import queue as queue_utils
 from pcapi.utils import requests
 import pcapi.utils.date as date_utils
 from pcapi.utils.regions import get_department_code_from_postal_code
@@ -61,6 +66,7 @@ QUEUES = (
     REDIS_COLLECTIVE_OFFER_TEMPLATE_IDS_IN_ERROR_TO_INDEX,
 )
 REDIS_HASHMAP_INDEXED_OFFERS_NAME = "indexed_offers"
+DOCUMENT_DIGEST_SIZE = 6  # bytes
 
 
 DEFAULT_LONGITUDE = 2.409289
@@ -205,7 +211,7 @@ class AlgoliaBackend(base.SearchBackend):
             return
 
         try:
-            self.redis_client.lpush(queue, *ids)
+            queue_utils.push_many(queue, ids, at_head=True)
         except redis.exceptions.RedisError:
             logger.exception("Could not add ids to indexation queue", extra={"ids": ids, "queue": queue})
 
@@ -213,12 +219,13 @@ class AlgoliaBackend(base.SearchBackend):
         self,
         count: int,
         from_error_queue: bool = False,
+        worker_id: str | None = None,
     ) -> contextlib.AbstractContextManager:
         if from_error_queue:
             queue = REDIS_OFFER_IDS_IN_ERROR_NAME
         else:
             queue = REDIS_OFFER_IDS_NAME
-        return self._pop_ids_from_queue(queue, count)
+        return self._pop_ids_from_queue(queue, count, worker_id=worker_id)
 
     def pop_venue_ids_from_queue(
         self,
@@ -264,6 +271,7 @@ class AlgoliaBackend(base.SearchBackend):
         self,
         queue: str,
         count: int,
+        worker_id: str | None = None,
     ) -> collections.abc.Generator[set[int], None, None]:
         """Return a set of int identifiers from the queue, as a
         context manager.
@@ -272,6 +280,10 @@ class AlgoliaBackend(base.SearchBackend):
         context context. It guarantees that there is no data loss if
         an error (or a complete crash) occurs while processing the
         identifiers.
+
+        ``worker_id`` should be given when multiple processes pop from
+        the same queue at the same time: it is included in the name
+        of the processing queue, so that each worker has its own.
         """
         # We must pop and not get-and-delete. Otherwise two concurrent
         # cron jobs could delete the wrong offers from the queue:
@@ -293,40 +305,50 @@ class AlgoliaBackend(base.SearchBackend):
         # queues and adds back their items to the originating queue
         # (see `clean_processing_queues`).
         timestamp = datetime.datetime.utcnow().timestamp()
-        processing_queue = f"{queue}:processing:{timestamp}"
+        if worker_id:
+            # The timestamp must stay last, see `clean_processing_queues`.
+            processing_queue = f"{queue}:processing:{worker_id}:{timestamp}"
+        else:
+            processing_queue = f"{queue}:processing:{timestamp}"
         try:
-            with self.redis_client.pipeline(transaction=True) as pipeline:
-                for _ in range(count):
-                    # Google Cloud has Redis 5.0. When it's migrated to 6.2 or
-                    # newer, we can use `lmove` or `smove` instead.
-                    pipeline.rpoplpush(queue, processing_queue)
-                results = pipeline.execute()
-                # `results` may contain `None` if there were less than {count} items.
-                batch = {int(id_) for id_ in results if id_ is not None}  # str -> int
-                logger.info(
-                    "Moved batch of object ids to index to processing queue",
-                    extra={
-                        "originating_queue": queue,
-                        "processing_queue": processing_queue,
-                        "requested_count": count,
-                        "effective_count": len(batch),
-                    },
-                )
-                yield batch
-                self.redis_client.delete(processing_queue)
-                logger.info(
-                    "Deleted processing queue",
-                    extra={
-                        "originating_queue": queue,
-                        "processing_queue": processing_queue,
-                    },
-                )
+            # Items are moved atomically and in a single round-trip,
+            # see `queue_utils.move_items()`.
+            ids = queue_utils.move_items(queue, processing_queue, count)
+            batch = {int(id_) for id_ in ids}  # str -> int
+            logger.info(
+                "Moved batch of object ids to index to processing queue",
+                extra={
+                    "originating_queue": queue,
+                    "processing_queue": processing_queue,
+                    "requested_count": count,
+                    "effective_count": len(batch),
+                },
+            )
         except redis.exceptions.RedisError:
             logger.exception(
                 "Could not pop object ids to index from queue",
                 extra={"originating_queue": queue, "processing_queue": processing_queue},
             )
             yield set()
+            return
+        yield batch
+        try:
+            queue_utils.acknowledge(processing_queue)
+        except redis.exceptions.RedisError:
+            # Not critical: items will be indexed again once
+            # `clean_processing_queues` has moved them back.
+            logger.exception(
+                "Could not delete processing queue",
+                extra={"originating_queue": queue, "processing_queue": processing_queue},
+            )
+            return
+        logger.info(
+            "Deleted processing queue",
+            extra={
+                "originating_queue": queue,
+                "processing_queue": processing_queue,
+            },
+        )
 
     def count_offers_to_index_from_queue(self, from_error_queue: bool = False) -> int:
         if from_error_queue:
@@ -358,28 +380,74 @@ class AlgoliaBackend(base.SearchBackend):
             # cache so that we do perform a request to Algolia.
             return True
 
-    def index_offers(self, offers: Iterable[offers_models.Offer], last_30_days_bookings: dict[int, int]) -> None:
+    def index_offers(
+        self,
+        offers: Iterable[offers_models.Offer],
+        last_30_days_bookings: dict[int, int],
+        force: bool = False,
+    ) -> None:
+        """Index offers, skipping those that have not changed since they
+        were last indexed (unless ``force`` is True).
+
+        We keep a digest of each top-level attribute of indexed
+        documents in REDIS_HASHMAP_INDEXED_OFFERS_NAME. Offers that
+        are unchanged are not sent. Offers of which only some
+        attributes have changed are partially updated. Partial updates
+        do not create missing objects: offers without a digest are
+        always saved in full, and digests are removed before offers
+        are unindexed.
+        """
         if not offers:
             return
-        objects = [self.serialize_offer(offer, last_30_days_bookings.get(offer.id) or 0) for offer in offers]
-        self.algolia_offers_client.save_objects(objects)
+        objects = {offer.id: self.serialize_offer(offer, last_30_days_bookings.get(offer.id) or 0) for offer in offers}
+        digests = {offer_id: _get_document_digest(obj) for offer_id, obj in objects.items()}
+        indexed_digests = {} if force else self._get_indexed_offer_digests(list(objects))
+
+        to_save = []
+        to_update = []
+        for offer_id, obj in objects.items():
+            changed = _get_changed_attributes(obj, digests[offer_id], indexed_digests.get(offer_id))
+            if changed is None:
+                to_save.append(obj)
+            elif changed:
+                to_update.append({"objectID": obj["objectID"]} | {key: obj[key] for key in changed})
+        if to_save:
+            self.algolia_offers_client.save_objects(to_save)
+        if to_update:
+            self.algolia_offers_client.partial_update_objects(to_update)
+        logger.info(
+            "Indexed offers",
+            extra={
+                "count": len(objects),
+                "saved_count": len(to_save),
+                "partially_updated_count": len(to_update),
+                "skipped_count": len(objects) - len(to_save) - len(to_update),
+            },
+        )
 
         try:
-            # We used to store a summary of each offer, which is why
-            # we used hashmap and not a set. But since we don't need
-            # the value anymore, we can store the lightest object
-            # possible to make Redis use less memory. In the future,
-            # we may even remove the hashmap if it's not proven useful
-            # (see log in reindex_offer_ids)
-            offer_ids = [offer.id for offer in offers]
-            pipeline = self.redis_client.pipeline(transaction=True)
-            for offer_id in offer_ids:
-                pipeline.hset(REDIS_HASHMAP_INDEXED_OFFERS_NAME, str(offer_id), "")
-            pipeline.execute()
-        except Exception:  # pylint: disable=broad-except
-            logger.exception("Could not add to list of indexed offers", extra={"offers": offer_ids})
-        finally:
-            pipeline.reset()
+            self.redis_client.hset(
+                REDIS_HASHMAP_INDEXED_OFFERS_NAME,
+                mapping={str(offer_id): digest for offer_id, digest in digests.items()},
+            )
+        except redis.exceptions.RedisError:
+            if settings.IS_RUNNING_TESTS:
+                raise
+            logger.exception("Could not add to list of indexed offers", extra={"offers": list(objects)})
+
+    def _get_indexed_offer_digests(self, offer_ids: list[int]) -> dict[int, str]:
+        try:
+            values = self.redis_client.hmget(
+                REDIS_HASHMAP_INDEXED_OFFERS_NAME, [str(offer_id) for offer_id in offer_ids]
+            )
+        except redis.exceptions.RedisError:
+            if settings.IS_RUNNING_TESTS:
+                raise
+            # Not critical: all offers will be sent to Algolia.
+            logger.exception("Could not get digests of indexed offers", extra={"offers": offer_ids})
+            return {}
+        # Offers indexed before digests were stored have an empty value.
+        return {offer_id: value for offer_id, value in zip(offer_ids, values) if value}
 
     def index_collective_offers(
         self,
@@ -410,7 +478,9 @@ class AlgoliaBackend(base.SearchBackend):
     def unindex_offer_ids(self, offer_ids: Iterable[int]) -> None:
         if not offer_ids:
             return
-        self.algolia_offers_client.delete_objects(offer_ids)
+        # Remove digests first: a digest must not outlive its object in
+        # Algolia, otherwise the next indexation of the offer would be a
+        # partial update, which does not create the object.
         try:
             self.redis_client.hdel(
                 REDIS_HASHMAP_INDEXED_OFFERS_NAME,
@@ -420,9 +490,10 @@ class AlgoliaBackend(base.SearchBackend):
             if settings.IS_RUNNING_TESTS:
                 raise
             logger.exception("Could not remove offers from indexed offers set", extra={"offers": offer_ids})
+        self.algolia_offers_client.delete_objects(offer_ids)
 
     def unindex_all_offers(self) -> None:
-        self.algolia_offers_client.clear_objects()
+        # See `unindex_offer_ids()` about the order.
         try:
             self.redis_client.delete(REDIS_HASHMAP_INDEXED_OFFERS_NAME)
         except redis.exceptions.RedisError:
@@ -431,6 +502,7 @@ class AlgoliaBackend(base.SearchBackend):
             logger.exception(
                 "Could not clear indexed offers cache",
             )
+        self.algolia_offers_client.clear_objects()
 
     def unindex_venue_ids(self, venue_ids: Iterable[int]) -> None:
         if not venue_ids:
@@ -566,7 +638,7 @@ class AlgoliaBackend(base.SearchBackend):
                 "subcategoryId": offer.subcategory.id,
                 "thumbUrl": url_path(offer.thumbUrl) if offer.thumbUrl else None,
                 "tags": tags,
-                "times": list(times),
+                "times": sorted(times),
                 "visa": extra_data.get("visa"),
             },
             "offerer": {
@@ -721,36 +793,30 @@ class AlgoliaBackend(base.SearchBackend):
         """
         redis_client = current_app.redis_client
         for originating_queue in QUEUES:
-            # There a very few queues, no need to paginate with `_cursor`.
-            _cursor, processing_queues = redis_client.scan(0, f"{originating_queue}:processing:*")
-            for processing_queue in processing_queues:
+            # There may be one processing queue per indexation worker:
+            # iterate over the whole keyspace, not only the first page.
+            for processing_queue in redis_client.scan_iter(f"{originating_queue}:processing:*"):
                 timestamp = float(processing_queue.rsplit(":")[-1])
                 if timestamp > datetime.datetime.utcnow().timestamp() - 60 * 60:
                     continue  # less than 1 hour ago, too recent, could still be processing
-                with redis_client.pipeline(transaction=True) as pipeline:
-                    try:
-                        count = redis_client.llen(processing_queue)
-                        for _i in range(count):
-                            # Google Cloud has Redis 5.0. When it's migrated to 6.2 or
-                            # newer, we can use `lmove` or `smove` instead.
-                            pipeline.rpoplpush(processing_queue, originating_queue)
-                            pipeline.execute()
-                    except Exception:  # pylint: disable=broad-exception-caught
-                        # That's not critical: the processing queue will
-                        # still be here, and can be handled in the next run
-                        # of this function. But we raise a warning because
-                        # it may denote a problem with our code or with
-                        # Redis.
-                        logger.exception(
-                            "Failed to handle indexation processing queue: %s (will try again)",
-                            processing_queue,
-                            exc_info=True,
-                        )
-                    else:
-                        logger.info(
-                            "Found old processing queue, moved back items to originating queue",
-                            extra={"queue": originating_queue, "processing_queue": processing_queue},
-                        )
+                try:
+                    ids = queue_utils.move_items(processing_queue, originating_queue, -1)
+                except Exception:  # pylint: disable=broad-exception-caught
+                    # That's not critical: the processing queue will
+                    # still be here, and can be handled in the next run
+                    # of this function. But we raise a warning because
+                    # it may denote a problem with our code or with
+                    # Redis.
+                    logger.exception(
+                        "Failed to handle indexation processing queue: %s (will try again)",
+                        processing_queue,
+                        exc_info=True,
+                    )
+                else:
+                    logger.info(
+                        "Found old processing queue, moved back items to originating queue",
+                        extra={"queue": originating_queue, "processing_queue": processing_queue, "count": len(ids)},
+                    )
 
     def remove_duplicates_from_venue_indexation_queue(self) -> None:
         """Pop items from the REDIS_VENUE_IDS_TO_INDEX, remove
@@ -766,7 +832,7 @@ class AlgoliaBackend(base.SearchBackend):
             if not venue_ids:
                 return
             # At this point, `venue_ids` is the set of deduplicated ids.
-            self.redis_client.lpush(queue, *venue_ids)
+            queue_utils.push_many(queue, venue_ids, at_head=True)
             logger.info(
                 "Deduplicated ids in venue indexation queue",
                 extra={
@@ -776,6 +842,38 @@ class AlgoliaBackend(base.SearchBackend):
             )
 
 
+def _get_digest(value: typing.Any) -> str:
+    digest = hashlib.blake2b(json.dumps(value, sort_keys=True, default=str).encode(), digest_size=DOCUMENT_DIGEST_SIZE)
+    return base64.urlsafe_b64encode(digest.digest()).decode()
+
+
+def _get_document_digest(document: dict) -> str:
+    """Return a digest of each top-level attribute of the document
+    (except its id), which is what Algolia partial updates replace.
+
+    It is stored for each indexed offer in Redis, hence a compact
+    format: a digest of the names of the attributes, followed by a
+    digest of each attribute, in the same order.
+    """
+    keys = sorted(key for key in document if key != "objectID")
+    return ":".join([_get_digest(keys)] + [_get_digest(document[key]) for key in keys])
+
+
+def _get_changed_attributes(document: dict, digest: str, indexed_digest: str | None) -> list[str] | None:
+    """Return the top-level attributes of the document that have
+    changed since it was indexed, or None if we do not know (no digest,
+    or the document had other attributes).
+    """
+    if not indexed_digest:
+        return None
+    digests = digest.split(":")
+    indexed_digests = indexed_digest.split(":")
+    if indexed_digests[0] != digests[0] or len(indexed_digests) != len(digests):
+        return None
+    keys = sorted(key for key in document if key != "objectID")
+    return [key for key, old, new in zip(keys, indexed_digests[1:], digests[1:]) if old != new]
+
+
 def position(venue: offerers_models.Venue) -> dict[str, float]:
     return format_coordinates(venue.latitude, venue.longitude)
 
@@ -40,7 +40,12 @@ class SearchBackend:
     def enqueue_venue_ids_for_offers(self, venue_ids: Iterable[int]) -> None:
         raise NotImplementedError()
 
-    def pop_offer_ids_from_queue(self, count: int, from_error_queue: bool = False) -> contextlib.AbstractContextManager:
+    def pop_offer_ids_from_queue(
+        self,
+        count: int,
+        from_error_queue: bool = False,
+        worker_id: str | None = None,
+    ) -> contextlib.AbstractContextManager:
         raise NotImplementedError()
 
     def pop_venue_ids_for_offers_from_queue(self, count: int) -> contextlib.AbstractContextManager:
@@ -52,7 +57,12 @@ class SearchBackend:
     def check_offer_is_indexed(self, offer: "offers_models.Offer") -> bool:
         raise NotImplementedError()
 
-    def index_offers(self, offers: "Iterable[offers_models.Offer]", last_30_days_bookings: dict[int, int]) -> None:
+    def index_offers(
+        self,
+        offers: "Iterable[offers_models.Offer]",
+        last_30_days_bookings: dict[int, int],
+        force: bool = False,
+    ) -> None:
         raise NotImplementedError()
 
     def index_collective_offers(self, collective_offers: "Iterable[educational_models.CollectiveOffer]") -> None:
@@ -16,6 +16,12 @@ class FakeClient:
             extra={"object_ids": [o["objectID"] for o in objects]},
         )
 
+    def partial_update_objects(self, objects: typing.Iterable[dict]) -> None:
+        logger.info(
+            "Dummy partial update of objects",
+            extra={"object_ids": [o["objectID"] for o in objects]},
+        )
+
     def delete_objects(self, object_ids: typing.Iterable[int]) -> None:
         logger.info("Dummy deletion of objects", extra={"object_ids": object_ids})
 
@@ -15,6 +15,11 @@ class FakeClient:
         for obj in objects:
             testing.search_store[self.key][obj["objectID"]] = obj
 
+    def partial_update_objects(self, objects: typing.Iterable[dict]) -> None:
+        for obj in objects:
+            if obj["objectID"] in testing.search_store[self.key]:
+                testing.search_store[self.key][obj["objectID"]] |= obj
+
     def delete_objects(self, object_ids: typing.Iterable[int]) -> None:
         for object_id in object_ids:
             testing.search_store[self.key].pop(object_id, None)
@@ -22,10 +22,17 @@ logger = logging.getLogger(__name__)
 
 
 @blueprint.cli.command("index_offers_in_algolia_by_offer")
+@click.option(
+    "--workers",
+    help="Number of processes that reindex offers at the same time",
+    type=int,
+    default=settings.OFFER_INDEXATION_WORKER_COUNT,
+)
+@click.option("--until-empty", help="Stop only when the queue is empty", is_flag=True, default=False)
 @log_cron_with_transaction
-def index_offers_in_algolia_by_offer() -> None:
+def index_offers_in_algolia_by_offer(workers: int, until_empty: bool) -> None:
     """Pop offers from indexation queue and reindex them."""
-    search.index_offers_in_queue()
+    search.index_offers_in_queue_in_parallel(workers, stop_only_when_empty=until_empty)
 
 
 @blueprint.cli.command("index_offers_in_algolia_by_venue")
@@ -246,6 +253,15 @@ def update_products_booking_count_and_reindex_offers() -> None:
     search.update_products_last_30_days_booking_count()
 
 
+@blueprint.cli.command("refresh_offers_last_30_days_booking_count")
+@log_cron_with_transaction
+def refresh_offers_last_30_days_booking_count() -> None:
+    """Recompute the number of bookings of each offer over the last 30
+    days, which is read when indexing offers.
+    """
+    search.refresh_offers_last_30_days_booking_count()
+
+
 @blueprint.cli.command("index_offers_staging")
 @click.option("--clear", help="Clear search index first", type=bool, default=False)
 def index_offers_staging(
@@ -20,6 +20,7 @@ from pcapi import repository
 from pcapi import settings
 from pcapi.models import db
 from pcapi.models.feature import Feature
+from pcapi.models.feature import set_feature_flags
 
 
 # 1. SELECT the user session.
@@ -264,23 +265,16 @@ class override_features(TestContextDecorator):
         state = dict(
             Feature.query.filter(Feature.name.in_(self.overrides)).with_entities(Feature.name, Feature.isActive).all()
         )
-        # Yes, the following may perform multiple SQL queries. It's fine,
-        # we will probably not toggle thousands of features in each call.
-        self.apply_to_revert = {}
-        for name, status in self.overrides.items():
-            if status != state[name]:
-                self.apply_to_revert[name] = not status
-                Feature.query.filter_by(name=name).update({"isActive": status})
-                db.session.commit()
+        to_apply = {name: status for name, status in self.overrides.items() if status != state[name]}
+        self.apply_to_revert = {name: not status for name, status in to_apply.items()}
+        set_feature_flags(to_apply)
         # Clear the feature cache on request if any
         if flask.has_request_context():
             if hasattr(flask.request, "_cached_features"):
                 del flask.request._cached_features
 
     def disable(self) -> None:
-        for name, status in self.apply_to_revert.items():
-            Feature.query.filter_by(name=name).update({"isActive": status})
-            db.session.commit()
+        set_feature_flags(self.apply_to_revert)
         # Clear the feature cache on request if any
         if flask.has_request_context():
             if hasattr(flask.request, "_cached_features"):
@@ -1,25 +1,61 @@
+from collections import defaultdict
+
 import pcapi.core.offers.models as offers_models
 from pcapi.local_providers.providable_info import ProvidableInfo
 from pcapi.models import Model
 from pcapi.repository.providable_queries import get_existing_object
+from pcapi.repository.providable_queries import get_existing_objects
 from pcapi.repository.providable_queries import insert_chunk
 from pcapi.repository.providable_queries import update_chunk
+from pcapi.repository.providable_queries import upsert_chunk_with_copy
+
+
+def get_chunk_key(providable_info: ProvidableInfo) -> str:
+    return f"{providable_info.id_at_providers}|{providable_info.type.__name__}"
+
+
+def prefetch_existing_pc_objs(
+    providable_infos: list[ProvidableInfo],
+) -> dict[str, offers_models.Product | offers_models.Offer | offers_models.Stock | None]:
+    """Fetch existing objects of all given providable infos, with one
+    query per model type.
+
+    The returned dict is indexed by chunk key. Objects that do not
+    exist in the database are mapped to `None`. Keys that could not be
+    resolved unambiguously are absent and must be looked up one by one.
+    """
+    ids_by_type: dict[type, set[str]] = defaultdict(set)
+    for providable_info in providable_infos:
+        ids_by_type[providable_info.type].add(providable_info.id_at_providers)
+
+    prefetched: dict[str, offers_models.Product | offers_models.Offer | offers_models.Stock | None] = {}
+    for model_type, ids_at_providers in ids_by_type.items():
+        for id_at_providers, pc_object in get_existing_objects(model_type, ids_at_providers).items():
+            prefetched[f"{id_at_providers}|{model_type.__name__}"] = pc_object
+    return prefetched
 
 
 def get_existing_pc_obj(
-    providable_info: ProvidableInfo, chunk_to_insert: dict, chunk_to_update: dict
+    providable_info: ProvidableInfo,
+    chunk_to_insert: dict,
+    chunk_to_update: dict,
+    prefetched_objects: dict | None = None,
 ) -> offers_models.Product | offers_models.Offer | offers_models.Stock | None:
     object_in_current_chunk = get_object_from_current_chunks(providable_info, chunk_to_insert, chunk_to_update)
-    if object_in_current_chunk is None:
-        return get_existing_object(providable_info.type, providable_info.id_at_providers)
+    if object_in_current_chunk is not None:
+        return object_in_current_chunk
 
-    return object_in_current_chunk
+    chunk_key = get_chunk_key(providable_info)
+    if prefetched_objects is not None and chunk_key in prefetched_objects:
+        return prefetched_objects[chunk_key]
+
+    return get_existing_object(providable_info.type, providable_info.id_at_providers)
 
 
 def get_object_from_current_chunks(
     providable_info: ProvidableInfo, chunk_to_insert: dict, chunk_to_update: dict
 ) -> offers_models.Product | offers_models.Offer | offers_models.Stock | None:
-    chunk_key = f"{providable_info.id_at_providers}|{providable_info.type.__name__}"
+    chunk_key = get_chunk_key(providable_info)
     pc_object = chunk_to_insert.get(chunk_key)
     if isinstance(pc_object, providable_info.type):
         return pc_object
@@ -29,7 +65,11 @@ def get_object_from_current_chunks(
     return None
 
 
-def save_chunks(chunk_to_insert: dict[str, Model], chunk_to_update: dict[str, Model]) -> None:
+def save_chunks(chunk_to_insert: dict[str, Model], chunk_to_update: dict[str, Model], use_copy: bool = False) -> None:
+    if use_copy:
+        upsert_chunk_with_copy(chunk_to_insert, chunk_to_update)
+        return
+
     if len(chunk_to_insert) > 0:
         insert_chunk(chunk_to_insert)
 
@@ -4,15 +4,19 @@ from datetime import datetime
 import logging
 import typing
 
+from pcapi import settings
 from pcapi.connectors.thumb_storage import create_thumb
 from pcapi.core import search
 import pcapi.core.finance.api as finance_api
 import pcapi.core.offers.models as offers_models
 import pcapi.core.providers.models as providers_models
 from pcapi.core.providers.repository import get_provider_by_local_class
+from pcapi.local_providers.chunk_manager import get_chunk_key
 from pcapi.local_providers.chunk_manager import get_existing_pc_obj
+from pcapi.local_providers.chunk_manager import prefetch_existing_pc_objs
 from pcapi.local_providers.chunk_manager import save_chunks
 from pcapi.local_providers.providable_info import ProvidableInfo
+from pcapi.local_providers.thumb_pipeline import ThumbPipeline
 from pcapi.models import Model
 from pcapi.models import db
 from pcapi.models.api_errors import ApiErrors
@@ -29,6 +33,10 @@ CHUNK_MAX_SIZE = 1000
 
 
 class LocalProvider(Iterator):
+    # Save chunks with `COPY` and `INSERT ... ON CONFLICT` instead of
+    # the ORM. Only for providers that set foreign keys explicitly.
+    use_copy_to_save_chunks = False
+
     def __init__(self, venue_provider: providers_models.VenueProvider | None = None, **options: typing.Any) -> None:
         self.venue_provider = venue_provider
         self.updatedObjects = 0
@@ -39,7 +47,11 @@ class LocalProvider(Iterator):
         self.updatedThumbs = 0
         self.checkedThumbs = 0
         self.erroredThumbs = 0
+        self.prefetchQueries = 0
+        self.savedQueries = 0
         self.provider = get_provider_by_local_class(self.__class__.__name__)
+        self._thumb_pipeline: ThumbPipeline[tuple[HasThumbMixin, str]] | None = None
+        self._objects_with_pending_thumb: set[int] = set()
 
     @property
     @abstractmethod
@@ -93,7 +105,7 @@ class LocalProvider(Iterator):
     def name(self) -> str:
         pass
 
-    def _handle_thumb(self, pc_object: HasThumbMixin) -> None:
+    def _handle_thumb(self, pc_object: HasThumbMixin, chunk_key: str, chunk_to_update: dict[str, Model]) -> None:
         if not self.shall_synchronize_thumbs():
             return
         self.checkedThumbs += 1
@@ -102,13 +114,57 @@ class LocalProvider(Iterator):
         if not new_thumb:
             return
 
-        _upload_thumb(
-            pc_object=pc_object,
-            image_as_bytes=new_thumb,
-            keep_poster_ratio=self.get_keep_poster_ratio(),
+        if id(pc_object) in self._objects_with_pending_thumb:
+            # The storage id of the new thumb depends on the thumb count
+            # of the object, which is reverted if the previous thumb
+            # cannot be uploaded.
+            self._collect_thumbs(chunk_to_update, wait=True)
+
+        # The thumb count is incremented right away, so that the storage
+        # id of the thumb is known before it is uploaded. Pending thumbs
+        # are collected before chunks are saved.
+        pc_object.thumbCount = (pc_object.thumbCount or 0) + 1
+        try:
+            storage_id = pc_object.get_thumb_storage_id()
+        except ValueError:
+            pc_object.thumbCount -= 1
+            raise
+
+        if self._thumb_pipeline is None:
+            self._thumb_pipeline = ThumbPipeline(max_workers=settings.PROVIDER_THUMBS_WORKERS)
+        self._thumb_pipeline.submit(
+            (pc_object, chunk_key),
+            storage_id=storage_id,
+            image=new_thumb,
+            keep_ratio=self.get_keep_poster_ratio(),
         )
+        self._objects_with_pending_thumb.add(id(pc_object))
+
+    def _collect_thumbs(self, chunk_to_update: dict[str, Model], wait: bool = False) -> None:
+        if self._thumb_pipeline is None:
+            return
+        for (pc_object, chunk_key), error in self._thumb_pipeline.collect(wait=wait):
+            self._objects_with_pending_thumb.discard(id(pc_object))
+            if error is not None:
+                pc_object.thumbCount -= 1
+                self.log_provider_event(providers_models.LocalProviderEventType.SyncError, error.__class__.__name__)
+                self.erroredThumbs += 1
+                logger.info("ERROR during handle thumb: %s", error, exc_info=error)
+                continue
 
-        self.createdThumbs += 1
+            self.createdThumbs += 1
+            errors = entity_validator.validate(pc_object)  # type: ignore [arg-type]
+            if errors and len(errors.errors) > 0:
+                self.log_provider_event(providers_models.LocalProviderEventType.SyncError, "ApiErrors")
+                continue
+
+            chunk_to_update[chunk_key] = pc_object  # type: ignore [assignment]
+
+    def _stop_thumb_pipeline(self) -> None:
+        if self._thumb_pipeline is not None:
+            self._thumb_pipeline.shutdown()
+            self._thumb_pipeline = None
+            self._objects_with_pending_thumb.clear()
 
     def _create_object(self, providable_info: ProvidableInfo) -> Model:
         pc_object = providable_info.type()
@@ -145,6 +201,20 @@ class LocalProvider(Iterator):
 
         self.updatedObjects += 1
 
+    def _prefetch_existing_objects(
+        self, providable_infos: list[ProvidableInfo]
+    ) -> dict[str, offers_models.Product | offers_models.Offer | offers_models.Stock | None]:
+        # Providers return an offer along with all its stocks (one per
+        # showtime for cinemas). Look them up with one query per model
+        # type instead of one query per object.
+        if len(providable_infos) < 2:
+            return {}
+        prefetched_objects = prefetch_existing_pc_objs(providable_infos)
+        queries = len({providable_info.type for providable_info in providable_infos})
+        self.prefetchQueries += queries
+        self.savedQueries += max(len(prefetched_objects) - queries, 0)
+        return prefetched_objects
+
     def log_provider_event(
         self, event_type: providers_models.LocalProviderEventType, event_payload: str | int | None = None
     ) -> None:
@@ -176,9 +246,14 @@ class LocalProvider(Iterator):
             self.updatedThumbs,
             self.erroredThumbs,
         )
+        logger.info(
+            "Lookup of existing objects of venue=%s, prefetch queries=%d, saved queries=%d",
+            venue_id,
+            self.prefetchQueries,
+            self.savedQueries,
+        )
 
     def updateObjects(self, limit: int | None = None) -> None:
-        # pylint: disable=too-many-nested-blocks
         if self.venue_provider and not self.venue_provider.isActive:
             logger.info("Venue provider %s is inactive", self.venue_provider)
             return
@@ -191,6 +266,20 @@ class LocalProvider(Iterator):
         # TODO (asaunier,2021-03-18): We may replace this log in BDD with logs in the monitoring system
         self.log_provider_event(providers_models.LocalProviderEventType.SyncStart)
 
+        try:
+            self._synchronize_objects(limit)
+        finally:
+            self._stop_thumb_pipeline()
+
+        self._print_objects_summary()
+        self.log_provider_event(providers_models.LocalProviderEventType.SyncEnd)
+
+        if self.venue_provider is not None:
+            self.venue_provider.lastSyncDate = datetime.utcnow()
+            repository.save(self.venue_provider)
+
+    def _synchronize_objects(self, limit: int | None) -> None:
+        # pylint: disable=too-many-nested-blocks
         chunk_to_insert: dict[str, Model] = {}
         chunk_to_update: dict[str, Model] = {}
 
@@ -204,9 +293,11 @@ class LocalProvider(Iterator):
                 self.checkedObjects += 1
                 continue
 
+            prefetched_objects = self._prefetch_existing_objects(providable_infos)
+
             for providable_info in providable_infos:
-                chunk_key = providable_info.id_at_providers + "|" + str(providable_info.type.__name__)
-                pc_object = get_existing_pc_obj(providable_info, chunk_to_insert, chunk_to_update)
+                chunk_key = get_chunk_key(providable_info)
+                pc_object = get_existing_pc_obj(providable_info, chunk_to_insert, chunk_to_update, prefetched_objects)
                 last_update_for_current_provider = get_last_update_for_provider(self.provider.id, pc_object)
 
                 if pc_object is None:
@@ -238,47 +329,37 @@ class LocalProvider(Iterator):
                     not last_update_for_current_provider
                     or last_update_for_current_provider.date() != datetime.today().date()
                 ):
-                    initial_thumb_count = pc_object.thumbCount
                     try:
-                        self._handle_thumb(pc_object)
+                        self._handle_thumb(pc_object, chunk_key, chunk_to_update)
                     except Exception as e:  # pylint: disable=broad-except
                         self.log_provider_event(providers_models.LocalProviderEventType.SyncError, e.__class__.__name__)
                         self.erroredThumbs += 1
                         logger.info("ERROR during handle thumb: %s", e, exc_info=True)
-                    pc_object_has_new_thumbs = pc_object.thumbCount != initial_thumb_count
-                    if pc_object_has_new_thumbs:
-                        errors = entity_validator.validate(pc_object)
-                        if errors and len(errors.errors) > 0:
-                            self.log_provider_event(providers_models.LocalProviderEventType.SyncError, "ApiErrors")
-                            continue
-
-                        chunk_to_update[chunk_key] = pc_object
 
+                self._collect_thumbs(chunk_to_update)
                 self.checkedObjects += 1
 
                 if len(chunk_to_insert) + len(chunk_to_update) >= CHUNK_MAX_SIZE:
-                    save_chunks(chunk_to_insert, chunk_to_update)
+                    self._collect_thumbs(chunk_to_update, wait=True)
+                    save_chunks(chunk_to_insert, chunk_to_update, use_copy=self.use_copy_to_save_chunks)
                     _reindex_offers(
                         list(chunk_to_insert.values()) + list(chunk_to_update.values()),
                         self.venue_provider,
                     )
                     chunk_to_insert = {}
                     chunk_to_update = {}
+                    # Saved objects are not in the chunks anymore: look
+                    # them up in the database again.
+                    prefetched_objects = {}
 
+        self._collect_thumbs(chunk_to_update, wait=True)
         if len(chunk_to_insert) + len(chunk_to_update) > 0:
-            save_chunks(chunk_to_insert, chunk_to_update)
+            save_chunks(chunk_to_insert, chunk_to_update, use_copy=self.use_copy_to_save_chunks)
             _reindex_offers(
                 list(chunk_to_insert.values()) + list(chunk_to_update.values()),
                 self.venue_provider,
             )
 
-        self._print_objects_summary()
-        self.log_provider_event(providers_models.LocalProviderEventType.SyncEnd)
-
-        if self.venue_provider is not None:
-            self.venue_provider.lastSyncDate = datetime.utcnow()
-            repository.save(self.venue_provider)
-
     def postTreatment(self) -> None:
         pass
 
@@ -0,0 +1,72 @@
+"""Process and upload thumbs of synchronized objects in worker threads.
+
+Converting an image with Pillow and uploading it to the object storage
+are slow. They run in a pool of threads, alongside the synchronization
+of objects, so that they do not stall the saving of chunks. Pillow and
+the storage clients release the GIL, so threads are enough here (and
+workers can use the clients of the parent process as is).
+
+The number of pending thumbs is bounded: `submit()` blocks when it is
+reached (back-pressure), so that images do not pile up in memory.
+
+Workers never touch ORM objects: the caller gives the storage id of
+the new thumb, and updates its objects with the results returned by
+`collect()`.
+"""
+
+import concurrent.futures
+import threading
+import typing
+
+from pcapi.connectors import thumb_storage
+
+
+# Maximum number of thumbs that are queued or being processed.
+MAX_PENDING_THUMBS = 100
+
+T = typing.TypeVar("T")
+
+
+class ThumbPipeline(typing.Generic[T]):
+    def __init__(self, max_workers: int, max_pending: int = MAX_PENDING_THUMBS) -> None:
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers, thread_name_prefix="thumbs")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending: list[tuple[T, concurrent.futures.Future[None]]] = []
+
+    def submit(self, context: T, storage_id: str, image: bytes, keep_ratio: bool = False) -> None:
+        """Queue the processing and upload of a thumb.
+
+        `context` is given back by `collect()`.
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._process, storage_id, image, keep_ratio)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _future: self._slots.release())
+        self._pending.append((context, future))
+
+    def collect(self, wait: bool = False) -> list[tuple[T, BaseException | None]]:
+        """Return the context of thumbs that have been processed, along
+        with the error that occurred, if any.
+
+        If `wait` is true, wait for all pending thumbs.
+        """
+        if wait and self._pending:
+            concurrent.futures.wait([future for _context, future in self._pending])
+        results = []
+        pending = []
+        for context, future in self._pending:
+            if future.done():
+                results.append((context, future.exception()))
+            else:
+                pending.append((context, future))
+        self._pending = pending
+        return results
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _process(self, storage_id: str, image: bytes, keep_ratio: bool) -> None:
+        thumb_storage.store_thumb(storage_id, thumb_storage.process_thumb(image, keep_ratio=keep_ratio))
@@ -215,6 +215,7 @@ def trim_with_ellipsis(string: str, length: int) -> str:
 class TiteLiveThings(LocalProvider):
     name = "TiteLive (Epagine / Place des libraires.com)"
     can_create = True
+    use_copy_to_save_chunks = True
 
     def __init__(self) -> None:
         super().__init__()
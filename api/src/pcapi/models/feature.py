@@ -14,6 +14,7 @@ from pcapi.models import Model
 from pcapi.models import db
 from pcapi.models.deactivable_mixin import DeactivableMixin
 from pcapi.models.pc_object import PcObject
+from pcapi.utils import cache as cache_utils
 
 
 logger = logging.getLogger(__name__)
@@ -43,6 +44,9 @@ class FeatureToggle(enum.Enum):
     ENABLE_BEAMER = "Active Beamer, le système de notifs du portail pro"
     ENABLE_CDS_IMPLEMENTATION = "Permet la réservation de place de cinéma avec l'API CDS"
     ENABLE_CHARLIE_BOOKINGS_API = "Active la réservation via l'API Charlie"
+    ENABLE_CINEMA_STOCK_BACKGROUND_REFRESH = (
+        "Rafraîchit en tâche de fond (et non plus à l'affichage de l'offre) le stock des séances de cinéma"
+    )
     ENABLE_CRON_TO_UPDATE_OFFERER_STATS = "Active la mise à jour des statistiques des offrers avec un cron"
     ENABLE_CULTURAL_SURVEY = "Activer l'affichage du questionnaire des pratiques initiales pour les bénéficiaires"
     ENABLE_DMS_LINK_ON_MAINTENANCE_PAGE_FOR_AGE_18 = (
@@ -58,7 +62,9 @@ class FeatureToggle(enum.Enum):
     ENABLE_NATIVE_CULTURAL_SURVEY = (
         "Active le Questionnaire des pratiques initiales natif (non TypeForm) sur l'app native et décli web"
     )
+    ENABLE_OFFER_BOOKING_COUNT_TABLE = "Lit le nombre de réservations des 30 derniers jours des offres dans une table pré-calculée lors de l'indexation"
     ENABLE_PHONE_VALIDATION = "Active la validation du numéro de téléphone"
+    ENABLE_PRICING_POINT_REVENUE_TABLE = "Lit le chiffre d'affaires annuel des points de valorisation dans une table pré-calculée lors de la valorisation"
     ENABLE_PRO_ACCOUNT_CREATION = "Permettre l'inscription des comptes professionels"
     ENABLE_PRO_BOOKINGS_V2 = "Activer l'affichage de la page booking avec la nouvelle architecture."
 
@@ -123,13 +129,9 @@ class FeatureToggle(enum.Enum):
     def is_active(self) -> bool:
         if flask.has_request_context():
             if not hasattr(flask.request, "_cached_features"):
-                setattr(
-                    flask.request,
-                    "_cached_features",
-                    {f.name: f.isActive for f in db.session.query(Feature.name, Feature.isActive)},
-                )
+                setattr(flask.request, "_cached_features", get_features_snapshot())
             return flask.request._cached_features[self.name]  # type: ignore [attr-defined]
-        return Feature.query.filter_by(name=self.name).one().isActive
+        return get_features_snapshot()[self.name]
 
 
 class Feature(PcObject, Base, Model, DeactivableMixin):
@@ -141,6 +143,50 @@ class Feature(PcObject, Base, Model, DeactivableMixin):
         return str(self.name).replace("FeatureToggle.", "")
 
 
+FEATURES_INVALIDATION_CHANNEL = "feature_flags:invalidation"
+
+
+# A process-level snapshot of all feature flags, which expires after
+# `settings.FEATURE_FLAGS_CACHE_TTL` seconds or as soon as a message is
+# published on `FEATURES_INVALIDATION_CHANNEL`.
+_features_cache: cache_utils.InvalidatedProcessCache[dict[str, bool]] = cache_utils.InvalidatedProcessCache(
+    FEATURES_INVALIDATION_CHANNEL, lambda: settings.FEATURE_FLAGS_CACHE_TTL
+)
+
+
+def get_features_snapshot() -> dict[str, bool]:
+    """Return the status of all feature flags, indexed by name."""
+    if settings.FEATURE_FLAGS_CACHE_TTL:
+        _features_cache.start_invalidation_listener()
+        features = _features_cache.get()
+        if features is not None:
+            return features
+    features = {f.name: f.isActive for f in db.session.query(Feature.name, Feature.isActive)}
+    if settings.FEATURE_FLAGS_CACHE_TTL:
+        _features_cache.set(features)
+    return features
+
+
+def invalidate_features_cache() -> None:
+    """Clear the snapshot of feature flags in this process and ask
+    other processes to clear theirs.
+    """
+    _features_cache.invalidate()
+
+
+def set_feature_flags(statuses: dict[str, bool]) -> None:
+    """Set the status of the given feature flags (indexed by name),
+    commit and invalidate the snapshot of all processes.
+
+    Always use this function to toggle feature flags, otherwise other
+    processes may use a stale status until their snapshot expires.
+    """
+    for name, is_active in statuses.items():
+        Feature.query.filter_by(name=name).update({"isActive": is_active})
+    db.session.commit()
+    invalidate_features_cache()
+
+
 FEATURES_DISABLED_BY_DEFAULT: tuple[FeatureToggle, ...] = (
     FeatureToggle.DISABLE_BOOST_EXTERNAL_BOOKINGS,
     FeatureToggle.DISABLE_CDS_EXTERNAL_BOOKINGS,
@@ -150,12 +196,15 @@ FEATURES_DISABLED_BY_DEFAULT: tuple[FeatureToggle, ...] = (
     FeatureToggle.ENABLE_AUTO_VALIDATION_FOR_EXTERNAL_BOOKING,
     FeatureToggle.ENABLE_BEAMER,
     FeatureToggle.ENABLE_CHARLIE_BOOKINGS_API,
+    FeatureToggle.ENABLE_CINEMA_STOCK_BACKGROUND_REFRESH,
     FeatureToggle.ENABLE_CULTURAL_SURVEY,
     FeatureToggle.ENABLE_DMS_LINK_ON_MAINTENANCE_PAGE_FOR_UNDERAGE,
     FeatureToggle.ENABLE_EAC_FINANCIAL_PROTECTION,
     FeatureToggle.ENABLE_EMS_INTEGRATION,
     FeatureToggle.ENABLE_FRONT_IMAGE_RESIZING,
     FeatureToggle.ENABLE_IOS_OFFERS_LINK_WITH_REDIRECTION,
+    FeatureToggle.ENABLE_OFFER_BOOKING_COUNT_TABLE,
+    FeatureToggle.ENABLE_PRICING_POINT_REVENUE_TABLE,
     FeatureToggle.ENABLE_PRO_BOOKINGS_V2,
     FeatureToggle.ENABLE_UBBLE_SUBSCRIPTION_LIMITATION,
     FeatureToggle.ID_CHECK_ADDRESS_AUTOCOMPLETION,
@@ -253,6 +302,7 @@ def install_feature_flags() -> None:
         )
 
     db.session.commit()
+    invalidate_features_cache()
 
     if to_remove_flags:
         logger.error("The following feature flags are present in database but not present in code: %s", to_remove_flags)
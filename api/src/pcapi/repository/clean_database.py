@@ -43,6 +43,7 @@ tables_to_clean: list[flask_sqlalchemy.Model] = [
     finance_models.PricingLine,
     finance_models.PricingLog,
     finance_models.Pricing,
+    finance_models.PricingPointRevenue,
     finance_models.InvoiceLine,
     finance_models.Invoice,
     finance_models.FinanceEvent,
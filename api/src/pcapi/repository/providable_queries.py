@@ -1,11 +1,21 @@
+from collections.abc import Collection
 import datetime
+import io
+import logging
+import typing
 
+import sqlalchemy as sa
+
+from pcapi.core.logging import log_elapsed
 import pcapi.core.offers.models as offers_models
 from pcapi.models import Base
 from pcapi.models import Model
 from pcapi.models import db
 
 
+logger = logging.getLogger(__name__)
+
+
 def insert_chunk(chunk_to_insert: dict[str, Model]) -> None:
     db.session.add_all(chunk_to_insert.values())
     db.session.commit()
@@ -27,6 +37,185 @@ def update_chunk(chunk_to_update: dict[str, Model]) -> None:
     db.session.commit()
 
 
+def upsert_chunk_with_copy(chunk_to_insert: dict[str, Model], chunk_to_update: dict[str, Model]) -> None:
+    """Save new and updated objects of a chunk with PostgreSQL `COPY`.
+
+    Rows are streamed into a temporary table and merged into the
+    target table with a single `INSERT ... ON CONFLICT DO UPDATE`
+    statement per model. Only columns that have been modified are
+    updated, and rows whose values did not change are not touched.
+
+    Objects must have their foreign keys set explicitly (and not
+    through relationships), since they are not flushed by the ORM. The
+    `before_*` and `after_*` mapper events are dispatched by hand, as
+    the ORM would do (attribute validators have already run when
+    attributes were set). Saved objects stay in the session, as
+    persistent objects.
+    """
+    MODELS = {mapper.class_.__name__: mapper.class_ for mapper in Base.registry.mappers}
+
+    model_names = {_extract_model_name_from_chunk_key(key) for key in (chunk_to_insert | chunk_to_update)}
+    for model_name in model_names:
+        model = MODELS[model_name]
+        new_objects = [obj for _key, obj in _filter_matching_pc_object_in_chunk(model_name, chunk_to_insert)]
+        existing_objects = [obj for _key, obj in _filter_matching_pc_object_in_chunk(model_name, chunk_to_update)]
+        # Do not let the ORM flush modified objects: it would update
+        # them one by one and reset their attribute history.
+        with (
+            db.session.no_autoflush,
+            log_elapsed(
+                logger,
+                "Upserted chunk with COPY",
+                extra={"model": model_name, "inserted": len(new_objects), "updated": len(existing_objects)},
+            ),
+        ):
+            _copy_upsert_objects(model, new_objects, existing_objects)
+    db.session.commit()
+
+
+def _copy_upsert_objects(model: type[Model], new_objects: list[Model], existing_objects: list[Model]) -> None:
+    table = model.__table__
+    mapper = sa.orm.class_mapper(model)
+    connection = db.session.connection()
+    dialect = connection.dialect
+    quote = dialect.identifier_preparer.quote
+    columns = {
+        prop.key: prop.columns[0]
+        for prop in mapper.column_attrs
+        if isinstance(prop.columns[0], sa.Column) and prop.columns[0].table is table
+    }
+
+    for obj in new_objects:
+        mapper.dispatch.before_insert(mapper, connection, obj)
+    for obj in existing_objects:
+        mapper.dispatch.before_update(mapper, connection, obj)
+
+    objects_without_id = [obj for obj in new_objects if obj.id is None]
+    if objects_without_id:
+        new_ids = db.session.execute(
+            sa.select(sa.func.nextval(f"{table.name}_id_seq")).select_from(
+                sa.func.generate_series(1, len(objects_without_id))
+            )
+        ).scalars()
+        for obj, new_id in zip(objects_without_id, new_ids):
+            obj.id = new_id
+
+    updated_keys = set()
+    for obj in existing_objects:
+        state = sa.orm.attributes.instance_state(obj)
+        updated_keys |= {key for key in columns if state.attrs[key].history.has_changes()}
+    updated_keys.discard("id")
+    if not new_objects and not updated_keys:
+        return
+    onupdate_keys = {key for key, column in columns.items() if column.onupdate is not None} - updated_keys
+
+    rows = [_get_copy_row(obj, columns, dialect, is_new=True) for obj in new_objects]
+    rows += [_get_copy_row(obj, columns, dialect, is_new=False) for obj in existing_objects]
+
+    temporary_table = quote(f"tmp_chunk_{table.name}")
+    column_names = ", ".join(quote(column.name) for column in columns.values())
+    selected_columns = ", ".join(_get_select_expression(column, dialect) for column in columns.values())
+    cursor = connection.connection.cursor()
+    cursor.execute(
+        f"CREATE TEMPORARY TABLE {temporary_table} AS SELECT {column_names} FROM {quote(table.name)} WITH NO DATA"
+    )
+    cursor.copy_expert(
+        f"COPY {temporary_table} ({column_names}) FROM STDIN",
+        io.StringIO("".join(rows)),
+    )
+
+    statement = f"INSERT INTO {quote(table.name)} ({column_names}) SELECT {selected_columns} FROM {temporary_table} "
+    updated_columns = [quote(columns[key].name) for key in sorted(updated_keys)]
+    if updated_columns:
+        # Columns with an `onupdate` are set, but are not compared, so
+        # that unchanged rows are left as is.
+        set_columns = updated_columns + [quote(columns[key].name) for key in sorted(onupdate_keys)]
+        target = ", ".join(f"{quote(table.name)}.{name}" for name in updated_columns)
+        excluded = ", ".join(f"EXCLUDED.{name}" for name in updated_columns)
+        statement += (
+            "ON CONFLICT (id) DO UPDATE SET "
+            + ", ".join(f"{name} = EXCLUDED.{name}" for name in set_columns)
+            + f" WHERE ROW({target}) IS DISTINCT FROM ROW({excluded})"
+        )
+    else:
+        statement += "ON CONFLICT (id) DO NOTHING"
+    cursor.execute(statement)
+    cursor.execute(f"DROP TABLE {temporary_table}")
+
+    for obj in new_objects:
+        mapper.dispatch.after_insert(mapper, connection, obj)
+    for obj in existing_objects:
+        mapper.dispatch.after_update(mapper, connection, obj)
+    _mark_as_saved(new_objects, existing_objects, updated_keys)
+
+
+def _mark_as_saved(new_objects: list[Model], existing_objects: list[Model], updated_keys: set[str]) -> None:
+    # Objects have been saved behind the back of the ORM: reset their
+    # state, so that they are not inserted or updated again on the next
+    # flush, while keeping them in the session.
+    for obj in new_objects:
+        if obj in db.session:
+            db.session.expunge(obj)
+        sa.orm.make_transient_to_detached(obj)
+        db.session.add(obj)
+    for obj in existing_objects:
+        for key in updated_keys:
+            sa.orm.attributes.set_committed_value(obj, key, getattr(obj, key))
+
+
+def _get_copy_row(obj: Model, columns: dict[str, sa.Column], dialect: sa.engine.Dialect, is_new: bool) -> str:
+    values = []
+    for key, column in columns.items():
+        value = getattr(obj, key)
+        if is_new and value is None and column.default is not None:
+            if column.default.is_scalar:
+                value = column.default.arg
+            elif column.default.is_callable:
+                value = column.default.arg(None)
+        elif not is_new and column.onupdate is not None and column.onupdate.is_callable:
+            value = column.onupdate.arg(None)
+        processor = column.type.bind_processor(dialect)
+        if processor and value is not None:
+            value = processor(value)
+        values.append(_format_copy_value(value))
+    return "\t".join(values) + "\n"
+
+
+def _get_select_expression(column: sa.Column, dialect: sa.engine.Dialect) -> str:
+    name = dialect.identifier_preparer.quote(column.name)
+    # Unlike the ORM, we cannot omit columns that have not been set on
+    # new objects, so that the server default is used. Do it by hand.
+    if column.server_default is not None and not column.nullable:
+        server_default = dialect.ddl_compiler(dialect, None).get_column_default_string(column)
+        return f"COALESCE({name}, {server_default})"
+    return name
+
+
+def _format_copy_value(value: typing.Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        text = "t" if value else "f"
+    elif isinstance(value, (list, tuple)):
+        text = _format_array_literal(value)
+    elif isinstance(value, (datetime.date, datetime.time)):
+        text = value.isoformat()
+    else:
+        text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _format_array_literal(values: list | tuple) -> str:
+    items = []
+    for item in values:
+        if item is None:
+            items.append("NULL")
+        else:
+            item = str(item).replace("\\", "\\\\").replace('"', '\\"')
+            items.append(f'"{item}"')
+    return "{" + ",".join(items) + "}"
+
+
 def _filter_matching_pc_object_in_chunk(
     model_in_chunk: str, chunk_to_update: dict[str, Model]
 ) -> list[tuple[str, Model]]:
@@ -39,17 +228,21 @@ def _extract_dict_values_from_chunk(matching_tuples_in_chunk: list[tuple[str, Mo
     return list(dictify_pc_object(pc_object_item) for pc_object_key, pc_object_item in matching_tuples_in_chunk)
 
 
-def get_existing_object(
+def _get_id_at_providers_attribute_name(
     model_type: type[offers_models.Product | offers_models.Offer | offers_models.Stock],
-    id_at_providers: str,
-) -> offers_models.Product | offers_models.Offer | offers_models.Stock | None:
+) -> str:
     # exception to the ProvidableMixin because Offer no longer extends this class
     # idAtProviders has been replaced by idAtProvider property
-    lookup = {}
     if model_type == offers_models.Offer:
-        lookup["idAtProvider"] = id_at_providers
-    else:
-        lookup["idAtProviders"] = id_at_providers
+        return "idAtProvider"
+    return "idAtProviders"
+
+
+def get_existing_object(
+    model_type: type[offers_models.Product | offers_models.Offer | offers_models.Stock],
+    id_at_providers: str,
+) -> offers_models.Product | offers_models.Offer | offers_models.Stock | None:
+    lookup = {_get_id_at_providers_attribute_name(model_type): id_at_providers}
     query = model_type.query.filter_by(**lookup)
     if model_type == offers_models.Stock:
         query = query.with_for_update()
@@ -57,6 +250,40 @@ def get_existing_object(
     return query.one_or_none()
 
 
+def get_existing_objects(
+    model_type: type[offers_models.Product | offers_models.Offer | offers_models.Stock],
+    ids_at_providers: Collection[str],
+) -> dict[str, offers_models.Product | offers_models.Offer | offers_models.Stock | None]:
+    """Return existing objects of `model_type`, indexed by their
+    identifier at provider, with a single query.
+
+    Identifiers that do not match any object are mapped to `None`.
+    Identifiers that match more than one object are left out, so that
+    callers fall back on `get_existing_object()` and keep its
+    behaviour.
+    """
+    if not ids_at_providers:
+        return {}
+    attribute_name = _get_id_at_providers_attribute_name(model_type)
+    column = getattr(model_type, attribute_name)
+    query = model_type.query.filter(column.in_(set(ids_at_providers)))
+    if model_type == offers_models.Stock:
+        query = query.with_for_update()
+
+    existing_objects: dict[str, offers_models.Product | offers_models.Offer | offers_models.Stock | None] = (
+        dict.fromkeys(ids_at_providers)
+    )
+    ambiguous_ids: set[str] = set()
+    for pc_object in query:
+        id_at_providers = getattr(pc_object, attribute_name)
+        if existing_objects.get(id_at_providers) is not None:
+            ambiguous_ids.add(id_at_providers)
+        existing_objects[id_at_providers] = pc_object
+    for id_at_providers in ambiguous_ids:
+        del existing_objects[id_at_providers]
+    return existing_objects
+
+
 def get_last_update_for_provider(
     provider_id: int,
     pc_obj: offers_models.Product | offers_models.Offer | offers_models.Stock | None,
@@ -1,5 +1,4 @@
 import datetime
-from io import BytesIO
 import re
 import typing
 
@@ -7,7 +6,6 @@ from flask import flash
 from flask import redirect
 from flask import render_template
 from flask import request
-from flask import send_file
 from flask import url_for
 from flask_login import current_user
 from markupsafe import Markup
@@ -176,15 +174,14 @@ def get_individual_booking_csv_download() -> utils.BackofficeResponse:
     if not form.validate():
         raise BadRequest()
 
-    export_data = booking_repository.get_export(
+    export_data = booking_repository.stream_export(
         user=current_user,
         booking_period=typing.cast(tuple[datetime.date, datetime.date], form.from_to_date.data),
         venue_id=form.venue.data,
         offer_type=OfferType.INDIVIDUAL_OR_DUO,
         export_type=bookings_models.BookingExportType.CSV,
     )
-    buffer = BytesIO(typing.cast(str, export_data).encode("utf-8-sig"))
-    return send_file(buffer, as_attachment=True, download_name="reservations_pass_culture.csv", mimetype="text/csv")
+    return utils.stream_file(export_data, download_name="reservations_pass_culture.csv", mimetype="text/csv")
 
 
 @individual_bookings_blueprint.route("/download-xlsx", methods=["GET"])
@@ -193,17 +190,15 @@ def get_individual_booking_xlsx_download() -> utils.BackofficeResponse:
     if not form.validate():
         raise BadRequest()
 
-    export_data = booking_repository.get_export(
+    export_data = booking_repository.stream_export(
         user=current_user,
         booking_period=typing.cast(tuple[datetime.date, datetime.date], form.from_to_date.data),
         venue_id=form.venue.data,
         offer_type=OfferType.INDIVIDUAL_OR_DUO,
         export_type=bookings_models.BookingExportType.EXCEL,
     )
-    buffer = BytesIO(typing.cast(bytes, export_data))
-    return send_file(
-        buffer,
-        as_attachment=True,
+    return utils.stream_file(
+        export_data,
         download_name="reservations_pass_culture.xlsx",
         mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
@@ -12,7 +12,9 @@ import sqlalchemy as sa
 from pcapi.core.history import api as history_api
 from pcapi.core.history import models as history_models
 from pcapi.core.offerers import models as offerers_models
+from pcapi.core.offers import exceptions as offers_exceptions
 from pcapi.core.offers import models as offers_models
+from pcapi.core.offers import validation_rules
 from pcapi.core.permissions import models as perm_models
 from pcapi.core.users import models as users_models
 from pcapi.models import db
@@ -278,6 +280,7 @@ def create_rule() -> utils.BackofficeResponse:
             sub_rules_info=sub_rules_info,
         )
         db.session.commit()
+        validation_rules.invalidate_offer_validation_rules_cache()
         flash("La nouvelle règle a été créée", "success")
 
     except sa.exc.IntegrityError as err:
@@ -287,6 +290,28 @@ def create_rule() -> utils.BackofficeResponse:
     return redirect(url_for("backoffice_web.offer_validation_rules.list_rules"), code=303)
 
 
+@offer_validation_rules_blueprint.route("/<int:rule_id>/simulate", methods=["GET"])
+def get_rule_simulation(rule_id: int) -> utils.BackofficeResponse:
+    rule = offers_models.OfferValidationRule.query.options(
+        sa.orm.joinedload(offers_models.OfferValidationRule.subRules)
+    ).get_or_404(rule_id)
+
+    simulation = None
+    error = None
+    try:
+        simulation = validation_rules.simulate_rule(rule)
+    except offers_exceptions.UnsupportedOfferValidationSubRule as exc:
+        error = str(exc)
+
+    return render_template(
+        "offer_validation_rules/simulation.html",
+        rule=rule,
+        simulation=simulation,
+        error=error,
+        div_id=f"simulate-offer-validation-rule-{rule_id}",  # must be consistent with parameter passed to build_lazy_modal
+    )
+
+
 @offer_validation_rules_blueprint.route("/<int:rule_id>/delete", methods=["GET"])
 def get_delete_offer_validation_rule_form(rule_id: int) -> utils.BackofficeResponse:
     rule_to_delete = offers_models.OfferValidationRule.query.get(rule_id)
@@ -324,6 +349,7 @@ def delete_rule(rule_id: int) -> utils.BackofficeResponse:
                 sub_rules_info=sub_rules_info,
             )
             db.session.commit()
+            validation_rules.invalidate_offer_validation_rules_cache()
         except sa.exc.IntegrityError as exc:
             db.session.rollback()
             flash(Markup("Une erreur s'est produite : {message}").format(message=str(exc)), "warning")
@@ -474,6 +500,7 @@ def edit_rule(rule_id: int) -> utils.BackofficeResponse:
                 sub_rules_info=sub_rules_info,
             )
         db.session.commit()
+        validation_rules.invalidate_offer_validation_rules_cache()
 
     except sa.exc.IntegrityError as exc:
         db.session.rollback()
@@ -1,6 +1,5 @@
 import datetime
 from functools import partial
-from io import BytesIO
 import logging
 import typing
 
@@ -8,7 +7,6 @@ from flask import flash
 from flask import redirect
 from flask import render_template
 from flask import request
-from flask import send_file
 from flask import url_for
 from flask_login import current_user
 from flask_sqlalchemy import BaseQuery
@@ -25,7 +23,6 @@ from pcapi.core.categories import subcategories_v2
 from pcapi.core.criteria import models as criteria_models
 from pcapi.core.finance import api as finance_api
 from pcapi.core.finance import models as finance_models
-from pcapi.core.mails import transactional as transactional_mails
 from pcapi.core.offerers import models as offerers_models
 from pcapi.core.offers import api as offers_api
 from pcapi.core.offers import exceptions as offers_exceptions
@@ -42,6 +39,7 @@ from pcapi.routes.backoffice.forms import empty as empty_forms
 from pcapi.utils import date as date_utils
 from pcapi.utils import regions as regions_utils
 from pcapi.utils import string as string_utils
+from pcapi.workers import pro_emails_job
 from pcapi.workers import push_notification_job
 
 from . import forms
@@ -694,29 +692,54 @@ def reject_offer(offer_id: int) -> utils.BackofficeResponse:
     return redirect(request.referrer or url_for("backoffice_web.offer.list_offers"), 303)
 
 
+def _update_offers_validation(
+    offer_ids: list[int], new_validation: offers_models.OfferValidationStatus
+) -> dict[int, offers_models.OfferValidationStatus]:
+    """Update the validation of the given offers with a single query, and
+    return the previous validation status of the offers that changed.
+    """
+    old_validation_by_offer_id = dict(
+        db.session.query(offers_models.Offer.id, offers_models.Offer.validation)
+        .filter(
+            offers_models.Offer.id.in_(offer_ids),
+            offers_models.Offer.validation != new_validation,
+        )
+        .with_for_update()
+        .all()
+    )
+    if old_validation_by_offer_id:
+        offers_models.Offer.query.filter(offers_models.Offer.id.in_(old_validation_by_offer_id)).update(
+            {
+                "validation": new_validation,
+                "lastValidationDate": datetime.datetime.utcnow(),
+                "lastValidationType": OfferValidationType.MANUAL,
+                "lastValidationAuthorUserId": current_user.id,
+                "isActive": new_validation == offers_models.OfferValidationStatus.APPROVED,
+            },
+            synchronize_session=False,
+        )
+    # Commit now: cancelling bookings of rejected offers may roll back the session.
+    db.session.commit()
+    return old_validation_by_offer_id
+
+
+def _send_offers_validation_status_update_emails(
+    old_validation_by_offer_id: dict[int, offers_models.OfferValidationStatus],
+    new_validation: offers_models.OfferValidationStatus,
+) -> None:
+    if not old_validation_by_offer_id:
+        return
+    pro_emails_job.send_offers_validation_status_update_emails_job.delay(
+        {offer_id: old_validation.value for offer_id, old_validation in old_validation_by_offer_id.items()},
+        new_validation.value,
+    )
+
+
 def _batch_validate_offers(offer_ids: list[int]) -> None:
     new_validation = offers_models.OfferValidationStatus.APPROVED
-    offers = offers_models.Offer.query.filter(offers_models.Offer.id.in_(offer_ids)).all()
+    old_validation_by_offer_id = _update_offers_validation(offer_ids, new_validation)
 
-    for offer in offers:
-        if offer.validation != new_validation:
-            old_validation = offer.validation
-            offer.validation = new_validation
-            offer.lastValidationDate = datetime.datetime.utcnow()
-            offer.lastValidationType = OfferValidationType.MANUAL
-            offer.lastValidationAuthorUserId = current_user.id
-            offer.isActive = True
-
-            repository.save(offer)
-
-            recipients = (
-                [offer.venue.bookingEmail]
-                if offer.venue.bookingEmail
-                else [recipient.user.email for recipient in offer.venue.managingOfferer.UserOfferers]
-            )
-            transactional_mails.send_offer_validation_status_update_email(
-                offer, old_validation, new_validation, recipients
-            )
+    _send_offers_validation_status_update_emails(old_validation_by_offer_id, new_validation)
 
     search.async_index_offer_ids(
         offer_ids,
@@ -726,45 +749,24 @@ def _batch_validate_offers(offer_ids: list[int]) -> None:
 
 def _batch_reject_offers(offer_ids: list[int]) -> None:
     new_validation = offers_models.OfferValidationStatus.REJECTED
-    offers = offers_models.Offer.query.filter(offers_models.Offer.id.in_(offer_ids)).all()
+    old_validation_by_offer_id = _update_offers_validation(offer_ids, new_validation)
 
-    for offer in offers:
-        if offer.validation != new_validation:
-            old_validation = offer.validation
-            offer.validation = new_validation
-            offer.lastValidationDate = datetime.datetime.utcnow()
-            offer.lastValidationType = OfferValidationType.MANUAL
-            offer.lastValidationAuthorUserId = current_user.id
-            offer.isActive = False
-
-            # cancel_bookings_from_rejected_offer can raise handled exceptions that drop the
-            # modifications of the offer; we save them here first
-            repository.save(offer)
-
-            cancelled_bookings = bookings_api.cancel_bookings_from_rejected_offer(offer)
-
-            if cancelled_bookings:
-                # FIXME: La notification indique que l'offreur a annulé alors que c'est la fraude
-                # TODO(PC-23550): SPIKE avec marketing https://passculture.atlassian.net/browse/PC-23550
-                # Il faudrait utiliser send_booking_cancellation_emails_to_user_and_offerer et retirer cette notification soit la déplacer dedans, mais un mail est mieux (TBD)
-                push_notification_job.send_cancel_booking_notification.delay(
-                    [booking.id for booking in cancelled_bookings]
-                )
+    if old_validation_by_offer_id:
+        cancelled_bookings = bookings_api.cancel_bookings_from_rejected_offers(list(old_validation_by_offer_id))
 
-            repository.save(offer)
+        if cancelled_bookings:
+            # FIXME: La notification indique que l'offreur a annulé alors que c'est la fraude
+            # TODO(PC-23550): SPIKE avec marketing https://passculture.atlassian.net/browse/PC-23550
+            # Il faudrait utiliser send_booking_cancellation_emails_to_user_and_offerer et retirer cette notification soit la déplacer dedans, mais un mail est mieux (TBD)
+            push_notification_job.send_cancel_booking_notification.delay([booking.id for booking in cancelled_bookings])
 
-            recipients = (
-                [offer.venue.bookingEmail]
-                if offer.venue.bookingEmail
-                else [recipient.user.email for recipient in offer.venue.managingOfferer.UserOfferers]
-            )
-            transactional_mails.send_offer_validation_status_update_email(
-                offer, old_validation, new_validation, recipients
-            )
+        _send_offers_validation_status_update_emails(old_validation_by_offer_id, new_validation)
 
     if len(offer_ids) > 0:
-        favorites = users_models.Favorite.query.filter(users_models.Favorite.offerId.in_(offer_ids)).all()
-        repository.delete(*favorites)
+        users_models.Favorite.query.filter(users_models.Favorite.offerId.in_(offer_ids)).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
         search.async_index_offer_ids(
             offer_ids,
             reason=search.IndexationReason.OFFER_BATCH_VALIDATION,
@@ -1010,31 +1012,23 @@ def edit_offer_venue(offer_id: int) -> utils.BackofficeResponse:
 
 @list_offers_blueprint.route("/<int:offer_id>/bookings.csv", methods=["GET"])
 def download_bookings_csv(offer_id: int) -> utils.BackofficeResponse:
-    export_data = booking_repository.get_export(
+    export_data = booking_repository.stream_export(
         user=current_user,
         offer_id=offer_id,
         export_type=bookings_models.BookingExportType.CSV,
     )
-    buffer = BytesIO(typing.cast(str, export_data).encode("utf-8-sig"))
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name=f"reservations_offre_{offer_id}.csv",
-        mimetype="text/csv",
-    )
+    return utils.stream_file(export_data, download_name=f"reservations_offre_{offer_id}.csv", mimetype="text/csv")
 
 
 @list_offers_blueprint.route("/<int:offer_id>/bookings.xlsx", methods=["GET"])
 def download_bookings_xlsx(offer_id: int) -> utils.BackofficeResponse:
-    export_data = booking_repository.get_export(
+    export_data = booking_repository.stream_export(
         user=current_user,
         offer_id=offer_id,
         export_type=bookings_models.BookingExportType.EXCEL,
     )
-    buffer = BytesIO(typing.cast(bytes, export_data))
-    return send_file(
-        buffer,
-        as_attachment=True,
+    return utils.stream_file(
+        export_data,
         download_name=f"reservations_offre_{offer_id}.xlsx",
         mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
@@ -1,4 +1,5 @@
 from functools import wraps
+import itertools
 import logging
 import operator as op
 import random
@@ -8,6 +9,7 @@ from flask import Blueprint
 from flask import Response as FlaskResponse
 from flask import flash
 from flask import request
+from flask import stream_with_context
 from flask import url_for
 from flask_login import current_user
 from flask_sqlalchemy import BaseQuery
@@ -191,6 +193,21 @@ def get_query_params() -> ImmutableMultiDict[str, str]:
     return ImmutableMultiDict(item for item in request.args.items(multi=True) if item[1])
 
 
+def stream_file(chunks: typing.Iterator[bytes], download_name: str, mimetype: str) -> FlaskResponse:
+    """Send a file as an attachment, as it is generated, like `send_file()` but
+    without holding it in memory.
+
+    The first chunk is generated before the response is returned, so that an
+    error (e.g. in the query) gives an error response instead of a truncated file.
+    """
+    first_chunk = next(chunks, b"")
+    return FlaskResponse(
+        stream_with_context(itertools.chain([first_chunk], chunks)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": werkzeug.http.dump_options_header("attachment", {"filename": download_name})},
+    )
+
+
 def is_feature_active(feature_name: str) -> bool:
     return feature.FeatureToggle[feature_name].is_active()
 
@@ -2,9 +2,8 @@ import logging
 
 from pcapi import settings
 from pcapi.core.educational.utils import create_adage_jwt_fake_valid_token
-from pcapi.models import db
+from pcapi.models import feature
 from pcapi.models.api_errors import ApiErrors
-from pcapi.models.feature import Feature
 from pcapi.routes.adage_iframe import blueprint
 from pcapi.routes.apis import public_api
 from pcapi.routes.serialization import BaseModel
@@ -21,9 +20,7 @@ logger = logging.getLogger(__name__)
 def set_features(body: serializers.FeaturesToggleRequest) -> None:
     if not settings.ENABLE_TEST_ROUTES:
         raise ApiErrors({"code": "not found"}, status_code=404)
-    for feature in body.features:
-        Feature.query.filter_by(name=feature.name).update({"isActive": feature.isActive})
-        db.session.commit()
+    feature.set_feature_flags({f.name: f.isActive for f in body.features})
 
 
 class AdageFakeToken(BaseModel):
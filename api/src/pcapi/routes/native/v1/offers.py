@@ -15,10 +15,12 @@ import pcapi.core.providers.repository as providers_repository
 from pcapi.core.users.models import User
 from pcapi.models.api_errors import ApiErrors
 from pcapi.models.api_errors import ResourceNotFoundError
+from pcapi.models.feature import FeatureToggle
 from pcapi.models.offer_mixin import OfferValidationStatus
 from pcapi.routes.native.security import authenticated_and_active_user_required
 from pcapi.serialization.decorator import spectree_serialize
 from pcapi.workers import push_notification_job
+from pcapi.workers.update_cinema_stock_quantity_job import update_cinema_stock_quantity_job
 
 from . import blueprint
 from .serialization import offers as serializers
@@ -45,7 +47,12 @@ def get_offer(offer_id: str) -> serializers.OfferResponse:
     )
 
     if offer.isActive and providers_repository.is_cinema_external_ticket_applicable(offer):
-        api.update_stock_quantity_to_match_cinema_venue_provider_remaining_places(offer)
+        if FeatureToggle.ENABLE_CINEMA_STOCK_BACKGROUND_REFRESH.is_active():
+            # Return the last known stock, the job refreshes it for the next views.
+            if api.should_refresh_cinema_stock(offer):
+                update_cinema_stock_quantity_job.delay(offer.id)
+        else:
+            api.update_stock_quantity_to_match_cinema_venue_provider_remaining_places(offer)
 
     return serializers.OfferResponse.from_orm(offer)
 
@@ -1,5 +1,6 @@
-from typing import cast
+import itertools
 
+import flask
 from flask_login import current_user
 from flask_login import login_required
 
@@ -73,7 +74,7 @@ def get_user_has_bookings() -> UserHasBookingResponse:
         "Content-Disposition": "attachment; filename=reservations_pass_culture.csv",
     },
 )
-def get_bookings_csv(query: ListBookingsQueryModel) -> bytes:
+def get_bookings_csv(query: ListBookingsQueryModel) -> flask.Response:
     return _create_booking_export_file(query, BookingExportType.CSV)
 
 
@@ -86,11 +87,11 @@ def get_bookings_csv(query: ListBookingsQueryModel) -> bytes:
         "Content-Disposition": "attachment; filename=reservations_pass_culture.xlsx",
     },
 )
-def get_bookings_excel(query: ListBookingsQueryModel) -> bytes:
+def get_bookings_excel(query: ListBookingsQueryModel) -> flask.Response:
     return _create_booking_export_file(query, BookingExportType.EXCEL)
 
 
-def _create_booking_export_file(query: ListBookingsQueryModel, export_type: BookingExportType) -> bytes:
+def _create_booking_export_file(query: ListBookingsQueryModel, export_type: BookingExportType) -> flask.Response:
     venue_id = query.venue_id
     event_date = query.event_date
     booking_period = None
@@ -102,7 +103,7 @@ def _create_booking_export_file(query: ListBookingsQueryModel, export_type: Book
     booking_status = query.booking_status_filter
     offer_type = query.offer_type
 
-    export_data = booking_repository.get_export(
+    export_data = booking_repository.stream_export(
         user=current_user._get_current_object(),  # for tests to succeed, because current_user is actually a LocalProxy
         booking_period=booking_period,
         status_filter=booking_status,
@@ -111,7 +112,8 @@ def _create_booking_export_file(query: ListBookingsQueryModel, export_type: Book
         offer_type=offer_type,
         export_type=export_type,
     )
-
-    if export_type == BookingExportType.CSV:
-        return cast(str, export_data).encode("utf-8-sig")
-    return cast(bytes, export_data)
+    # Generate the first chunk (and run the query) before sending headers,
+    # so that an error gives an error response instead of a truncated file.
+    first_chunk = next(export_data, b"")
+    # Headers are set by `spectree_serialize`.
+    return flask.Response(flask.stream_with_context(itertools.chain([first_chunk], export_data)))
@@ -12,6 +12,7 @@ from pcapi.core.finance import utils as finance_utils
 from pcapi.core.offerers import api as offerers_api
 from pcapi.core.offerers import models as offerers_models
 from pcapi.core.offers import api as offers_api
+from pcapi.core.offers import ean_imports
 from pcapi.core.offers import exceptions as offers_exceptions
 from pcapi.core.offers import models as offers_models
 from pcapi.core.offers import validation as offers_validation
@@ -27,6 +28,7 @@ from pcapi.serialization.decorator import spectree_serialize
 from pcapi.serialization.spec_tree import ExtendResponse as SpectreeResponse
 from pcapi.utils import image_conversion
 from pcapi.utils import rate_limiting
+from pcapi.utils.chunks import get_chunks
 from pcapi.validation.routes.users_authentifications import api_key_required
 from pcapi.validation.routes.users_authentifications import current_api_key
 from pcapi.workers import worker
@@ -248,24 +250,114 @@ def post_product_offer_by_ean(body: serialization.ProductsOfferByEanCreation) ->
     _create_or_update_ean_offers.delay(serialized_products_stocks, venue.id, current_api_key.provider.id)
 
 
+@blueprint.v1_blueprint.route("/products/ean/imports", methods=["POST"])
+@spectree_serialize(
+    api=blueprint.v1_product_schema,
+    tags=[constants.PRODUCT_EAN_OFFER_TAG],
+    response_model=serialization.EanImportCreationResponse,
+    on_success_status=202,
+    resp=SpectreeResponse(
+        **(
+            constants.BASE_CODE_DESCRIPTIONS
+            | {
+                "HTTP_404": (None, "No venue found for the used api key"),
+                "HTTP_400": (None, "The product offers could not be created"),
+                "HTTP_202": (serialization.EanImportCreationResponse, "The import has been registered"),
+            }
+        )
+    ),
+)
+@api_key_required
+@rate_limiting.api_key_low_rate_limiter()
+def post_product_offer_by_ean_import(
+    body: serialization.ProductsOfferByEanCreation,
+) -> serialization.EanImportCreationResponse:
+    """
+    Import products offer using their European Article Number (EAN-13).
+
+    The products are created or updated asynchronously: the progress of
+    the import and the errors of each product can be followed with the
+    returned import id.
+    """
+    venue = utils.retrieve_venue_from_location(body.location)
+    if venue.isVirtual:
+        raise api_errors.ApiErrors({"location": ["Cannot create product offer for virtual venues"]})
+    serialized_products_stocks = _serialize_products_from_body(body.products)
+    provider_id = current_api_key.provider.id
+    import_id = ean_imports.create_import(provider_id, venue.id, total=len(serialized_products_stocks))
+    _create_or_update_ean_offers.delay(serialized_products_stocks, venue.id, provider_id, import_id)
+    return serialization.EanImportCreationResponse(id=import_id)
+
+
+@blueprint.v1_blueprint.route("/products/ean/imports/<import_id>", methods=["GET"])
+@spectree_serialize(
+    api=blueprint.v1_product_schema,
+    tags=[constants.PRODUCT_EAN_OFFER_TAG],
+    response_model=serialization.EanImportResponse,
+    resp=SpectreeResponse(
+        **(
+            constants.BASE_CODE_DESCRIPTIONS
+            | {
+                "HTTP_404": (None, "The import could not be found"),
+                "HTTP_200": (serialization.EanImportResponse, "The progress of the import"),
+            }
+        )
+    ),
+)
+@api_key_required
+@rate_limiting.api_key_high_rate_limiter()
+def get_product_offer_by_ean_import(import_id: str) -> serialization.EanImportResponse:
+    """
+    Get the progress of an import of products offer by EAN.
+    """
+    ean_import = ean_imports.get_import(import_id)
+    if not ean_import or ean_import.provider_id != current_api_key.provider.id:
+        raise api_errors.ApiErrors({"import_id": ["The import could not be found"]}, status_code=404)
+    return serialization.EanImportResponse.build_ean_import(ean_import)
+
+
 @job(worker.low_queue)
-def _create_or_update_ean_offers(serialized_products_stocks: dict, venue_id: int, provider_id: int) -> None:
+def _create_or_update_ean_offers(
+    serialized_products_stocks: dict, venue_id: int, provider_id: int, import_id: str | None = None
+) -> None:
     provider = providers_models.Provider.query.filter_by(id=provider_id).one()
     venue = offerers_models.Venue.query.filter_by(id=venue_id).one()
 
+    if import_id:
+        ean_imports.set_status(import_id, ean_imports.EanImportStatus.RUNNING)
+    try:
+        # Each chunk is committed on its own, so that a large import
+        # does not hold locks (nor lose everything) until the end.
+        for eans in get_chunks(sorted(serialized_products_stocks), ean_imports.CHUNK_SIZE):
+            errors = _create_or_update_ean_offers_chunk(
+                {ean: serialized_products_stocks[ean] for ean in eans}, venue, provider
+            )
+            if import_id:
+                ean_imports.record_progress(import_id, len(eans), errors)
+    except Exception:
+        if import_id:
+            ean_imports.set_status(import_id, ean_imports.EanImportStatus.FAILED)
+        raise
+    if import_id:
+        ean_imports.set_status(import_id, ean_imports.EanImportStatus.DONE)
+
+
+def _create_or_update_ean_offers_chunk(
+    serialized_products_stocks: dict,
+    venue: offerers_models.Venue,
+    provider: providers_models.Provider,
+) -> dict[str, ean_imports.Errors]:
+    """Create or update the offers of the given EANs, and return errors by EAN."""
+    venue_id = venue.id
+    errors_by_ean: dict[str, ean_imports.Errors] = {}
     ean_to_create_or_update = set(serialized_products_stocks.keys())
 
     offers_to_update = _get_existing_offers(ean_to_create_or_update, venue)
-
-    offer_to_update_by_ean = {}
-    ean_list_to_update = set()
-    for offer in offers_to_update:
-        ean_list_to_update.add(offer.extraData["ean"])  # type: ignore [index]
-        offer_to_update_by_ean[offer.extraData["ean"]] = offer  # type: ignore [index]
-
+    ean_list_to_update = {offer.extraData["ean"] for offer in offers_to_update}  # type: ignore [index]
     ean_list_to_create = ean_to_create_or_update - ean_list_to_update
-    offers_to_index = []
+    reactivated_offer_ids = []
     with repository.atomic():
+        offers = list(offers_to_update)
         if ean_list_to_create:
             created_offers = []
             existing_products = _get_existing_products(ean_list_to_create)
@@ -277,10 +369,11 @@ def _create_or_update_ean_offers(serialized_products_stocks: dict, venue_id: int
                     extra={"eans": ",".join(not_found_eans), "venue": venue_id},
                     technical_message_id="ean.not_found",
                 )
+                for ean in not_found_eans:
+                    errors_by_ean[ean] = {"ean": ["No product with this EAN can be sold on the pass Culture"]}
             for product in existing_products:
                 try:
                     ean = product.extraData["ean"] if product.extraData else None
-                    stock_data = serialized_products_stocks[ean]
                     created_offer = _create_offer_from_product(
                         venue,
                         product_by_ean[ean],
@@ -295,62 +388,49 @@ def _create_or_update_ean_offers(serialized_products_stocks: dict, venue_id: int
                     logger.info(
                         "Error while creating offer by ean", extra={"ean": ean, "venue_id": venue_id, "exc": exc}
                     )
+                    errors_by_ean[ean] = exc.errors
 
             db.session.bulk_save_objects(created_offers)
-
-            reloaded_offers = _get_existing_offers(ean_list_to_create, venue)
-            for offer in reloaded_offers:
-                try:
-                    ean = offer.extraData["ean"]  # type: ignore [index]
-                    stock_data = serialized_products_stocks[ean]
-                    # FIXME (mageoffray, 2023-05-26): stock saving optimisation
-                    # Stocks are inserted one by one for now, we need to improve create_stock to remove the repository.session.add()
-                    # It will be done before the release of this API
-                    offers_api.create_stock(
-                        offer=offer,
-                        price=finance_utils.to_euros(stock_data["price"]),
-                        quantity=serialization.deserialize_quantity(stock_data["quantity"]),
-                        booking_limit_datetime=stock_data["booking_limit_datetime"],
-                        creating_provider=provider,
-                    )
-                except (
-                    offers_exceptions.OfferCreationBaseException,
-                    offers_exceptions.OfferEditionBaseException,
-                ) as exc:
-                    logger.info(
-                        "Error while creating offer by ean", extra={"ean": ean, "venue_id": venue_id, "exc": exc}
-                    )
+            offers += _get_existing_offers(ean_list_to_create, venue)
 
         for offer in offers_to_update:
-            try:
-                offer.lastProvider = provider
+            offer.lastProvider = provider
+            if not offer.isActive:
                 offer.isActive = True
+                reactivated_offer_ids.append(offer.id)
 
-                ean = offer.extraData["ean"]  # type: ignore [index]
-                stock_data = serialized_products_stocks[ean]
-                # FIXME (mageoffray, 2023-05-26): stock upserting optimisation
-                # Stocks are edited one by one for now, we need to improve edit_stock to remove the repository.session.add()
-                # It will be done before the release of this API
-                _upsert_product_stock(
-                    offer_to_update_by_ean[ean],
-                    serialization.StockEdition(
-                        **{
-                            "price": stock_data["price"],
-                            "quantity": stock_data["quantity"],
-                            "booking_limit_datetime": stock_data["booking_limit_datetime"],
-                        }
-                    ),
-                    provider,
-                )
-                offers_to_index.append(offer_to_update_by_ean[ean].id)
-            except (offers_exceptions.OfferCreationBaseException, offers_exceptions.OfferEditionBaseException) as exc:
-                logger.info("Error while creating offer by ean", extra={"exc": exc})
+        errors = offers_api.batch_upsert_stocks(
+            offers,
+            {
+                offer.id: _deserialize_stock_upsert(serialized_products_stocks[offer.extraData["ean"]])  # type: ignore [index]
+                for offer in offers
+            },
+            provider,
+        )
+
+    for offer in offers:
+        if offer.id in errors:
+            ean = offer.extraData["ean"]  # type: ignore [index]
+            logger.info(
+                "Error while creating or updating stock by ean",
+                extra={"ean": ean, "venue_id": venue_id, "errors": errors[offer.id]},
+            )
+            errors_by_ean[ean] = errors[offer.id]
 
     search.async_index_offer_ids(
-        offers_to_index,
+        reactivated_offer_ids,
         reason=search.IndexationReason.OFFER_UPDATE,
         log_extra={"venue_id": venue_id, "source": "offers_public_api"},
     )
+    return errors_by_ean
+
+
+def _deserialize_stock_upsert(stock_data: dict) -> offers_api.StockUpsert:
+    return offers_api.StockUpsert(
+        price=finance_utils.to_euros(stock_data["price"]),
+        quantity=serialization.deserialize_quantity(stock_data["quantity"]),
+        booking_limit_datetime=stock_data["booking_limit_datetime"],
+    )
 
 
 def _get_existing_products(ean_to_create: set[str]) -> list[offers_models.Product]:
@@ -15,6 +15,7 @@ import typing_extensions
 
 from pcapi.core.categories import subcategories_v2 as subcategories
 from pcapi.core.finance import utils as finance_utils
+from pcapi.core.offers import ean_imports
 from pcapi.core.offers import models as offers_models
 from pcapi.domain import music_types
 from pcapi.domain import show_types
@@ -474,7 +475,7 @@ class ProductOfferByEanCreation(serialization.ConfiguredBaseModel):
 
 class ProductsOfferByEanCreation(serialization.ConfiguredBaseModel):
     products: list[ProductOfferByEanCreation] = pydantic_v1.Field(
-        description="List of product to create or update", max_items=500
+        description="List of product to create or update", max_items=5000
     )
     location: PhysicalLocation | DigitalLocation = LOCATION_FIELD
 
@@ -482,6 +483,33 @@ class ProductsOfferByEanCreation(serialization.ConfiguredBaseModel):
         extra = "forbid"
 
 
+class EanImportCreationResponse(serialization.ConfiguredBaseModel):
+    id: str = pydantic_v1.Field(description="Id of the import, to follow its progress")
+
+
+class EanImportError(serialization.ConfiguredBaseModel):
+    ean: str
+    errors: dict[str, list[str]]
+
+
+class EanImportResponse(serialization.ConfiguredBaseModel):
+    id: str
+    status: ean_imports.EanImportStatus
+    total: int = pydantic_v1.Field(description="Number of products sent in the import")
+    processed: int = pydantic_v1.Field(description="Number of products that have been processed so far")
+    errors: list[EanImportError] = pydantic_v1.Field(description="Products that could not be created or updated")
+
+    @classmethod
+    def build_ean_import(cls, ean_import: ean_imports.EanImport) -> "EanImportResponse":
+        return cls(
+            id=ean_import.id,
+            status=ean_import.status,
+            total=ean_import.total,
+            processed=ean_import.processed,
+            errors=[EanImportError(ean=ean, errors=errors) for ean, errors in ean_import.errors.items()],
+        )
+
+
 class DecimalPriceGetterDict(GetterDict):
     def get(self, key: str, default: typing.Any | None = None) -> typing.Any:
         if key == "price" and isinstance(self._obj.price, decimal.Decimal):
@@ -5,7 +5,7 @@ from pcapi.core.categories import subcategories_v2
 import pcapi.core.offers.factories as offers_factories
 import pcapi.core.offers.models as offers_models
 import pcapi.core.providers.factories as providers_factories
-from pcapi.core.providers.titelive_gtl import GTLS
+from pcapi.core.providers.titelive_gtl import get_gtl_ids
 from pcapi.domain.music_types import MUSIC_SUB_TYPES_BY_SLUG
 from pcapi.domain.music_types import MUSIC_TYPES_BY_SLUG
 from pcapi.domain.music_types import music_types
@@ -86,7 +86,7 @@ def create_industrial_thing_products() -> dict[str, offers_models.Product]:
                     extraData["ean"] = str(base_ean)
                     base_ean += 1
                 elif conditionalField_name == "gtl_id":
-                    extraData["gtl_id"] = random.choice(list(GTLS.keys()))
+                    extraData["gtl_id"] = random.choice(get_gtl_ids())
                 extra_data_index += 1
             thing_product.extraData = extraData
             thing_products_by_name[name] = thing_product
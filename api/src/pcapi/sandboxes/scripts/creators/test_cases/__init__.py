@@ -8,7 +8,7 @@ from pcapi.core.offerers import factories as offerers_factories
 from pcapi.core.offerers import models as offerers_models
 from pcapi.core.offers import factories as offers_factories
 from pcapi.core.providers import factories as providers_factory
-from pcapi.core.providers.titelive_gtl import GTLS
+from pcapi.core.providers.titelive_gtl import get_gtl_ids
 from pcapi.core.users import factories as users_factories
 from pcapi.domain.movie_types import movie_types
 from pcapi.domain.music_types import music_types
@@ -85,7 +85,7 @@ def create_offers_with_gtls() -> None:
 def create_offers_for_each_gtl_level_1(size_per_gtl_level_1: int, venue: offerers_models.Venue) -> None:
     for gtl_id_prefix in range(1, 14):
         gtl_id_prefix_str = str(gtl_id_prefix).zfill(2)
-        gtl_ids = [gtl_id for gtl_id in GTLS if gtl_id.startswith(gtl_id_prefix_str)]
+        gtl_ids = [gtl_id for gtl_id in get_gtl_ids() if gtl_id.startswith(gtl_id_prefix_str)]
 
         for _ in range(size_per_gtl_level_1):
             gtl_id = random.choice(gtl_ids)
@@ -386,7 +386,7 @@ def create_offers_with_more_extra_data() -> None:
         departementCode=venue_data["departementCode"],
     )
     for _ in range(2):
-        create_offers_with_gtl_id(gtl_id=random.choice(list(GTLS)), size_per_gtl=1, venue=venue)
+        create_offers_with_gtl_id(gtl_id=random.choice(get_gtl_ids()), size_per_gtl=1, venue=venue)
         creat_cine_offer_with_cast(venue)
         create_music_offers(venue)
         create_event_offers(venue)
@@ -0,0 +1,105 @@
+"""Measure the throughput of the serialization of booking exports.
+
+Rows are synthetic (no database is needed), so that this only measures
+the Python side of the export: timezone conversion and CSV/XLSX
+writing. Run it before and after a change to the export code:
+
+    python src/pcapi/scripts/booking/benchmark_export.py --rows 1000000 --format csv
+"""
+
+import argparse
+import datetime
+import itertools
+import random
+import tempfile
+import time
+import types
+import typing
+
+from pcapi.core.bookings import repository
+from pcapi.core.bookings.models import BookingStatus
+
+
+# A few mainland and overseas departments, and missing department codes
+# (whose timezone is then computed from the postal code of the offerer).
+DEPARTEMENT_CODES = ["75", "13", "69", "971", "973", "974", "988", None]
+
+
+class SyntheticQuery:
+    """Mimic the `yield_per()` method of the export query."""
+
+    def __init__(self, rows: int, seed: int) -> None:
+        self.rows = rows
+        self.seed = seed
+
+    def yield_per(self, count: int) -> typing.Iterator[types.SimpleNamespace]:
+        rng = random.Random(self.seed)
+        now = datetime.datetime.utcnow()
+        for index in range(self.rows):
+            booked_at = now - datetime.timedelta(minutes=rng.randrange(500_000))
+            yield types.SimpleNamespace(
+                venueName=f"Lieu {index % 5000}",
+                venueDepartmentCode=rng.choice(DEPARTEMENT_CODES),
+                offererPostalCode=rng.choice(["75002", "97300", "13001"]),
+                offerName=f"Offre {index % 20000}",
+                stockBeginningDatetime=booked_at + datetime.timedelta(days=7) if index % 3 == 0 else None,
+                ean="9782070000000" if index % 4 == 0 else None,
+                beneficiaryFirstName="Jeune",
+                beneficiaryLastName=f"Bénéficiaire {index}",
+                beneficiaryEmail=f"beneficiary{index}@example.com",
+                beneficiaryPhoneNumber="+33600000000",
+                beneficiaryPostalCode="75001",
+                token=f"{index:06X}"[-6:],
+                priceCategoryLabel=None,
+                amount=10.5,
+                quantity=1,
+                status=BookingStatus.USED if index % 2 else BookingStatus.CONFIRMED,
+                bookedAt=booked_at,
+                usedAt=booked_at + datetime.timedelta(days=1) if index % 2 else None,
+                reimbursedAt=None,
+                cancelledAt=None,
+                isExternal=False,
+                isConfirmed=bool(index % 5),
+            )
+
+
+def benchmark_csv(query: SyntheticQuery) -> int:
+    size = 0
+    for chunk in repository._stream_csv_report(query):
+        size += len(chunk)
+    return size
+
+
+def benchmark_excel(query: SyntheticQuery) -> int:
+    with tempfile.TemporaryFile() as output:
+        repository._write_excel_report(query, output)
+        return output.tell()
+
+
+def benchmark_booking_export(rows: int, export_format: str, seed: int = 0) -> None:
+    query = SyntheticQuery(rows, seed)
+    benchmark = benchmark_csv if export_format == "csv" else benchmark_excel
+
+    # Generating synthetic rows is not free: measure it separately.
+    start = time.perf_counter()
+    for _ in itertools.islice(query.yield_per(repository.EXPORT_BATCH_SIZE), rows):
+        pass
+    generation_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    size = benchmark(query)
+    duration = time.perf_counter() - start - generation_duration
+
+    print(f"Format: {export_format}, rows: {rows}, size: {size} bytes")
+    print(f"Row generation: {generation_duration:.2f}s (excluded)")
+    print(f"Serialization: {duration:.2f}s, {rows / duration:.0f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the serialization of booking exports")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="number of synthetic rows")
+    parser.add_argument("--format", choices=("csv", "excel"), default="csv", help="export format")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generator of synthetic rows")
+    args = parser.parse_args()
+
+    benchmark_booking_export(args.rows, args.format, args.seed)
@@ -73,7 +73,11 @@ def full_index_offers(start: int, end: int) -> None:
             q.append((offer, last_30_days_bookings.get(offer.id) or 0))
         if force_index or len(q) > BATCH_SIZE:
             try:
-                backend.index_offers([offer for offer, _ in q], {offer.id: n_bookings for offer, n_bookings in q})
+                backend.index_offers(
+                    [offer for offer, _ in q],
+                    {offer.id: n_bookings for offer, n_bookings in q},
+                    force=True,
+                )
             except Exception as exc:  # pylint: disable=broad-except
                 logger.exception(
                     "Full offer reindexation: error while reindexing from %d to %d: %s", q[0][0].id, q[-1][0].id, exc
@@ -88,6 +88,7 @@ NATIVE_APP_MINIMAL_CLIENT_VERSION = semver.VersionInfo.parse(
 # REDIS
 REDIS_URL = secrets_utils.get("REDIS_URL", "redis://localhost:6379")
 REDIS_OFFER_IDS_CHUNK_SIZE = int(os.environ.get("REDIS_OFFER_IDS_CHUNK_SIZE", 1000))
+OFFER_INDEXATION_WORKER_COUNT = int(os.environ.get("OFFER_INDEXATION_WORKER_COUNT", 1))
 REDIS_COLLECTIVE_OFFER_IDS_CHUNK_SIZE = int(os.environ.get("REDIS_COLLECTIVE_OFFER_IDS_CHUNK_SIZE", 1000))
 REDIS_COLLECTIVE_OFFER_TEMPLATE_IDS_CHUNK_SIZE = int(
     os.environ.get("REDIS_COLLECTIVE_OFFER_TEMPLATE_IDS_CHUNK_SIZE", 1000)
@@ -96,6 +97,19 @@ REDIS_VENUE_IDS_FOR_OFFERS_CHUNK_SIZE = int(os.environ.get("REDIS_VENUE_IDS_FOR_
 REDIS_VENUE_IDS_CHUNK_SIZE = int(os.environ.get("REDIS_VENUE_IDS_CHUNK_SIZE", 1000))
 
 
+# FEATURE FLAGS
+# Feature flags are cached in each process for this number of seconds (0 to disable).
+FEATURE_FLAGS_CACHE_TTL = int(os.environ.get("FEATURE_FLAGS_CACHE_TTL", 0 if IS_RUNNING_TESTS else 60))
+
+# OFFER VALIDATION
+# Compiled offer validation rules are cached in each process for this
+# number of seconds (0 to disable). The cache is also invalidated when
+# rules are edited in the backoffice.
+OFFER_VALIDATION_RULES_CACHE_TTL = int(
+    os.environ.get("OFFER_VALIDATION_RULES_CACHE_TTL", 0 if IS_RUNNING_TESTS else 600)
+)
+
+
 # SENTRY
 SENTRY_DSN = secrets_utils.get("SENTRY_DSN", "")
 SENTRY_SAMPLE_RATE = float(os.environ.get("SENTRY_SAMPLE_RATE", 0))
@@ -104,6 +118,8 @@ SENTRY_SAMPLE_RATE = float(os.environ.get("SENTRY_SAMPLE_RATE", 0))
 # USERS
 MAX_FAVORITES = int(os.environ.get("MAX_FAVORITES", 100))  # 0 is unlimited
 MAX_API_KEY_PER_OFFERER = int(os.environ.get("MAX_API_KEY_PER_OFFERER", 5))
+API_KEY_CACHE_TTL = int(os.environ.get("API_KEY_CACHE_TTL", 5 * 60))  # in seconds, 0 to disable
+API_KEY_CACHE_MAX_SIZE = int(os.environ.get("API_KEY_CACHE_MAX_SIZE", 10_000))
 USE_FAST_AND_INSECURE_PASSWORD_HASHING_ALGORITHM = bool(
     int(os.environ.get("USE_FAST_AND_INSECURE_PASSWORD_HASHING_ALGORITHM", False))
 )
@@ -259,6 +275,18 @@ EMS_API_BOOKING_SECRET_KEY = secrets_utils.get("EMS_API_BOOKING_SECRET_KEY", "")
 EMS_API_BOOKING_HEADER = secrets_utils.get("EMS_API_BOOKING_HEADER", "")
 EMS_SITES_API_URL = secrets_utils.get("EMS_SITES_API_URL")
 EMS_GOOGLE_DRIVE_FOLDER = secrets_utils.get("EMS_GOOGLE_DRIVE_FOLDER")
+# Age (in seconds) after which the stock of a cinema offer is refreshed
+# in the background when the offer is viewed.
+CDS_STOCK_REFRESH_MAX_AGE = int(os.environ.get("CDS_STOCK_REFRESH_MAX_AGE", 60))
+BOOST_STOCK_REFRESH_MAX_AGE = int(os.environ.get("BOOST_STOCK_REFRESH_MAX_AGE", 60))
+CGR_STOCK_REFRESH_MAX_AGE = int(os.environ.get("CGR_STOCK_REFRESH_MAX_AGE", 60))
+EMS_STOCK_REFRESH_MAX_AGE = int(os.environ.get("EMS_STOCK_REFRESH_MAX_AGE", 60))
+# Duration (in seconds) of the in-process cache of slow-changing data of
+# cinema providers (voucher types, screens, etc.)
+EXTERNAL_BOOKINGS_METADATA_CACHE_TTL = int(os.environ.get("EXTERNAL_BOOKINGS_METADATA_CACHE_TTL", 3600))
+# Number of threads that download, process and upload thumbs during the
+# synchronization of a provider
+PROVIDER_THUMBS_WORKERS = int(os.environ.get("PROVIDER_THUMBS_WORKERS", 4))
 
 # DEMARCHES SIMPLIFIEES
 DMS_VENUE_PROCEDURE_ID_V4 = os.environ.get("DEMARCHES_SIMPLIFIEES_RIB_VENUE_PROCEDURE_ID_V4", 0)
@@ -456,6 +484,8 @@ FINANCE_OVERRIDE_PRICING_ORDERING_ON_PRICING_POINTS = secrets_utils.getlist(
     "FINANCE_OVERRIDE_PRICING_ORDERING_ON_PRICING_POINTS",
     type_=int,
 )
+# From 1 (fastest) to 9 (smallest files)
+FINANCE_FILES_COMPRESSION_LEVEL = int(os.environ.get("FINANCE_FILES_COMPRESSION_LEVEL", 6))
 
 # BACKOFFICE
 BACKOFFICE_ALLOW_USER_CREATION = os.environ.get("BACKOFFICE_ALLOW_USER_CREATION", "False") == "True"
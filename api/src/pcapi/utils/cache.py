@@ -2,13 +2,26 @@ from functools import partial
 from functools import wraps
 from hashlib import sha256
 import json
+import logging
+import os
+import threading
+import time
 from typing import Any
 from typing import Callable
+from typing import Generic
 from typing import Iterable
+from typing import TypeVar
 from typing import cast
 
+import flask
 from flask import current_app
 import pydantic.v1 as pydantic_v1
+import redis
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 
 class _CacheProxy:
@@ -141,3 +154,78 @@ def _compute_arguments_hash(args: Iterable[Any], kwargs: dict[str, Any]) -> str:
         # use sha256 to reduce hash collision and cache poisonning
         return sha256(args_string.encode("utf-8")).hexdigest()
     return "default"
+
+
+class InvalidatedProcessCache(Generic[T]):
+    """A process-level cache of a single value.
+
+    The value expires after `ttl()` seconds. It is also cleared as soon
+    as a message is published on `channel` (see `invalidate()`), through
+    a Redis subscription that is started (once per process) when the
+    value is first loaded.
+    """
+
+    def __init__(self, channel: str, ttl: Callable[[], int]) -> None:
+        self.channel = channel
+        self.ttl = ttl
+        self.value: T | None = None
+        self.expires_at = 0.0
+        self.lock = threading.Lock()
+        self.listener_pid: int | None = None
+
+    def get(self) -> T | None:
+        with self.lock:
+            if self.value is not None and self.expires_at > time.monotonic():
+                return self.value
+        return None
+
+    def set(self, value: T) -> None:
+        with self.lock:
+            self.value = value
+            self.expires_at = time.monotonic() + self.ttl()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.value = None
+
+    def invalidate(self) -> None:
+        """Clear the value in this process and ask other processes to
+        clear theirs.
+        """
+        self.clear()
+        if not flask.has_app_context():
+            return
+        try:
+            current_app.redis_client.publish(self.channel, "")
+        except redis.exceptions.RedisError:
+            logger.exception("Could not publish cache invalidation message", extra={"channel": self.channel})
+
+    def start_invalidation_listener(self) -> None:
+        # Threads do not survive a fork (e.g. Gunicorn workers), hence
+        # the check on the pid.
+        if self.listener_pid == os.getpid() or not flask.has_app_context():
+            return
+        redis_client = getattr(current_app, "redis_client", None)
+        if redis_client is None:
+            return
+        with self.lock:
+            if self.listener_pid == os.getpid():
+                return
+            self.listener_pid = os.getpid()
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.channel: lambda _message: self.clear()})
+            pubsub.run_in_thread(sleep_time=1, daemon=True, exception_handler=self._on_listener_error)
+        except redis.exceptions.RedisError:
+            logger.exception("Could not subscribe to cache invalidation channel", extra={"channel": self.channel})
+            self.listener_pid = None
+
+    def _on_listener_error(
+        self, exc: Exception, pubsub: redis.client.PubSub, thread: redis.client.PubSubWorkerThread
+    ) -> None:
+        # We may have missed invalidation messages: drop the value and
+        # let the next call start a new listener.
+        logger.warning("Cache invalidation listener stopped", extra={"channel": self.channel, "exc": str(exc)})
+        thread.stop()
+        self.listener_pid = None
+        self.clear()
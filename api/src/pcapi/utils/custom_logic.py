@@ -92,3 +92,61 @@ OPERATIONS = {
     "intersects": intersects,
     "not intersects": lambda a, b: not intersects(a, b),
 }
+
+
+def _sanitized_collection(b: typing.Any) -> tuple[frozenset | None, list] | None:
+    if "__contains__" not in dir(b):
+        return None
+    sanitized = sanitize_list(b)
+    try:
+        return frozenset(sanitized), sanitized
+    except TypeError:  # unhashable items
+        return None, sanitized
+
+
+def _is_in(a: typing.Any, collection: tuple[frozenset | None, list]) -> bool:
+    sanitized_a = sanitize_str(a)
+    items_set, items = collection
+    if items_set is not None:
+        try:
+            return sanitized_a in items_set
+        except TypeError:  # unhashable `a`
+            pass
+    return sanitized_a in items
+
+
+def compile_operation(operator: str, b: typing.Any) -> typing.Callable[[typing.Any], bool]:
+    """Return a function that applies `OPERATIONS[operator]` with `b` as
+    second operand.
+
+    `b` is sanitized once, instead of on each call, when the operation
+    sanitizes it.
+    """
+    match operator:
+        case "in" | "not in":
+            collection = _sanitized_collection(b)
+            if collection is None:
+                return lambda a: operator == "not in"
+            if operator == "in":
+                return lambda a: _is_in(a, collection)
+            return lambda a: not _is_in(a, collection)
+        case "contains" if isinstance(b, list):
+            sanitized_b = sanitize_list(b)
+            return lambda a: bool(a) and any(element in sanitize_str(a) for element in sanitized_b)
+        case "contains-exact" if isinstance(b, list):
+            sanitized_b = sanitize_list(b)
+
+            def _contains_exact(a: typing.Any) -> bool:
+                if not a:
+                    return False
+                split_a = sanitize_list(a.split())
+                return any(element in split_a for element in sanitized_b)
+
+            return _contains_exact
+        case "intersects" | "not intersects" if isinstance(b, list) and b:
+            sanitized_b_set = set(sanitize_list(b))
+            if operator == "intersects":
+                return lambda a: bool(a) and not sanitized_b_set.isdisjoint(sanitize_list(a))
+            return lambda a: not (bool(a) and not sanitized_b_set.isdisjoint(sanitize_list(a)))
+    operation: typing.Callable[[typing.Any, typing.Any], bool] = OPERATIONS[operator]  # type: ignore [assignment]
+    return lambda a: operation(a, b)
@@ -1,17 +1,23 @@
+import collections
 from dataclasses import dataclass
 from datetime import datetime
 import json
+import os
 import pathlib
 import shutil
 import tempfile
 import threading
+import typing
 import urllib.parse
 
 import weasyprint
+from weasyprint.text.fonts import FontConfiguration
 
 
 PDF_AUTHOR = "Pass Culture"
-url_fetcher_container = threading.local()
+# Maximum number of decoded images that a renderer keeps.
+IMAGE_CACHE_MAX_SIZE = 100
+renderer_container = threading.local()
 
 
 @dataclass
@@ -23,15 +29,26 @@ class PdfMetadata:
 
 
 class CachingUrlFetcher:
-    """A URL fetcher for weasyprint that caches files."""
+    """A URL fetcher for weasyprint that caches files.
 
-    def __init__(self) -> None:
+    If ``cache_dir`` is given, files are cached in this directory,
+    which may be shared by multiple processes (and is not deleted by
+    the fetcher). Otherwise, files are cached in a private temporary
+    directory.
+    """
+
+    def __init__(self, cache_dir: pathlib.Path | None = None) -> None:
+        self.shared_cache_dir = cache_dir
         self.create_cache()
 
     def __del__(self) -> None:
         self.delete_cache()
 
     def create_cache(self) -> None:
+        if self.shared_cache_dir:
+            self.tmp_dir = self.shared_cache_dir
+            self.tmp_dir.mkdir(parents=True, exist_ok=True)
+            return
         self.tmp_dir_parent = pathlib.Path(tempfile.mkdtemp())
         self.tmp_dir = self.tmp_dir_parent / "weasyprint_cache"
         self.tmp_dir.mkdir()
@@ -44,6 +61,8 @@ class CachingUrlFetcher:
         self.shutil_rmtree = shutil.rmtree
 
     def delete_cache(self) -> None:
+        if self.shared_cache_dir:
+            return
         try:
             self.shutil_rmtree(self.tmp_dir_parent)
         except Exception:  # pylint: disable=broad-except
@@ -65,28 +84,90 @@ class CachingUrlFetcher:
             # File objects cannot be serialized, we serialize their
             # content instead.
             result["string"] = result.pop("file_obj").read()  # type: ignore[attr-defined]
-        with content_path.open("bx") as fp:
-            fp.write(result["string"])  # despite the name, it's bytes
+        # The cache may be shared with other processes: write files
+        # atomically, the metadata first, since the presence of the
+        # content file tells that the URL has been cached.
         metadata = {key: value for key, value in result.items() if key != "string"}
-        with metadata_path.open("tx", encoding="utf-8") as fp:
-            fp.write(json.dumps(metadata))
+        self._write_atomically(metadata_path, json.dumps(metadata).encode("utf-8"))
+        self._write_atomically(content_path, result["string"])  # despite the name, it's bytes
         return result
 
+    def _write_atomically(self, path: pathlib.Path, content: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(content)
+        os.replace(tmp_path, path)
+
+
+class ImageCache(collections.OrderedDict[str, typing.Any]):
+    """A cache of decoded images for weasyprint, that only keeps the
+    ``max_size`` most recently used images (e.g. offerer logos).
+    """
+
+    def __init__(self, max_size: int = IMAGE_CACHE_MAX_SIZE) -> None:
+        super().__init__()
+        self.max_size = max_size
+
+    def __getitem__(self, key: str) -> typing.Any:
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: str, value: typing.Any) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_size:
+            self.popitem(last=False)
+
+
+class PdfRenderer:
+    """Render PDF documents with weasyprint.
+
+    Fetched files (stylesheets, fonts and images), fonts configuration
+    and decoded images are kept from one document to the next. Loading
+    the system fonts and the fonts of `@font-face` rules is slow: a
+    renderer should hence be reused to render multiple documents.
+    """
+
+    def __init__(self, cache_dir: pathlib.Path | None = None) -> None:
+        self.url_fetcher = CachingUrlFetcher(cache_dir)
+        self.font_config = FontConfiguration()
+        self.image_cache = ImageCache()
+
+    def render(self, html_content: str, metadata: PdfMetadata | None = None) -> bytes:
+        document = weasyprint.HTML(string=html_content, url_fetcher=self.url_fetcher.fetch_url).render(
+            font_config=self.font_config,
+            image_cache=self.image_cache,
+        )
+        metadata = metadata or PdfMetadata()
+        # a W3C date, as expected by Weasyprint
+        document.metadata.created = (metadata.created or datetime.utcnow()).strftime("%Y-%m-%dT%H:%M:%SZ")
+        document.metadata.modified = document.metadata.created
+        document.metadata.authors = [metadata.author]
+        document.metadata.title = metadata.title
+        document.metadata.description = metadata.description
+        return document.write_pdf()
+
+
+def _get_renderer() -> PdfRenderer:
+    if not hasattr(renderer_container, "renderer"):
+        renderer_container.renderer = PdfRenderer()
+    return renderer_container.renderer
+
 
 def _get_url_fetcher() -> CachingUrlFetcher:
-    if not hasattr(url_fetcher_container, "fetcher"):
-        url_fetcher_container.fetcher = CachingUrlFetcher()
-    return url_fetcher_container.fetcher
+    return _get_renderer().url_fetcher
+
+
+def use_shared_cache(cache_dir: pathlib.Path) -> None:
+    """Render PDF documents of the current thread with a new renderer
+    that caches fetched files in ``cache_dir``.
+
+    This is meant to be called at the start of worker processes, so
+    that they share the files they fetch.
+    """
+    renderer_container.renderer = PdfRenderer(cache_dir)
 
 
 def generate_pdf_from_html(html_content: str, metadata: PdfMetadata | None = None) -> bytes:
-    fetcher = _get_url_fetcher()
-    document = weasyprint.HTML(string=html_content, url_fetcher=fetcher.fetch_url).render()
-    metadata = metadata or PdfMetadata()
-    # a W3C date, as expected by Weasyprint
-    document.metadata.created = (metadata.created or datetime.utcnow()).strftime("%Y-%m-%dT%H:%M:%SZ")
-    document.metadata.modified = document.metadata.created
-    document.metadata.authors = [metadata.author]
-    document.metadata.title = metadata.title
-    document.metadata.description = metadata.description
-    return document.write_pdf()
+    return _get_renderer().render(html_content, metadata)
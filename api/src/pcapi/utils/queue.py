@@ -1,5 +1,7 @@
 import json
 import logging
+from typing import Iterable
+from typing import Iterator
 
 from flask import current_app
 import redis.exceptions
@@ -30,3 +32,92 @@ def pop_from_queue(queue_name: str) -> dict | None:
         logger.exception("Could not pop element from queue", extra={"queue": queue_name})
         return None
     return json.loads(item) if item else None
+
+
+# Number of items sent in a single command. Lua `unpack()` and Redis
+# arguments are limited, and huge commands block Redis for too long.
+CHUNK_SIZE = 1000
+
+# Move (at most) ARGV[1] items from the tail of KEYS[1] to the head of
+# KEYS[2] and return them, exactly like as many calls to RPOPLPUSH
+# would, but atomically and in a single round-trip. A negative count
+# moves all items. Google Cloud has Redis 5.0, which has no `LMOVE`
+# and no `count` argument for `RPOP`.
+_MOVE_SCRIPT = """
+local count = tonumber(ARGV[1])
+local chunk_size = tonumber(ARGV[2])
+if count == 0 then
+    return {}
+end
+local items
+if count < 0 then
+    items = redis.call("LRANGE", KEYS[1], 0, -1)
+else
+    items = redis.call("LRANGE", KEYS[1], -count, -1)
+end
+if #items == 0 then
+    return items
+end
+redis.call("LTRIM", KEYS[1], 0, -#items - 1)
+for i = #items, 1, -chunk_size do
+    local chunk = {}
+    for j = i, math.max(i - chunk_size + 1, 1), -1 do
+        chunk[#chunk + 1] = items[j]
+    end
+    redis.call("LPUSH", KEYS[2], unpack(chunk))
+end
+return items
+"""
+
+
+def _chunks(items: list, size: int = CHUNK_SIZE) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def push_many(queue_name: str, items: Iterable[str | int], at_head: bool = False) -> None:
+    """Push raw items to a queue in a single round-trip.
+
+    Items are pushed in chunks, within a transaction. Errors are not
+    caught: callers know what to log.
+    """
+    items = list(items)
+    if not items:
+        return
+    redis_client = current_app.redis_client
+    with redis_client.pipeline(transaction=True) as pipeline:
+        for chunk in _chunks(items):
+            if at_head:
+                pipeline.lpush(queue_name, *chunk)
+            else:
+                pipeline.rpush(queue_name, *chunk)
+        pipeline.execute()
+
+
+def move_items(queue_name: str, destination: str, count: int) -> list[str]:
+    """Atomically move up to `count` items from the tail of a queue to
+    the head of another queue, and return them (in the order they had
+    in the originating queue). A negative `count` moves all items.
+    """
+    # Registering the script only computes its SHA1: it is then run
+    # with EVALSHA, and only sent in full if Redis does not know it yet.
+    move_script = current_app.redis_client.register_script(_MOVE_SCRIPT)
+    return move_script(keys=[queue_name, destination], args=[count, CHUNK_SIZE])
+
+
+def acknowledge(processing_queue: str, items: Iterable[str | int] | None = None) -> None:
+    """Remove processed items from a processing queue, or the whole
+    queue if `items` is not given.
+    """
+    redis_client = current_app.redis_client
+    if items is None:
+        redis_client.delete(processing_queue)
+        return
+    # Each LREM scans the queue: send them in chunks, without a
+    # transaction, so that other clients are not blocked until all
+    # items have been removed.
+    with redis_client.pipeline(transaction=False) as pipeline:
+        for chunk in _chunks(list(items)):
+            for item in chunk:
+                pipeline.lrem(processing_queue, 1, item)
+            pipeline.execute()
@@ -1,10 +1,16 @@
+import http.cookiejar
 import logging
+import os
 import re
+import threading
+import time
 from typing import Any
 from typing import Callable
+import urllib.parse
 
 import gql.transport.exceptions
 import gql.transport.requests
+import prometheus_client
 import requests
 from requests import Response
 from requests.adapters import HTTPAdapter
@@ -24,6 +30,13 @@ logger = logging.getLogger(__name__)
 
 # See also `SENDINBLUE_REQUEST_TIMEOUT` in `pcapi.core.monkeypatches`
 REQUEST_TIMEOUT_IN_SECOND = 10
+SHARED_SESSION_POOL_SIZE = 20
+
+shared_session_request_duration = prometheus_client.Histogram(
+    "pcapi_external_request_duration_seconds",
+    "Duration of requests sent through shared HTTP sessions",
+    ["session", "method", "endpoint"],
+)
 
 
 class ExternalAPIException(Exception):
@@ -72,26 +85,43 @@ def _wrapper(
     return response
 
 
-def get(url: str, disable_synchronous_retry: bool = False, **kwargs: Any) -> Response:
+def _request(
+    method: str, url: str, disable_synchronous_retry: bool, shared_session: str | None, **kwargs: Any
+) -> Response:
+    if shared_session:
+        return get_shared_session(shared_session).request(method=method, url=url, **kwargs)
     with Session(disable_synchronous_retry=disable_synchronous_retry) as session:
-        return session.request(method="GET", url=url, **kwargs)
+        return session.request(method=method, url=url, **kwargs)
 
 
-def post(url: str, hmac: str | None = None, disable_synchronous_retry: bool = False, **kwargs: Any) -> Response:
-    with Session(disable_synchronous_retry=disable_synchronous_retry) as session:
-        if hmac:
-            kwargs.setdefault("headers", {}).update({"PassCulture-Signature": hmac})
-        return session.request(method="POST", url=url, **kwargs)
+def get(
+    url: str, disable_synchronous_retry: bool = False, shared_session: str | None = None, **kwargs: Any
+) -> Response:
+    return _request("GET", url, disable_synchronous_retry, shared_session, **kwargs)
 
 
-def put(url: str, disable_synchronous_retry: bool = False, **kwargs: Any) -> Response:
-    with Session(disable_synchronous_retry=disable_synchronous_retry) as session:
-        return session.request(method="PUT", url=url, **kwargs)
+def post(
+    url: str,
+    hmac: str | None = None,
+    disable_synchronous_retry: bool = False,
+    shared_session: str | None = None,
+    **kwargs: Any,
+) -> Response:
+    if hmac:
+        kwargs.setdefault("headers", {}).update({"PassCulture-Signature": hmac})
+    return _request("POST", url, disable_synchronous_retry, shared_session, **kwargs)
 
 
-def delete(url: str, disable_synchronous_retry: bool = False, **kwargs: Any) -> Response:
-    with Session(disable_synchronous_retry=disable_synchronous_retry) as session:
-        return session.request(method="DELETE", url=url, **kwargs)
+def put(
+    url: str, disable_synchronous_retry: bool = False, shared_session: str | None = None, **kwargs: Any
+) -> Response:
+    return _request("PUT", url, disable_synchronous_retry, shared_session, **kwargs)
+
+
+def delete(
+    url: str, disable_synchronous_retry: bool = False, shared_session: str | None = None, **kwargs: Any
+) -> Response:
+    return _request("DELETE", url, disable_synchronous_retry, shared_session, **kwargs)
 
 
 class Session(requests.Session):
@@ -110,6 +140,85 @@ class Session(requests.Session):
         return _wrapper(super().request, method, url, *args, **kwargs)
 
 
+class SharedSession(Session):
+    """A long-lived session, shared by all callers of the process that
+    talk to the same external service.
+
+    Connections are kept alive in a pool, so that successive calls do
+    not pay a TCP and TLS handshake each. Requests are retried (with a
+    backoff) on connection errors. GET and HEAD requests are also
+    retried on 502, 503 and 504 responses: once retries are exhausted,
+    the last response is returned, so that callers handle it as any
+    other error response. The duration of each request is recorded in
+    a Prometheus histogram, by session and endpoint.
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(disable_synchronous_retry=True)
+        self.name = name
+        # The session is shared by calls made on behalf of different
+        # accounts: never send back cookies set by a previous response.
+        self.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        retry = Retry(
+            total=3,
+            backoff_factor=0.1,
+            status_forcelist=[502, 503, 504],
+            # Do not replay requests that have side effects (e.g. a
+            # booking cancellation) on an error response.
+            allowed_methods=["GET", "HEAD"],
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=SHARED_SESSION_POOL_SIZE, pool_maxsize=SHARED_SESSION_POOL_SIZE, max_retries=retry
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method: str | bytes, url: str | bytes, *args: Any, **kwargs: Any) -> Response:
+        start = time.perf_counter()
+        try:
+            return super().request(method, url, *args, **kwargs)
+        finally:
+            shared_session_request_duration.labels(
+                session=self.name,
+                method=str(method).upper(),
+                endpoint=_get_endpoint_label(url),
+            ).observe(time.perf_counter() - start)
+
+
+def _get_endpoint_label(url: str | bytes) -> str:
+    """Return the path of the URL, without its query string and with
+    numeric path segments (ids, dates) replaced, so that the number of
+    label values stays small.
+    """
+    path = urllib.parse.urlparse(str(url)).path
+    return re.sub(r"\d+", ":id", path)
+
+
+_shared_sessions: dict[str, SharedSession] = {}
+_shared_sessions_lock = threading.Lock()
+
+
+def get_shared_session(name: str) -> SharedSession:
+    with _shared_sessions_lock:
+        session = _shared_sessions.get(name)
+        if session is None:
+            session = _shared_sessions[name] = SharedSession(name)
+        return session
+
+
+def close_shared_sessions() -> None:
+    with _shared_sessions_lock:
+        for session in _shared_sessions.values():
+            session.close()
+        _shared_sessions.clear()
+
+
+# Connections must not be shared with forked processes: a child
+# process opens its own connections.
+os.register_at_fork(after_in_child=_shared_sessions.clear)
+
+
 class CustomZeepTransport(zeep.Transport):
     """A Transport class for zeep that uses our wrapper that logs."""
 
@@ -0,0 +1,17 @@
+import pcapi.core.mails.transactional as transactional_mails
+from pcapi.core.offers import models as offers_models
+from pcapi.workers import worker
+from pcapi.workers.decorators import job
+
+
+@job(worker.default_queue)
+def send_offers_validation_status_update_emails_job(
+    old_status_by_offer_id: dict[int, str], validation_status: str
+) -> None:
+    transactional_mails.send_offers_validation_status_update_emails(
+        {
+            offer_id: offers_models.OfferValidationStatus(old_status)
+            for offer_id, old_status in old_status_by_offer_id.items()
+        },
+        offers_models.OfferValidationStatus(validation_status),
+    )
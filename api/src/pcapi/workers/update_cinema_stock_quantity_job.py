@@ -0,0 +1,18 @@
+import logging
+
+import pcapi.core.offers.api as offers_api
+import pcapi.core.offers.models as offers_models
+from pcapi.workers import worker
+from pcapi.workers.decorators import job
+
+
+logger = logging.getLogger(__name__)
+
+
+@job(worker.default_queue)
+def update_cinema_stock_quantity_job(offer_id: int) -> None:
+    offer = offers_models.Offer.query.get(offer_id)
+    if not offer or not offer.isActive:
+        logger.info("Skipped cinema stock refresh of inactive or deleted offer", extra={"offer": offer_id})
+        return
+    offers_api.update_stock_quantity_to_match_cinema_venue_provider_remaining_places(offer)
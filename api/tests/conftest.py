@@ -25,8 +25,13 @@ from pcapi import repository
 from pcapi import settings
 from pcapi.analytics.amplitude import testing as amplitude_testing
 import pcapi.core.educational.testing as adage_api_testing
+import pcapi.core.external_bookings.api as external_bookings_api
+import pcapi.core.external_bookings.models as external_bookings_models
+from pcapi.core.geography import repository as geography_repository
 import pcapi.core.mails.testing as mails_testing
 import pcapi.core.object_storage.testing as object_storage_testing
+from pcapi.core.offerers import api_key_cache
+import pcapi.core.offers.validation_rules as offer_validation_rules
 import pcapi.core.search.testing as search_testing
 import pcapi.core.testing
 from pcapi.core.users import testing as users_testing
@@ -34,6 +39,7 @@ import pcapi.core.users.models as users_models
 from pcapi.install_database_extensions import install_database_extensions
 from pcapi.models import db
 from pcapi.models.feature import install_feature_flags
+from pcapi.models.feature import invalidate_features_cache
 from pcapi.notifications.internal import testing as internal_notifications_testing
 from pcapi.notifications.push import testing as push_notifications_testing
 from pcapi.notifications.sms import testing as sms_notifications_testing
@@ -157,6 +163,19 @@ def clear_outboxes():
         amplitude_testing.reset_requests()
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    try:
+        yield
+    finally:
+        api_key_cache.clear()
+        invalidate_features_cache()
+        offer_validation_rules.invalidate_offer_validation_rules_cache()
+        external_bookings_api.clear_clients()
+        external_bookings_models.clear_process_cache()
+        geography_repository.clear_iris_cache()
+
+
 @pytest.fixture(autouse=True)
 def clear_redis(app):
     try:
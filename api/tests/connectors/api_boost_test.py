@@ -1,5 +1,7 @@
 import datetime
+import http.server
 import logging
+import threading
 
 from freezegun import freeze_time
 import pytest
@@ -462,3 +464,60 @@ class BoostPutResourceTest:
         assert get_adapter.call_count == 2
         assert get_adapter.last_request.headers["Authorization"] == "Bearer new-token"
         assert json_data == expected_response
+
+
+@pytest.fixture(name="unavailable_server")
+def unavailable_server_fixture():
+    """Run a local server that always answers 503, and return the list
+    of the methods of the requests it received.
+    """
+    received_methods = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def _respond(self):
+            received_methods.append(self.command)
+            self.send_response(503, "Service Unavailable")
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b'{"message": "Try again later"}')
+
+        do_GET = do_PUT = _respond
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/", received_methods
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class BoostUnavailableServiceTest:
+    # These tests do not use `requests_mock`, so that requests go
+    # through the retry policy of the shared session.
+    def test_get_is_retried_then_raises(self, unavailable_server):
+        cinema_url, received_methods = unavailable_server
+        cinema_details = providers_factories.BoostCinemaDetailsFactory(cinemaUrl=cinema_url, token="token")
+        cinema_str_id = cinema_details.cinemaProviderPivot.idAtProvider
+
+        with pytest.raises(boost_exceptions.BoostAPIException) as exc:
+            boost.get_resource(cinema_str_id, boost.ResourceBoost.EXAMPLE)
+
+        assert received_methods == ["GET"] * 4
+        assert (
+            str(exc.value) == "Error on Boost API on GET ResourceBoost.EXAMPLE : Service Unavailable - Try again later"
+        )
+
+    def test_put_is_not_retried(self, unavailable_server):
+        cinema_url, received_methods = unavailable_server
+        cinema_details = providers_factories.BoostCinemaDetailsFactory(cinemaUrl=cinema_url, token="token")
+        cinema_str_id = cinema_details.cinemaProviderPivot.idAtProvider
+
+        with pytest.raises(boost_exceptions.BoostAPIException):
+            boost.put_resource(cinema_str_id, boost.ResourceBoost.EXAMPLE, BaseModel(key=1))
+
+        assert received_methods == ["PUT"]
@@ -67,7 +67,9 @@ class CineDigitalServiceGetResourceTest:
         json_data = get_resource(api_url, cinema_id, token, resource)
 
         # Then
-        request_get.assert_called_once_with("https://test_id.test_url/tariffs?api_token=test_token")
+        request_get.assert_called_once_with(
+            "https://test_id.test_url/tariffs?api_token=test_token", shared_session="cds"
+        )
         assert json_data == shows_json
 
     @mock.patch("pcapi.connectors.cine_digital_service.requests.get")
@@ -83,7 +85,9 @@ class CineDigitalServiceGetResourceTest:
         with pytest.raises(cds_exceptions.CineDigitalServiceAPIException) as exc_info:
             get_resource(api_url, cinema_id, token, resource)
 
-        request_get.assert_called_once_with("https://test_id.test_url/tariffs?api_token=test_token")
+        request_get.assert_called_once_with(
+            "https://test_id.test_url/tariffs?api_token=test_token", shared_session="cds"
+        )
 
         assert isinstance(exc_info.value, cds_exceptions.CineDigitalServiceAPIException)
         assert token not in str(exc_info.value)
@@ -102,7 +106,9 @@ class CineDigitalServiceGetResourceTest:
         # When
         get_resource(api_url, cinema_id, token, resource, path_params)
         # Then
-        request_get.assert_called_once_with("https://test_id.test_url/shows/1/seatmap?api_token=test_token")
+        request_get.assert_called_once_with(
+            "https://test_id.test_url/shows/1/seatmap?api_token=test_token", shared_session="cds"
+        )
 
 
 class CineDigitalServicePutResourceTest:
@@ -129,6 +135,7 @@ class CineDigitalServicePutResourceTest:
             "https://test_id.test_url/transaction/cancel?api_token=test_token",
             headers={"Content-Type": "application/json"},
             data='{"barcodes": [111111111111], "paiementtypeid": 5}',
+            shared_session="cds",
         )
         assert json_data == response_json
 
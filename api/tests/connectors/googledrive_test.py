@@ -131,6 +131,34 @@ def test_create_file(mocked_request, tmpdir):
     assert b"dummy data" in mocked_request.call_args_list[0].kwargs["body"]
 
 
+@override_settings(GOOGLE_DRIVE_BACKEND="pcapi.connectors.googledrive.GoogleDriveBackend")
+@mock_credentials
+@mock.patch("pcapi.connectors.googledrive.UPLOAD_CHUNK_SIZE", 4)
+@mock.patch("httplib2.Http.request")
+@mock.patch("googleapiclient.http._retry_request")
+def test_create_large_file(mocked_request, mocked_upload_request, tmpdir):
+    # Initiate resumable upload, then upload 2 chunks.
+    mocked_request.return_value = httplib2.Response({"status": 200, "location": "https://upload.example.com/1"}), b""
+    mocked_upload_request.side_effect = [
+        (httplib2.Response({"status": 308, "range": "bytes=0-3"}), b""),
+        (httplib2.Response({"status": 200}), json.dumps({"id": "file-id"}).encode()),
+    ]
+
+    backend = googledrive.get_backend()
+    path = tmpdir / "tmp.txt"
+    path.write_text("dummy data", "utf-8")
+    file_id = backend.create_file("parent-folder-id", "name", path)
+
+    assert file_id == "file-id"
+    mocked_request.assert_called_once()
+    url = mocked_request.call_args_list[0].args[5]
+    assert "uploadType=resumable" in url
+    assert [call.kwargs["headers"]["Content-Range"] for call in mocked_upload_request.call_args_list] == [
+        "bytes 0-3/10",
+        "bytes 4-7/10",
+    ]
+
+
 @override_settings(GOOGLE_DRIVE_BACKEND="pcapi.connectors.googledrive.GoogleDriveBackend")
 @mock_credentials
 @mock.patch("googleapiclient.http._retry_request")
@@ -1,3 +1,4 @@
+import codecs
 import csv
 from datetime import date
 from datetime import datetime
@@ -1851,6 +1852,43 @@ class GetExcelReportTest:
         assert sheet.cell(row=2, column=17).value == "Non"
 
 
+class StreamExportTest:
+    def _create_bookings(self, count):
+        pro = users_factories.ProFactory()
+        offerer = offerers_factories.OffererFactory()
+        offerers_factories.UserOffererFactory(user=pro, offerer=offerer)
+        stock = offers_factories.ThingStockFactory(offer__venue__managingOfferer=offerer, price=0)
+        bookings_factories.BookingFactory.create_batch(count, stock=stock)
+        bookings_factories.BookingFactory(stock=stock, quantity=2)
+        return pro
+
+    def test_stream_csv_export(self, monkeypatch):
+        monkeypatch.setattr(booking_repository, "EXPORT_BATCH_SIZE", 2)
+        pro = self._create_bookings(4)
+
+        chunks = list(booking_repository.stream_export(user=pro, status_filter=None))
+
+        # 6 rows (the duo booking has 2 rows) and the header, by chunks of 2 rows
+        assert len(chunks) == 3
+        content = b"".join(chunks)
+        assert content.startswith(codecs.BOM_UTF8)
+        assert content.decode("utf-8-sig") == booking_repository.get_export(user=pro, status_filter=None)
+        assert len(list(csv.reader(StringIO(content.decode("utf-8-sig")), delimiter=";"))) == 7
+
+    def test_stream_excel_export(self, monkeypatch):
+        monkeypatch.setattr(booking_repository, "EXPORT_FILE_CHUNK_SIZE", 1024)
+        pro = self._create_bookings(4)
+
+        chunks = list(
+            booking_repository.stream_export(user=pro, status_filter=None, export_type=BookingExportType.EXCEL)
+        )
+
+        assert len(chunks) > 1
+        sheet = openpyxl.load_workbook(BytesIO(b"".join(chunks))).active
+        assert [cell.value for cell in sheet[1]] == booking_repository.BOOKING_EXPORT_HEADER
+        assert sheet.max_row == 7
+
+
 class FindSoonToBeExpiredBookingsTest:
     def test_should_return_only_soon_to_be_expired_individual_bookings(self, app: fixture):
         # Given
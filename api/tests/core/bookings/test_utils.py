@@ -0,0 +1,28 @@
+import datetime
+import types
+from zoneinfo import ZoneInfo
+
+from pcapi.core.bookings import utils
+
+
+class GetBookingVenueDepartementCodeTest:
+    def test_use_venue_departement_code(self):
+        booking = types.SimpleNamespace(venueDepartmentCode="973", offererPostalCode="75002")
+
+        assert utils.get_booking_venue_departement_code(booking) == "973"
+
+    def test_fallback_on_offerer_postal_code(self):
+        booking = types.SimpleNamespace(venueDepartmentCode=None, offererPostalCode="97400")
+
+        assert utils.get_booking_venue_departement_code(booking) == "974"
+        assert utils.get_departement_tzinfo("974") == ZoneInfo("Indian/Reunion")
+
+    def test_same_conversion_as_convert_booking_dates_utc_to_venue_timezone(self):
+        booking = types.SimpleNamespace(venueDepartmentCode=None, offererPostalCode="75002")
+        booked_at = datetime.datetime(2020, 8, 13, 12, 0)
+
+        departement_code = utils.get_booking_venue_departement_code(booking)
+
+        converted = utils._apply_departement_timezone(booked_at, departement_code)
+        assert converted == utils.convert_booking_dates_utc_to_venue_timezone(booked_at, booking)
+        assert str(converted) == "2020-08-13 14:00:00+02:00"
@@ -9,6 +9,7 @@ import pcapi.connectors.serialization.cine_digital_service_serializers as cds_se
 import pcapi.core.bookings.factories as bookings_factories
 from pcapi.core.external_bookings.cds.client import CineDigitalServiceAPI
 import pcapi.core.external_bookings.cds.exceptions as cds_exceptions
+from pcapi.core.testing import override_settings
 import pcapi.core.users.factories as users_factories
 
 
@@ -483,6 +484,29 @@ class CineDigitalServiceGetPCVoucherTypesTest:
         assert pc_voucher_types[1].id == 3
         assert pc_voucher_types[1].tariff.id == 4
 
+    @patch("pcapi.core.external_bookings.cds.client.get_resource")
+    def test_should_cache_voucher_types_of_cinema(self, mocked_get_resource):
+        mocked_get_resource.return_value = [
+            {"id": 2, "code": "PSCULTURE", "tariffid": {"id": 3, "price": 5, "active": True, "labeltariff": ""}},
+        ]
+
+        def build_client(cinema_id):
+            return CineDigitalServiceAPI(
+                cinema_id=cinema_id, account_id="accountid_test", cinema_api_token="token_test", api_url="apiUrl_test"
+            )
+
+        build_client("cinema_id_test").get_pc_voucher_types()
+        pc_voucher_types = build_client("cinema_id_test").get_pc_voucher_types()
+        assert [voucher_type.id for voucher_type in pc_voucher_types] == [2]
+        assert mocked_get_resource.call_count == 1
+
+        build_client("other_cinema_id").get_pc_voucher_types()
+        assert mocked_get_resource.call_count == 2
+
+        with override_settings(EXTERNAL_BOOKINGS_METADATA_CACHE_TTL=0):
+            build_client("cinema_id_test").get_pc_voucher_types()
+        assert mocked_get_resource.call_count == 3
+
 
 class CineDigitalServiceGetScreenTest:
     @patch("pcapi.core.external_bookings.cds.client.get_resource")
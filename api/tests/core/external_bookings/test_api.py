@@ -1,11 +1,16 @@
+from unittest.mock import patch
+
 import pytest
 
+from pcapi.core.external_bookings.api import EXTERNAL_BOOKINGS_FF
 from pcapi.core.external_bookings.api import _get_external_bookings_client_api
+from pcapi.core.external_bookings.api import disable_external_bookings
 from pcapi.core.external_bookings.api import get_active_cinema_venue_provider
 from pcapi.core.external_bookings.cds.client import CineDigitalServiceAPI
 import pcapi.core.providers.exceptions as providers_exceptions
 import pcapi.core.providers.factories as providers_factories
 from pcapi.core.providers.repository import get_provider_by_local_class
+from pcapi.models.feature import get_features_snapshot
 
 
 @pytest.mark.usefixtures("db_session")
@@ -70,6 +75,8 @@ class GetExternalBookingsClientApiTest:
         assert client_api.account_id == "test_account"
         assert client_api.api_url == "test_cds_url/vad/"
 
+        assert _get_external_bookings_client_api(venue_id) is client_api
+
     def test_should_raise_an_exception_if_no_cds_details_provided_when_required(self) -> None:
         # Given
         cds_provider = get_provider_by_local_class("CDSStocks")
@@ -87,3 +94,15 @@ class GetExternalBookingsClientApiTest:
 
         # Then
         assert str(e.value) == "No row was found when one was required"
+
+
+@pytest.mark.usefixtures("db_session")
+class DisableExternalBookingsTest:
+    @patch("pcapi.settings.FEATURE_FLAGS_CACHE_TTL", 60)
+    def test_disable_external_bookings(self):
+        assert not any(get_features_snapshot()[flag.name] for flag in EXTERNAL_BOOKINGS_FF)
+
+        disable_external_bookings()
+
+        # The snapshot of feature flags has been invalidated.
+        assert all(get_features_snapshot()[flag.name] for flag in EXTERNAL_BOOKINGS_FF)
@@ -11,6 +11,7 @@ from dateutil.relativedelta import relativedelta
 import freezegun
 import pytest
 import pytz
+import sqlalchemy as sqla
 
 import pcapi.core.bookings.api as bookings_api
 import pcapi.core.bookings.factories as bookings_factories
@@ -448,6 +449,95 @@ class PriceEventsTest:
             api.price_events(min_date=self.few_minutes_ago)
 
 
+class PriceEventsOfPricingPointTest:
+    def _make_event(self, pricing_point, amount):
+        return factories.UsedBookingFinanceEventFactory(
+            booking__amount=amount,
+            booking__stock__offer__venue__pricing_point=pricing_point,
+        )
+
+    def test_basics(self):
+        pricing_point = offerers_factories.VenueFactory()
+        event1 = self._make_event(pricing_point, 10)
+        event2 = self._make_event(pricing_point, 20)
+
+        priced_count = api.price_events_of_pricing_point(pricing_point.id, [event1, event2])
+
+        assert priced_count == 2
+        pricing1 = models.Pricing.query.filter_by(eventId=event1.id).one()
+        pricing2 = models.Pricing.query.filter_by(eventId=event2.id).one()
+        assert pricing1.revenue == 1000
+        assert pricing2.revenue == 3000
+        assert event1.status == models.FinanceEventStatus.PRICED
+        assert event2.status == models.FinanceEventStatus.PRICED
+
+    def test_commit_and_release_lock_every_few_events(self):
+        pricing_point = offerers_factories.VenueFactory()
+        events = [self._make_event(pricing_point, 10) for _ in range(3)]
+
+        with mock.patch("pcapi.core.finance.api.lock_pricing_point") as mocked_lock:
+            priced_count = api.price_events_of_pricing_point(pricing_point.id, events, commit_size=2)
+
+        assert priced_count == 3
+        assert mocked_lock.call_count == 2
+        assert models.Pricing.query.count() == 3
+
+    def test_do_not_count_existing_pricings(self):
+        pricing_point = offerers_factories.VenueFactory()
+        event1 = self._make_event(pricing_point, 10)
+        event2 = self._make_event(pricing_point, 20)
+        api.price_event(event1)
+        # Simulate an inconsistent event that already has a pricing.
+        event1.status = models.FinanceEventStatus.READY
+        db.session.commit()
+
+        priced_count = api.price_events_of_pricing_point(pricing_point.id, [event1, event2])
+
+        assert priced_count == 1
+        assert models.Pricing.query.count() == 2
+
+    def test_stop_at_first_error(self):
+        pricing_point = offerers_factories.VenueFactory()
+        event1 = self._make_event(pricing_point, 10)
+        event2 = self._make_event(pricing_point, 20)
+        event3 = self._make_event(pricing_point, 30)
+        original_price_event = api._price_event
+
+        def _price_event(event):
+            if event.id == event2.id:
+                raise ValueError()
+            return original_price_event(event)
+
+        with mock.patch("pcapi.core.finance.api._price_event", _price_event):
+            with pytest.raises(ValueError):
+                api.price_events_of_pricing_point(pricing_point.id, [event1, event2, event3])
+
+        assert models.Pricing.query.one().eventId == event1.id
+        assert event2.status == models.FinanceEventStatus.READY
+        assert event3.status == models.FinanceEventStatus.READY
+
+
+class PriceEventsInParallelTest:
+    few_minutes_ago = datetime.datetime.utcnow() - datetime.timedelta(minutes=5)
+
+    def test_single_partition(self):
+        event_ids = [
+            factories.UsedBookingFinanceEventFactory(
+                booking__dateUsed=self.few_minutes_ago,
+                booking__stock__offer__venue__pricing_point="self",
+            ).id
+            for _ in range(3)
+        ]
+
+        # With a single worker, events are priced in the current process.
+        api.price_events_in_parallel(worker_count=1, min_date=self.few_minutes_ago, batch_size=2)
+
+        for event_id in event_ids:
+            event = models.FinanceEvent.query.get(event_id)
+            assert event.status == models.FinanceEventStatus.PRICED
+            assert len(event.pricings) == 1
+
+
 class AddEventTest:
     def test_used(self):
         motive = models.FinanceEventMotive.BOOKING_USED
@@ -885,6 +975,92 @@ class GetRevenuePeriodTest:
         assert period == (start, end)
 
 
+class PricingPointRevenueTest:
+    def _get_revenue(self, pricing_point, year):
+        return (
+            models.PricingPointRevenue.query.filter_by(pricingPointId=pricing_point.id, year=year)
+            .with_entities(models.PricingPointRevenue.revenue)
+            .scalar()
+        )
+
+    def test_updated_when_pricing_is_created_or_cancelled(self):
+        pricing_point = offerers_factories.VenueFactory()
+        event1 = factories.UsedBookingFinanceEventFactory(
+            booking__amount=10,
+            booking__quantity=2,
+            booking__stock__offer__venue__pricing_point=pricing_point,
+        )
+        event2 = factories.UsedBookingFinanceEventFactory(
+            booking__amount=5,
+            booking__stock__offer__venue__pricing_point=pricing_point,
+        )
+        year = api._get_revenue_year(event1.valueDate)
+
+        api.price_event(event1)
+        api.price_event(event2)
+        assert self._get_revenue(pricing_point, year) == 2500
+
+        api.cancel_latest_event(event2.booking)
+        assert self._get_revenue(pricing_point, year) == 2000
+
+        bookings_models.Booking.query.filter_by(id=event1.bookingId).update({"amount": 12})
+        assert self._get_revenue(pricing_point, year) == 2400
+
+    def test_collective_bookings_and_other_years_are_excluded(self):
+        pricing = factories.PricingFactory(
+            booking__amount=10,
+            valueDate=datetime.datetime(2022, 12, 31, 23, 30),  # 2023 in CET
+        )
+        factories.CollectivePricingFactory(pricingPoint=pricing.pricingPoint, valueDate=pricing.valueDate)
+        factories.PricingFactory(
+            status=models.PricingStatus.REJECTED,
+            pricingPoint=pricing.pricingPoint,
+            valueDate=pricing.valueDate,
+        )
+
+        assert self._get_revenue(pricing.pricingPoint, 2022) is None
+        assert self._get_revenue(pricing.pricingPoint, 2023) == 1000
+
+    @override_features(ENABLE_PRICING_POINT_REVENUE_TABLE=True)
+    def test_get_current_revenue(self):
+        pricing_point = offerers_factories.VenueFactory()
+        event = factories.UsedBookingFinanceEventFactory(
+            booking__amount=10,
+            booking__stock__offer__venue__pricing_point=pricing_point,
+        )
+        assert api._get_current_revenue(event) == 0
+
+        factories.PricingFactory(booking__amount=20, pricingPoint=pricing_point, valueDate=event.valueDate)
+        assert api._get_current_revenue(event) == 2000
+
+        pricing = api.price_event(event)
+        assert pricing.revenue == 3000
+
+    def test_check_and_backfill(self):
+        pricing1 = factories.PricingFactory(booking__amount=10)
+        pricing2 = factories.PricingFactory(booking__amount=20)
+        year = api._get_revenue_year(pricing1.valueDate)
+        assert api.get_pricing_point_revenue_discrepancies() == []
+
+        models.PricingPointRevenue.query.delete()
+        db.session.add(models.PricingPointRevenue(pricingPointId=pricing2.pricingPointId, year=year - 1, revenue=500))
+        db.session.flush()
+        assert api.get_pricing_point_revenue_discrepancies() == [
+            (pricing1.pricingPointId, year, 0, 1000),
+            (pricing2.pricingPointId, year - 1, 500, 0),
+            (pricing2.pricingPointId, year, 0, 2000),
+        ]
+        assert api.get_pricing_point_revenue_discrepancies([pricing1.pricingPointId]) == [
+            (pricing1.pricingPointId, year, 0, 1000),
+        ]
+
+        assert api.backfill_pricing_point_revenues(batch_size=1) == 2
+        assert self._get_revenue(pricing1.pricingPoint, year) == 1000
+        assert self._get_revenue(pricing2.pricingPoint, year) == 2000
+        assert self._get_revenue(pricing2.pricingPoint, year - 1) is None
+        assert api.get_pricing_point_revenue_discrepancies() == []
+
+
 def test_get_next_cashflow_batch_label():
     label = api._get_next_cashflow_batch_label()
     assert label == "VIR1"
@@ -2499,6 +2675,168 @@ class GenerateInvoicesTest:
         invoiced_bookings = {inv.cashflows[0].pricings[0].booking for inv in invoices}
         assert invoiced_bookings == {booking1, booking2}
 
+    # Mock slow functions that we are not interested in.
+    @mock.patch("pcapi.core.finance.api._generate_invoice_html")
+    @mock.patch("pcapi.core.finance.api._store_invoice_pdf")
+    @mock.patch("pcapi.utils.pdf.use_shared_cache")
+    @clean_temporary_files
+    @override_features(WIP_ENABLE_NEW_BANK_DETAILS_JOURNEY=True)
+    def test_partition(self, mocked_use_shared_cache, _mocked1, _mocked2, tmp_path):
+        for _ in range(2):
+            finance_event = factories.UsedBookingFinanceEventFactory(booking__stock=individual_stock_factory())
+            bank_account = factories.BankAccountFactory()
+            offerers_factories.VenueBankAccountLinkFactory(venue=finance_event.booking.venue, bankAccount=bank_account)
+            api.price_event(finance_event)
+        batch = api.generate_cashflows_and_payment_files(datetime.datetime.utcnow())
+        invoice_ids = api._generate_invoices_in_bulk(api._get_cashflows_by_bank_accounts(batch))
+        counts = [0] * 4
+
+        # Workers are forked processes: call their target directly.
+        api._store_and_send_invoices_partition(invoice_ids, tmp_path, counts, partition_index=1)
+
+        mocked_use_shared_cache.assert_called_once_with(tmp_path)
+        assert counts == [0, 0, 2, 0]
+
+
+class GenerateInvoicesInBulkTest:
+    def _get_rows(self):
+        return (
+            db.session.query(
+                models.Cashflow.bankAccountId.label("bank_account_id"),
+                sqla.func.array_agg(models.Cashflow.id).label("cashflow_ids"),
+            )
+            .group_by(models.Cashflow.bankAccountId)
+            .order_by(models.Cashflow.bankAccountId)
+            .all()
+        )
+
+    @override_features(WIP_ENABLE_NEW_BANK_DETAILS_JOURNEY=True)
+    def test_many_rules_and_rates_two_cashflows(self, invoice_data):
+        bank_account, stocks, _venue = invoice_data
+        user = users_factories.RichBeneficiaryFactory()
+        finance_events = [
+            factories.UsedBookingFinanceEventFactory(booking__stock=stock, booking__user=user) for stock in stocks
+        ]
+        for finance_event in finance_events[:3]:
+            api.price_event(finance_event)
+        batch = api.generate_cashflows(cutoff=datetime.datetime.utcnow())
+        api.generate_payment_files(batch)  # mark cashflows as UNDER_REVIEW
+        for finance_event in finance_events[3:]:
+            api.price_event(finance_event)
+        batch = api.generate_cashflows(cutoff=datetime.datetime.utcnow())
+        api.generate_payment_files(batch)  # mark cashflows as UNDER_REVIEW
+
+        invoice_ids = api._generate_invoices_in_bulk(self._get_rows())
+
+        # Same invoice as in `GenerateInvoiceTest.test_many_rules_and_rates_two_cashflows()`
+        invoice = models.Invoice.query.get(invoice_ids[0])
+        assert len(invoice_ids) == 1
+        assert len(invoice.cashflows) == 2
+        assert invoice.bankAccount == bank_account
+        assert invoice.amount == -20_156_04
+        invoice_lines = sorted(invoice.lines, key=lambda k: (k.group["position"], -k.rate))
+        assert [
+            (line.group["label"], line.contributionAmount, line.reimbursedAmount, line.rate, line.label)
+            for line in invoice_lines
+        ] == [
+            ("Barème général", 0, -19_980 * 100, Decimal("1.0000"), "Réservations"),
+            ("Barème général", 406, -7724, Decimal("0.9500"), "Réservations"),
+            ("Barème livres", 0, -20 * 100, Decimal("1.0000"), "Réservations"),
+            ("Barème livres", 2 * 100, -38 * 100, Decimal("0.9500"), "Réservations"),
+            ("Barème non remboursé", 58 * 100, 0, Decimal("0.0000"), "Réservations"),
+            ("Barème dérogatoire", 100, -22 * 100, Decimal("0.9565"), "Réservations"),
+            ("Barème dérogatoire", 120, -1880, Decimal("0.9400"), "Réservations"),
+        ]
+
+    def _create_pricings_with_incident(self):
+        venue = offerers_factories.VenueFactory(pricing_point="self")
+        bank_account = factories.BankAccountFactory()
+        offerers_factories.VenueBankAccountLinkFactory(venue=venue, bankAccount=bank_account)
+        used_event = factories.UsedBookingFinanceEventFactory(booking__amount=20, booking__stock__offer__venue=venue)
+        api.price_event(used_event)
+
+        # Overpayment incident (2€) on a booking that has already been
+        # reimbursed: pricing lines of its reversal are positive.
+        incident_booking = bookings_factories.ReimbursedBookingFactory(
+            amount=12,
+            dateUsed=datetime.datetime.utcnow(),
+            stock__offer__venue=venue,
+        )
+        factories.PricingFactory(
+            booking=incident_booking,
+            event=factories.UsedBookingFinanceEventFactory(booking=incident_booking),
+            status=models.PricingStatus.INVOICED,
+            valueDate=datetime.datetime.utcnow(),
+        )
+        booking_finance_incident = factories.IndividualBookingFinanceIncidentFactory(
+            booking=incident_booking, newTotalAmount=1000
+        )
+        incident_events = api._create_finance_events_from_incident(
+            booking_finance_incident, datetime.datetime.utcnow(), commit=True
+        )
+        for event in incident_events:
+            api.price_event(event)
+        return bank_account
+
+    @override_features(WIP_ENABLE_NEW_BANK_DETAILS_JOURNEY=True)
+    def test_same_invoice_as_single_generation_with_incidents(self):
+        # The same pricings for two bank accounts: the invoice of the
+        # first one is generated on its own, the other one in bulk.
+        bank_account1 = self._create_pricings_with_incident()
+        bank_account2 = self._create_pricings_with_incident()
+        batch = api.generate_cashflows(datetime.datetime.utcnow())
+        api.generate_payment_files(batch)  # mark cashflows as UNDER_REVIEW
+        assert models.PricingLine.query.filter(models.PricingLine.amount > 0).count() > 0
+
+        cashflow_ids = [c.id for c in models.Cashflow.query.filter_by(bankAccountId=bank_account1.id)]
+        invoice1 = api._generate_invoice(bank_account_id=bank_account1.id, cashflow_ids=cashflow_ids)
+        rows = [row for row in self._get_rows() if row.bank_account_id == bank_account2.id]
+        invoice_ids = api._generate_invoices_in_bulk(rows)
+
+        assert len(invoice_ids) == 1
+        invoice2 = models.Invoice.query.get(invoice_ids[0])
+        get_lines = lambda invoice: sorted(
+            (line.group["label"], line.contributionAmount, line.reimbursedAmount, line.rate, line.label)
+            for line in invoice.lines
+        )
+        assert invoice2.amount == invoice1.amount
+        assert get_lines(invoice2) == get_lines(invoice1)
+        assert {pricing.status for cashflow in invoice2.cashflows for pricing in cashflow.pricings} == {
+            models.PricingStatus.INVOICED
+        }
+
+    @override_features(WIP_ENABLE_NEW_BANK_DETAILS_JOURNEY=True)
+    @freezegun.freeze_time(datetime.datetime(2022, 1, 15))
+    def test_many_bank_accounts(self):
+        bank_accounts = []
+        for _ in range(3):
+            finance_event = factories.UsedBookingFinanceEventFactory(booking__stock=individual_stock_factory())
+            bank_account = factories.BankAccountFactory()
+            offerers_factories.VenueBankAccountLinkFactory(venue=finance_event.booking.venue, bankAccount=bank_account)
+            api.price_event(finance_event)
+            bank_accounts.append(bank_account)
+        batch = api.generate_cashflows(datetime.datetime.utcnow())
+        api.generate_payment_files(batch)  # mark cashflows as UNDER_REVIEW
+
+        with mock.patch("pcapi.core.finance.api.INVOICE_GENERATION_CHUNK_SIZE", 2):
+            invoice_ids = api._generate_invoices_in_bulk(self._get_rows())
+
+        invoices = models.Invoice.query.filter(models.Invoice.id.in_(invoice_ids)).order_by(models.Invoice.id).all()
+        assert [invoice.bankAccount for invoice in invoices] == bank_accounts
+        assert [invoice.reference for invoice in invoices] == ["F220000001", "F220000002", "F220000003"]
+        for invoice in invoices:
+            assert len(invoice.cashflows) == 1
+            assert len(invoice.lines) == 1
+            assert invoice.amount == invoice.lines[0].reimbursedAmount
+        get_statuses = lambda model: {s for s, in model.query.with_entities(getattr(model, "status"))}
+        assert get_statuses(models.Cashflow) == {models.CashflowStatus.ACCEPTED}
+        assert get_statuses(models.Pricing) == {models.PricingStatus.INVOICED}
+        assert get_statuses(bookings_models.Booking) == {bookings_models.BookingStatus.REIMBURSED}
+
+        # Cashflows have been invoiced: nothing to do anymore.
+        assert api._generate_invoices_in_bulk(self._get_rows()) == []
+        assert models.Invoice.query.count() == 3
+
 
 class GenerateInvoiceTest:
     EXPECTED_NUM_QUERIES = (
@@ -0,0 +1,90 @@
+"""Tests of functions that fork worker processes.
+
+Workers open their own database connections: they cannot see the data
+of the transaction that `db_session` rolls back at the end of each test.
+Data is thus committed here, and the database is cleaned afterwards.
+"""
+
+import datetime
+from unittest import mock
+
+from pcapi.core.finance import api
+from pcapi.core.finance import factories
+from pcapi.core.finance import models
+import pcapi.core.offerers.factories as offerers_factories
+import pcapi.core.offers.factories as offers_factories
+from pcapi.core.testing import override_features
+
+from tests.conftest import clean_database
+
+
+class PriceEventsInParallelTest:
+    few_minutes_ago = datetime.datetime.utcnow() - datetime.timedelta(minutes=5)
+
+    @clean_database
+    def test_price_events_in_forked_workers(self):
+        event_ids = []
+        for _ in range(2):
+            pricing_point = offerers_factories.VenueFactory(pricing_point="self")
+            for _ in range(2):
+                event = factories.UsedBookingFinanceEventFactory(
+                    booking__dateUsed=self.few_minutes_ago,
+                    booking__stock__offer__venue=pricing_point,
+                )
+                event_ids.append(event.id)
+
+        api.price_events_in_parallel(worker_count=2, min_date=self.few_minutes_ago)
+
+        events = models.FinanceEvent.query.filter(models.FinanceEvent.id.in_(event_ids)).all()
+        assert len(events) == 4
+        for event in events:
+            assert event.status == models.FinanceEventStatus.PRICED
+            assert len(event.pricings) == 1
+
+
+class StoreAndSendInvoicesInParallelTest:
+    def _generate_invoices(self):
+        for _ in range(2):
+            venue = offerers_factories.VenueFactory(pricing_point="self")
+            bank_account = factories.BankAccountFactory()
+            offerers_factories.VenueBankAccountLinkFactory(venue=venue, bankAccount=bank_account)
+            finance_event = factories.UsedBookingFinanceEventFactory(
+                booking__stock=offers_factories.ThingStockFactory(offer__venue=venue)
+            )
+            api.price_event(finance_event)
+        batch = api.generate_cashflows_and_payment_files(datetime.datetime.utcnow())
+        return api._generate_invoices_in_bulk(api._get_cashflows_by_bank_accounts(batch))
+
+    # Mock slow functions that we are not interested in. Mocks are
+    # inherited by forked workers (but their calls are not reported
+    # to the parent process).
+    @mock.patch("pcapi.core.finance.api._generate_invoice_html")
+    @mock.patch("pcapi.core.finance.api._store_invoice_pdf")
+    @clean_database
+    @override_features(WIP_ENABLE_NEW_BANK_DETAILS_JOURNEY=True)
+    def test_store_invoices_in_forked_workers(self, _mocked1, _mocked2):
+        invoice_ids = self._generate_invoices()
+
+        counts = api._store_and_send_invoices_in_parallel(invoice_ids, worker_count=2)
+
+        assert counts == (2, 0)
+
+    @mock.patch("pcapi.core.finance.api._generate_invoice_html")
+    @mock.patch("pcapi.core.finance.api._store_invoice_pdf")
+    @clean_database
+    @override_features(WIP_ENABLE_NEW_BANK_DETAILS_JOURNEY=True)
+    def test_count_invoices_of_failed_workers_as_errored(self, _mocked1, _mocked2):
+        invoice_ids = self._generate_invoices()
+        original_store_and_send_invoice = api._store_and_send_invoice
+
+        def _store_and_send_invoice(invoice):
+            # Errors are not caught when running tests: the worker of
+            # the second partition fails.
+            if invoice.id == invoice_ids[1]:
+                raise ValueError()
+            original_store_and_send_invoice(invoice)
+
+        with mock.patch("pcapi.core.finance.api._store_and_send_invoice", _store_and_send_invoice):
+            counts = api._store_and_send_invoices_in_parallel(invoice_ids, worker_count=2)
+
+        assert counts == (1, 1)
@@ -6,6 +6,7 @@ import pcapi.core.offerers.factories as offerers_factories
 import pcapi.core.offerers.models as offerers_models
 import pcapi.core.offers.factories as offers_factories
 from pcapi.core.testing import override_settings
+from pcapi.models import db
 
 from tests.conftest import clean_database
 from tests.test_utils import run_command
@@ -112,6 +113,22 @@ def test_move_siret(app):
     assert dst_venue.siret == siret
 
 
+@clean_database
+def test_check_pricing_point_revenues(app):
+    pricing_point_id = finance_factories.PricingFactory(booking__amount=10).pricingPointId
+    finance_models.PricingPointRevenue.query.update({"revenue": 1})
+    db.session.commit()
+
+    result = run_command(app, "check_pricing_point_revenues")
+    assert "Found 1 inconsistent pricing point revenues" in result.stdout
+
+    result = run_command(app, "check_pricing_point_revenues", "--pricing-point-id", pricing_point_id, "--fix")
+    assert "Rebuilt revenue of 1 pricing points" in result.stdout
+
+    revenue = finance_models.PricingPointRevenue.query.filter_by(pricingPointId=pricing_point_id).one()
+    assert revenue.revenue == 1000
+
+
 @override_settings(SLACK_GENERATE_INVOICES_FINISHED_CHANNEL="channel")
 @clean_database
 def test_generate_invoices_internal_notification(app, css_font_http_request_mock):
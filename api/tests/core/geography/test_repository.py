@@ -4,6 +4,7 @@ import pytest
 
 from pcapi.core.geography import api
 from pcapi.core.geography import repository
+from pcapi.core.testing import assert_num_queries
 
 import tests
 
@@ -30,3 +31,24 @@ class GetIrisFromCoordinatesTest:
     def test_get_iris_from_coordinates_not_found(self):
         result = repository.get_iris_from_coordinates(lon=0, lat=0)
         assert result is None
+
+    def test_get_iris_from_coordinates_many(self):
+        saint_barthelemy = (-62.834786, 17.900710)
+        miquelon = (-56.33341471630671, 47.03589297809895)
+        nowhere = (0, 0)
+
+        result = repository.get_iris_from_coordinates_many([saint_barthelemy, miquelon, nowhere])
+
+        assert {coords: iris.code if iris else None for coords, iris in result.items()} == {
+            saint_barthelemy: "977010102",
+            miquelon: "975010000",
+            nowhere: None,
+        }
+
+    def test_get_iris_from_coordinates_uses_cache(self):
+        repository.clear_iris_cache()
+        repository.get_iris_from_coordinates(lat=17.900710, lon=-62.834786)
+
+        with assert_num_queries(1):  # only load IRIS
+            result = repository.get_iris_from_coordinates(lat=17.9007101, lon=-62.8347859)
+        assert result.code == "977010102"
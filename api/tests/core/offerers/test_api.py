@@ -763,6 +763,35 @@ class ApiKeyTest:
         assert not offerers_api.find_api_key("idonotexist")
         assert not offerers_api.find_api_key("development_prefix_value")
 
+    def test_verified_key_is_cached(self):
+        offerer = offerers_factories.OffererFactory()
+        generated_key = offerers_api.generate_and_save_api_key(offerer.id)
+        offerers_api.find_api_key(generated_key)
+
+        with patch("pcapi.core.offerers.models.ApiKey.check_secret") as check_secret:
+            found_api_key = offerers_api.find_api_key(generated_key)
+
+        assert found_api_key.offerer == offerer
+        check_secret.assert_not_called()
+
+    def test_wrong_secret_is_not_cached(self):
+        offerer = offerers_factories.OffererFactory()
+        generated_key = offerers_api.generate_and_save_api_key(offerer.id)
+        offerers_api.find_api_key(generated_key)
+
+        assert not offerers_api.find_api_key(generated_key + "0")
+        assert not offerers_api.find_api_key(generated_key[:-1] + "z")
+
+    def test_deleted_key_is_not_found_anymore(self):
+        user_offerer = offerers_factories.UserOffererFactory()
+        generated_key = offerers_api.generate_and_save_api_key(user_offerer.offererId)
+        assert offerers_api.find_api_key(generated_key)
+
+        prefix = generated_key.rsplit("_", 1)[0]
+        offerers_api.delete_api_key_by_user(user_offerer.user, prefix)
+
+        assert not offerers_api.find_api_key(generated_key)
+
 
 class CreateOffererTest:
     def test_create_new_offerer_with_validation_token_if_siren_is_not_already_registered(self):
@@ -32,6 +32,7 @@ from pcapi.core.offers import exceptions
 from pcapi.core.offers import factories
 from pcapi.core.offers import models
 from pcapi.core.offers import repository as offers_repository
+from pcapi.core.offers import validation_rules
 from pcapi.core.offers.exceptions import NotUpdateProductOrOffers
 from pcapi.core.offers.exceptions import ProductNotFound
 import pcapi.core.providers.factories as providers_factories
@@ -1884,6 +1885,44 @@ class ResolveOfferValidationRuleTest:
 
         assert api.set_offer_status_based_on_fraud_criteria(collective_offer) == expected_status
 
+    def test_offers_validation_in_batch(self):
+        offer_to_approve = factories.OfferFactory(name="Livre")
+        offer_to_flag = factories.OfferFactory(name="Livre suspicious")
+        collective_offer_to_flag = educational_factories.CollectiveOfferFactory(name="Sortie")
+        name_rule = factories.OfferValidationSubRuleFactory().validationRule
+        collective_rule = factories.OfferValidationSubRuleFactory(
+            model=None,
+            attribute=models.OfferValidationAttribute.CLASS_NAME,
+            operator=models.OfferValidationRuleOperator.EQUALS,
+            comparated={"comparated": "CollectiveOffer"},
+        ).validationRule
+
+        statuses = api.set_offers_status_based_on_fraud_criteria(
+            [offer_to_approve, offer_to_flag, collective_offer_to_flag]
+        )
+
+        assert statuses == [
+            models.OfferValidationStatus.APPROVED,
+            models.OfferValidationStatus.PENDING,
+            models.OfferValidationStatus.PENDING,
+        ]
+        assert offer_to_flag.flaggingValidationRules == [name_rule]
+        assert collective_offer_to_flag.flaggingValidationRules == [collective_rule]
+
+    @override_settings(OFFER_VALIDATION_RULES_CACHE_TTL=60)
+    def test_compiled_rules_are_cached_until_invalidated(self):
+        offer = factories.OfferFactory(name="Livre verboten")
+        sub_rule = factories.OfferValidationSubRuleFactory()
+
+        assert api.set_offer_status_based_on_fraud_criteria(offer) == models.OfferValidationStatus.PENDING
+
+        sub_rule.validationRule.isActive = False
+        db.session.flush()
+        assert api.set_offer_status_based_on_fraud_criteria(offer) == models.OfferValidationStatus.PENDING
+
+        validation_rules.invalidate_offer_validation_rules_cache()
+        assert api.set_offer_status_based_on_fraud_criteria(offer) == models.OfferValidationStatus.APPROVED
+
 
 @freeze_time("2020-01-05 10:00:00")
 @pytest.mark.usefixtures("db_session")
@@ -2098,6 +2137,82 @@ class DeleteStocksTest:
         assert stock_3.isSoftDeleted
 
 
+@pytest.mark.usefixtures("db_session")
+class BatchUpsertStocksTest:
+    def test_create_and_update_stocks(self):
+        provider = providers_factories.ProviderFactory()
+        new_offer = factories.ThingOfferFactory(lastProvider=provider)
+        updated_offer = factories.ThingOfferFactory(lastProvider=provider)
+        stock = factories.ThingStockFactory(offer=updated_offer, price=10, quantity=10)
+        bookings_factories.BookingFactory(stock=stock, quantity=2)
+        unchanged_offer = factories.ThingOfferFactory(lastProvider=provider)
+        factories.ThingStockFactory(offer=unchanged_offer, price=5, quantity=None, bookingLimitDatetime=None)
+        booking_limit_datetime = datetime.utcnow().replace(microsecond=0) + timedelta(days=3)
+
+        with patch("pcapi.core.search.async_index_offer_ids") as async_index_offer_ids:
+            errors = api.batch_upsert_stocks(
+                [new_offer, updated_offer, unchanged_offer],
+                {
+                    new_offer.id: api.StockUpsert(decimal.Decimal("12.34"), 3, booking_limit_datetime),
+                    updated_offer.id: api.StockUpsert(decimal.Decimal("5.5"), 5, None),
+                    unchanged_offer.id: api.StockUpsert(decimal.Decimal("5"), None, None),
+                },
+                provider,
+            )
+
+        assert errors == {}
+        created_stock = models.Stock.query.filter_by(offerId=new_offer.id).one()
+        assert created_stock.price == decimal.Decimal("12.34")
+        assert created_stock.quantity == 3
+        assert created_stock.bookingLimitDatetime == booking_limit_datetime
+        assert stock.price == decimal.Decimal("5.5")
+        assert stock.quantity == 7  # 5 available + 2 booked
+        assert stock.bookingLimitDatetime is None
+        assert set(async_index_offer_ids.call_args.args[0]) == {new_offer.id, updated_offer.id}
+
+    def test_return_errors_by_offer(self):
+        provider = providers_factories.ProviderFactory()
+        rejected_offer = factories.ThingOfferFactory(
+            lastProvider=provider, validation=models.OfferValidationStatus.REJECTED
+        )
+        rejected_stock = factories.ThingStockFactory(offer=rejected_offer, price=10, quantity=10)
+        expensive_offer = factories.ThingOfferFactory(lastProvider=provider)
+        valid_offer = factories.ThingOfferFactory(lastProvider=provider)
+
+        errors = api.batch_upsert_stocks(
+            [rejected_offer, expensive_offer, valid_offer],
+            {
+                rejected_offer.id: api.StockUpsert(decimal.Decimal("20"), 5, None),
+                expensive_offer.id: api.StockUpsert(decimal.Decimal("301"), 5, None),
+                valid_offer.id: api.StockUpsert(decimal.Decimal("20"), 5, None),
+            },
+            provider,
+        )
+
+        assert errors == {
+            rejected_offer.id: {"global": ["Les offres refusées ou en attente de validation ne sont pas modifiables"]},
+            expensive_offer.id: {"price300": ["Le prix d’une offre ne peut excéder 300 euros."]},
+        }
+        assert rejected_stock.price == 10
+        assert not models.Stock.query.filter_by(offerId=expensive_offer.id).all()
+        assert models.Stock.query.filter_by(offerId=valid_offer.id).one().price == 20
+
+    def test_custom_reimbursement_rule_prevents_price_change(self):
+        provider = providers_factories.ProviderFactory()
+        offer = factories.ThingOfferFactory(lastProvider=provider)
+        stock = factories.ThingStockFactory(offer=offer, price=10, quantity=10)
+        finance_factories.CustomReimbursementRuleFactory(offer=offer)
+
+        errors = api.batch_upsert_stocks(
+            [offer],
+            {offer.id: api.StockUpsert(decimal.Decimal("20"), 5, None)},
+            provider,
+        )
+
+        assert list(errors[offer.id]) == ["price"]
+        assert stock.price == 10
+
+
 class FormatExtraDataTest:
     def test_format_extra_data(self):
         extra_data = {
@@ -0,0 +1,123 @@
+import decimal
+
+import pytest
+
+from pcapi.core.categories import subcategories_v2 as subcategories
+from pcapi.core.offerers import factories as offerers_factories
+from pcapi.core.offers import factories
+from pcapi.core.offers import models
+from pcapi.core.offers import validation_rules
+
+
+Attribute = models.OfferValidationAttribute
+Model = models.OfferValidationModel
+Operator = models.OfferValidationRuleOperator
+
+
+def _create_offers():
+    library = offerers_factories.VenueFactory(
+        name="Librairie du Théâtre", description=None, managingOfferer__name="Éditions du Seuil"
+    )
+    cinema = offerers_factories.VenueFactory(
+        name="Cinéma Lumière", description="Salle d'art et essai", managingOfferer__name="Lumière SA"
+    )
+
+    # Max price is 10: the soft-deleted stock is ignored.
+    offer = factories.OfferFactory(
+        venue=library,
+        name="Sapristi, un bon d'achat",
+        description=None,
+        withdrawalDetails=None,
+        subcategoryId=subcategories.LIVRE_PAPIER.id,
+    )
+    factories.StockFactory(offer=offer, price=decimal.Decimal("10"))
+    factories.StockFactory(offer=offer, price=decimal.Decimal("100"), isSoftDeleted=True)
+
+    # No stock: max price is 0.
+    factories.OfferFactory(
+        venue=library,
+        name="Les complots de la théorie",
+        description="Un lot à gagner",
+        withdrawalDetails="À la caisse",
+        subcategoryId=subcategories.LIVRE_PAPIER.id,
+    )
+
+    # Only soft-deleted stocks: max price is 0.
+    offer = factories.OfferFactory(
+        venue=cinema,
+        name="Concert de rentrée",
+        description="",
+        withdrawalDetails="",
+        subcategoryId=subcategories.CONCERT.id,
+        extraData={"showType": "1500", "showSubType": "1501"},
+    )
+    factories.StockFactory(offer=offer, price=decimal.Decimal("50"), isSoftDeleted=True)
+
+    factories.OfferFactory(
+        venue=cinema,
+        name="Séance du soir",
+        description="Un film, un lot de popcorn",
+        subcategoryId=subcategories.SEANCE_CINE.id,
+    )
+
+
+@pytest.mark.usefixtures("db_session")
+@pytest.mark.parametrize(
+    "model, attribute, operator, comparated",
+    [
+        # NULL attributes: the negated operations are true in Python.
+        (Model.OFFER, Attribute.DESCRIPTION, Operator.EQUALS, None),
+        (Model.OFFER, Attribute.DESCRIPTION, Operator.EQUALS, "un lot a gagner"),
+        (Model.OFFER, Attribute.DESCRIPTION, Operator.NOT_EQUALS, "Un lot à gagner"),
+        (Model.OFFER, Attribute.DESCRIPTION, Operator.IN, ["un lot a gagner", ""]),
+        (Model.OFFER, Attribute.DESCRIPTION, Operator.NOT_IN, ["un lot a gagner"]),
+        (Model.OFFER, Attribute.WITHDRAWAL_DETAILS, Operator.NOT_IN, ["a la caisse"]),
+        (Model.OFFER, Attribute.WITHDRAWAL_DETAILS, Operator.NOT_EQUALS, ""),
+        # Strings are compared once lowercased and unaccented.
+        (Model.OFFER, Attribute.NAME, Operator.CONTAINS, ["THEORIE", "soir"]),
+        (Model.OFFER, Attribute.NAME, Operator.CONTAINS, ["lot"]),
+        (Model.OFFER, Attribute.DESCRIPTION, Operator.CONTAINS, ["lot"]),
+        (Model.OFFER, Attribute.NAME, Operator.CONTAINS_EXACTLY, ["bon", "lot"]),
+        (Model.OFFER, Attribute.NAME, Operator.CONTAINS_EXACTLY, ["sapristi"]),
+        (Model.OFFER, Attribute.DESCRIPTION, Operator.CONTAINS_EXACTLY, ["lot"]),
+        (Model.OFFER, Attribute.TEXT, Operator.CONTAINS_EXACTLY, ["lot", "rentree"]),
+        (Model.OFFER, Attribute.TEXT, Operator.CONTAINS_EXACTLY, ["none"]),
+        (Model.OFFER, Attribute.TEXT, Operator.CONTAINS, ["none"]),
+        # Max price of offers with no stock, or only soft-deleted ones.
+        (Model.OFFER, Attribute.MAX_PRICE, Operator.EQUALS, 0),
+        (Model.OFFER, Attribute.MAX_PRICE, Operator.GREATER_THAN, 5),
+        (Model.OFFER, Attribute.MAX_PRICE, Operator.GREATER_THAN_OR_EQUAL_TO, 10),
+        (Model.OFFER, Attribute.MAX_PRICE, Operator.LESS_THAN, 10),
+        (Model.OFFER, Attribute.MAX_PRICE, Operator.LESS_THAN_OR_EQUAL_TO, 0),
+        (Model.OFFER, Attribute.MAX_PRICE, Operator.NOT_EQUALS, 10),
+        (Model.OFFER, Attribute.SHOW_SUB_TYPE, Operator.EQUALS, "1501"),
+        (Model.OFFER, Attribute.SHOW_SUB_TYPE, Operator.NOT_IN, ["1501"]),
+        (Model.OFFER, Attribute.SUBCATEGORY_ID, Operator.IN, [subcategories.CONCERT.id]),
+        (Model.OFFER, Attribute.CATEGORY_ID, Operator.NOT_IN, ["LIVRE"]),
+        (Model.VENUE, Attribute.NAME, Operator.IN, ["cinema lumiere"]),
+        (Model.VENUE, Attribute.NAME, Operator.CONTAINS, ["theatre"]),
+        (Model.VENUE, Attribute.DESCRIPTION, Operator.NOT_EQUALS, "salle d'art et essai"),
+        (Model.VENUE, Attribute.DESCRIPTION, Operator.NOT_IN, ["salle d'art et essai"]),
+        (Model.OFFERER, Attribute.NAME, Operator.EQUALS, "editions du seuil"),
+        (Model.OFFERER, Attribute.NAME, Operator.NOT_IN, ["Éditions du Seuil"]),
+        (Model.OFFERER, Attribute.NAME, Operator.CONTAINS_EXACTLY, ["lumiere"]),
+        (None, Attribute.CLASS_NAME, Operator.IN, ["Offer"]),
+        (None, Attribute.CLASS_NAME, Operator.NOT_IN, ["Offer"]),
+        # Other models do not apply to individual offers.
+        (Model.COLLECTIVE_OFFER, Attribute.NAME, Operator.NOT_IN, ["anything"]),
+        (Model.COLLECTIVE_STOCK, Attribute.PRICE, Operator.GREATER_THAN, 0),
+    ],
+)
+def test_sql_filter_flags_same_offers_as_python_predicate(model, attribute, operator, comparated):
+    _create_offers()
+    sub_rule = models.OfferValidationSubRule(
+        model=model, attribute=attribute, operator=operator, comparated={"comparated": comparated}
+    )
+
+    predicate = validation_rules.compile_sub_rule(sub_rule)
+    flagged_in_python = {offer.id for offer in models.Offer.query.all() if predicate(offer)}
+    flagged_in_sql = {
+        offer.id for offer in models.Offer.query.filter(validation_rules.get_sub_rule_offer_filter(sub_rule))
+    }
+
+    assert flagged_in_sql == flagged_in_python
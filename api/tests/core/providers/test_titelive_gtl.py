@@ -1,6 +1,10 @@
 import pytest
 
 from pcapi.core.providers.titelive_gtl import get_gtl
+from pcapi.core.providers.titelive_gtl import get_gtl_ids
+from pcapi.core.providers.titelive_gtl import get_gtl_level
+from pcapi.core.providers.titelive_gtl import get_parent_gtl_id
+from pcapi.core.providers.titelive_gtl import get_parent_gtl_ids
 
 
 @pytest.mark.parametrize(
@@ -56,3 +60,25 @@ def test_get_gtl_not_found():
     non_existing_gtl_id = "03040202"
     gtl = get_gtl(non_existing_gtl_id)
     assert gtl is None
+
+
+def test_get_gtl_ids():
+    gtl_ids = get_gtl_ids()
+    assert gtl_ids == sorted(gtl_ids)
+    assert "01030102" in gtl_ids
+
+
+@pytest.mark.parametrize(
+    "gtl_id, level, parent_ids",
+    (
+        ("01000000", 1, []),
+        ("01030000", 2, ["01000000"]),
+        ("01030100", 3, ["01000000", "01030000"]),
+        ("01030102", 4, ["01000000", "01030000", "01030100"]),
+        ("1030102", 4, ["01000000", "01030000", "01030100"]),
+    ),
+)
+def test_get_parent_gtl_ids(gtl_id, level, parent_ids):
+    assert get_gtl_level(gtl_id) == level
+    assert get_parent_gtl_ids(gtl_id) == parent_ids
+    assert get_parent_gtl_id(gtl_id) == (parent_ids[-1] if parent_ids else None)
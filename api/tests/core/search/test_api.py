@@ -4,6 +4,7 @@ import random
 from unittest import mock
 
 import pytest
+import sqlalchemy as sa
 
 from pcapi.core import search
 from pcapi.core.bookings import factories as bookings_factories
@@ -18,6 +19,7 @@ from pcapi.core.testing import assert_no_duplicated_queries
 from pcapi.core.testing import assert_num_queries
 from pcapi.core.testing import override_features
 from pcapi.core.testing import override_settings
+from pcapi.models import db
 
 
 pytestmark = pytest.mark.usefixtures("db_session")
@@ -212,6 +214,59 @@ class ReindexOfferIdsTest:
         )
 
 
+class OfferLast30DaysBookingCountTest:
+    def _get_count(self, offer):
+        return (
+            offers_models.OfferLast30DaysBookingCount.query.filter_by(offerId=offer.id)
+            .with_entities(offers_models.OfferLast30DaysBookingCount.bookingCount)
+            .scalar()
+        )
+
+    def test_trigger_maintains_count(self):
+        offer = make_booked_offer()
+        # 3 non-cancelled statuses, 2 dates within the last 30 days
+        assert self._get_count(offer) == 6
+
+        booking = bookings_factories.BookingFactory(stock=offer.stocks[0])
+        assert self._get_count(offer) == 7
+
+        booking.status = bookings_models.BookingStatus.CANCELLED
+        db.session.flush()
+        assert self._get_count(offer) == 6
+
+        booking.status = bookings_models.BookingStatus.CONFIRMED
+        db.session.flush()
+        assert self._get_count(offer) == 7
+
+        old_booking = bookings_factories.BookingFactory(
+            stock=offer.stocks[0], dateCreated=datetime.datetime.utcnow() - datetime.timedelta(days=31)
+        )
+        old_booking.status = bookings_models.BookingStatus.CANCELLED
+        db.session.flush()
+        assert self._get_count(offer) == 7
+
+    def test_refresh(self):
+        offer = make_booked_offer()
+        other_offer = offers_factories.OfferFactory()
+        db.session.execute(sa.text('UPDATE offer_last_30_days_booking_count SET "bookingCount" = 100'))
+        db.session.add(offers_models.OfferLast30DaysBookingCount(offerId=other_offer.id, bookingCount=2))
+        db.session.flush()
+
+        search.refresh_offers_last_30_days_booking_count()
+
+        assert self._get_count(offer) == 6
+        assert self._get_count(other_offer) is None
+
+    @override_features(ALGOLIA_BOOKINGS_NUMBER_COMPUTATION=True, ENABLE_OFFER_BOOKING_COUNT_TABLE=True)
+    def test_index_reads_precomputed_count(self):
+        offer = make_booked_offer()
+        db.session.execute(sa.text('UPDATE offer_last_30_days_booking_count SET "bookingCount" = 42'))
+
+        search.reindex_offer_ids([offer.id])
+
+        assert search_testing.search_store["offers"][offer.id]["offer"]["last30DaysBookings"] == 42
+
+
 class ReindexVenueIdsTest:
     def test_index_new_venue(self):
         venue = offerers_factories.VenueFactory(isPermanent=True)
@@ -5,13 +5,14 @@ import freezegun
 import pytest
 import requests_mock
 
+from pcapi.core import search
 import pcapi.core.educational.factories as educational_factories
 import pcapi.core.offerers.factories as offerers_factories
 import pcapi.core.offers.factories as offers_factories
 from pcapi.core.search.backends import algolia
+from pcapi.core.testing import override_settings
 
-
-pytestmark = pytest.mark.usefixtures("db_session")
+from tests.conftest import clean_database
 
 
 def get_backend():
@@ -151,6 +152,103 @@ def test_index_offers(app):
     assert backend.check_offer_is_indexed(offer)
 
 
+@pytest.mark.usefixtures("db_session")
+class IndexOffersDigestTest:
+    def test_skip_unchanged_offers(self):
+        backend = get_backend()
+        offer = offers_factories.StockFactory().offer
+        with requests_mock.Mocker() as mock:
+            posted = mock.post("https://dummy-app-id.algolia.net/1/indexes/offers/batch", json={})
+            backend.index_offers([offer], {offer.id: 0})
+            assert posted.call_count == 1
+
+            backend.index_offers([offer], {offer.id: 0})
+            assert posted.call_count == 1
+
+    def test_partially_update_changed_offers(self):
+        backend = get_backend()
+        offer = offers_factories.StockFactory().offer
+        with requests_mock.Mocker() as mock:
+            posted = mock.post("https://dummy-app-id.algolia.net/1/indexes/offers/batch", json={})
+            backend.index_offers([offer], {offer.id: 0})
+
+            offer.venue.name = "New name"
+            backend.index_offers([offer], {offer.id: 0})
+
+            request = posted.last_request.json()["requests"][0]
+            assert request["action"] == "partialUpdateObjectNoCreate"
+            assert request["body"].keys() == {"objectID", "venue"}
+            assert request["body"]["venue"]["name"] == "New name"
+
+    def test_force_indexation(self):
+        backend = get_backend()
+        offer = offers_factories.StockFactory().offer
+        with requests_mock.Mocker() as mock:
+            posted = mock.post("https://dummy-app-id.algolia.net/1/indexes/offers/batch", json={})
+            backend.index_offers([offer], {offer.id: 0})
+            backend.index_offers([offer], {offer.id: 0}, force=True)
+
+            assert posted.call_count == 2
+            assert posted.last_request.json()["requests"][0]["action"] == "updateObject"
+
+    def test_offers_indexed_without_digest_are_saved(self, app):
+        backend = get_backend()
+        offer = offers_factories.StockFactory().offer
+        app.redis_client.hset("indexed_offers", str(offer.id), "")
+        with requests_mock.Mocker() as mock:
+            posted = mock.post("https://dummy-app-id.algolia.net/1/indexes/offers/batch", json={})
+            backend.index_offers([offer], {offer.id: 0})
+
+            assert posted.last_request.json()["requests"][0]["action"] == "updateObject"
+
+    def test_offers_with_other_attributes_are_saved(self, app):
+        backend = get_backend()
+        offer = offers_factories.StockFactory().offer
+        # Digests stored with a previous format, or for a document that
+        # had other attributes.
+        app.redis_client.hset("indexed_offers", str(offer.id), "_geoloc=abc,offer=def")
+        with requests_mock.Mocker() as mock:
+            posted = mock.post("https://dummy-app-id.algolia.net/1/indexes/offers/batch", json={})
+            backend.index_offers([offer], {offer.id: 0})
+
+            assert posted.last_request.json()["requests"][0]["action"] == "updateObject"
+
+    def test_unindexed_offers_are_saved(self):
+        backend = get_backend()
+        offer = offers_factories.StockFactory().offer
+        with requests_mock.Mocker() as mock:
+            posted = mock.post("https://dummy-app-id.algolia.net/1/indexes/offers/batch", json={})
+            backend.index_offers([offer], {offer.id: 0})
+            backend.unindex_offer_ids([offer.id])
+
+            offer.name = "New name"
+            backend.index_offers([offer], {offer.id: 0})
+
+            assert posted.last_request.json()["requests"][0]["action"] == "updateObject"
+
+
+class IndexOffersInQueueInParallelTest:
+    # Forked workers open their own database connections: they cannot
+    # see data of the transaction of the `db_session` fixture. Data is
+    # thus committed here, and the database is cleaned afterwards.
+    @clean_database
+    @override_settings(REDIS_OFFER_IDS_CHUNK_SIZE=2)
+    def test_index_all_offers_in_forked_workers(self, app):
+        backend = get_backend()
+        offer_ids = [offers_factories.StockFactory().offer.id for _ in range(6)]
+        backend.enqueue_offer_ids(offer_ids)
+
+        # The mock is inherited by forked workers (but its calls are
+        # not reported to the parent process). Redis is shared, though.
+        with requests_mock.Mocker() as mock:
+            mock.post("https://dummy-app-id.algolia.net/1/indexes/offers/batch", json={})
+            search.index_offers_in_queue_in_parallel(worker_count=2, stop_only_when_empty=True)
+
+        assert backend.count_offers_to_index_from_queue() == 0
+        for offer_id in offer_ids:
+            assert backend.check_offer_is_indexed(FakeOffer(id=offer_id))
+
+
 def test_unindex_offer_ids(app):
     backend = get_backend()
     app.redis_client.hset("indexed_offers", "1", "")
@@ -173,6 +271,7 @@ def test_unindex_all_offers(app):
     assert not backend.check_offer_is_indexed(FakeOffer(id=1))
 
 
+@pytest.mark.usefixtures("db_session")
 def test_index_venues(app):
     backend = get_backend()
     venue = offerers_factories.VenueFactory()
@@ -234,6 +333,7 @@ def test_unindex_all_collective_offers():
         assert posted.called
 
 
+@pytest.mark.usefixtures("db_session")
 def test_index_collective_offers_templates():
     backend = get_backend()
     collective_offer_template = educational_factories.CollectiveOfferTemplateFactory.build()
@@ -325,6 +425,26 @@ class ProcessingQueueTest:
         processing_queue = f"{queue}:processing:{timestamp}"
         assert redis.lrange(processing_queue, 0, -1) == ["3", "2", "1"]
 
+    @freezegun.freeze_time()
+    def test_worker_processing_queues_are_distinct(self):
+        backend = get_backend()
+        redis = backend.redis_client
+        queue = algolia.REDIS_OFFER_IDS_NAME
+        redis.lpush(queue, "1", "2", "3", "4")
+
+        try:
+            with backend.pop_offer_ids_from_queue(2, worker_id="1") as first_batch:
+                with backend.pop_offer_ids_from_queue(2, worker_id="2") as second_batch:
+                    raise self.CustomError()
+        except self.CustomError:
+            pass
+
+        assert first_batch == {1, 2}
+        assert second_batch == {3, 4}
+        timestamp = datetime.datetime.utcnow().timestamp()
+        assert redis.lrange(f"{queue}:processing:1:{timestamp}", 0, -1) == ["2", "1"]
+        assert redis.lrange(f"{queue}:processing:2:{timestamp}", 0, -1) == ["4", "3"]
+
     def test_clean_processing_queues(self):
         backend = get_backend()
         redis = backend.redis_client
@@ -347,6 +467,19 @@ class ProcessingQueueTest:
         assert redis.lrange(main_queue, 0, -1) == ["3", "2", "1"]
         assert redis.lrange(processing_too_recent, 0, -1) == ["6", "5", "4"]
 
+    def test_clean_worker_processing_queues(self):
+        backend = get_backend()
+        redis = backend.redis_client
+        main_queue = algolia.REDIS_OFFER_IDS_NAME
+        timestamp = (datetime.datetime.utcnow() - datetime.timedelta(hours=1)).timestamp()
+        redis.lpush(f"{main_queue}:processing:1:{timestamp}", "1", "2")
+        redis.lpush(f"{main_queue}:processing:2:{timestamp}", "3", "4")
+
+        backend.clean_processing_queues()
+
+        assert redis.keys() == [main_queue]
+        assert set(redis.lrange(main_queue, 0, -1)) == {"1", "2", "3", "4"}
+
 
 class RemoveDuplicatesFromVenueIndexationQueueTest:
     def test_on_non_empty_queue(self):
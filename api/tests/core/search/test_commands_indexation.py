@@ -10,7 +10,7 @@ import pcapi.core.educational.factories as educational_factories
 import pcapi.core.offerers.factories as offerers_factories
 from pcapi.core.offers import models as offers_models
 import pcapi.core.offers.factories as offers_factories
-from pcapi.core.providers.titelive_gtl import GTLS
+from pcapi.core.providers.titelive_gtl import get_gtl_ids
 import pcapi.core.search.testing as search_testing
 from pcapi.repository import repository
 
@@ -206,7 +206,7 @@ class StagingIndexationTest:
 
     def test_get_offers_with_gtl(self):
         stock_with_gtl = offers_factories.StockFactory.create_batch(
-            size=20, offer__isActive=True, offer__extraData={"gtl_id": random.choice(list(GTLS.keys()))}
+            size=20, offer__isActive=True, offer__extraData={"gtl_id": random.choice(get_gtl_ids())}
         )
         offers_factories.StockFactory.create_batch(size=20, offer__isActive=True)
 
@@ -228,7 +228,7 @@ class StagingIndexationTest:
                                 lambda gtl_id, gtl_id_prefix=gtl_id_prefix: gtl_id.startswith(
                                     str(gtl_id_prefix).zfill(2)
                                 ),
-                                GTLS.keys(),
+                                get_gtl_ids(),
                             )
                         )
                     )
@@ -1,6 +1,7 @@
 import re
 
-from pcapi.core.providers.titelive_gtl import GTLS
+from pcapi.core.providers.titelive_gtl import get_gtl
+from pcapi.core.providers.titelive_gtl import get_gtl_ids
 from pcapi.domain.book_types import book_types
 
 
@@ -14,7 +15,7 @@ class BookTypesTest:
         return child.startswith(parent.rstrip("0"))
 
     def test_book_types_are_included_in_gtls(self):
-        gtl_codes = set(GTLS.keys())
+        gtl_codes = set(get_gtl_ids())
         book_types_codes = {gtl.code for book_type in book_types for gtl in book_type.gtls}
         book_subtypes_codes = {
             gtl.code for book_type in book_types for book_subtype in book_type.children for gtl in book_subtype.gtls
@@ -30,7 +31,7 @@ class BookTypesTest:
         ]
         all_book_gtls = book_types_gtls + book_subtypes_gtls
 
-        assert all(gtl.label == GTLS[gtl.code]["label"] for gtl in all_book_gtls)
+        assert all(gtl.label == get_gtl(gtl.code)["label"] for gtl in all_book_gtls)
 
     def test_book_types_positions_are_consistent(self):
         assert list(range(1, len(book_types) + 1)) == sorted([book_type.position for book_type in book_types])
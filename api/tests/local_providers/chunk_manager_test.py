@@ -3,8 +3,13 @@ import pytest
 import pcapi.core.offerers.factories as offerers_factories
 import pcapi.core.offers.factories as offers_factories
 from pcapi.core.offers.models import Offer
+from pcapi.core.offers.models import Product
 from pcapi.core.offers.models import Stock
+from pcapi.core.testing import assert_num_queries
+from pcapi.local_providers.chunk_manager import get_existing_pc_obj
+from pcapi.local_providers.chunk_manager import prefetch_existing_pc_objs
 from pcapi.local_providers.chunk_manager import save_chunks
+from pcapi.local_providers.providable_info import ProvidableInfo
 from pcapi.models import db
 
 
@@ -98,3 +103,65 @@ def test_save_chunks_update_2_offers_and_1_stock_in_chunk():
     assert all(offer.isDuo for offer in offers)
     stock = Stock.query.one()
     assert stock.quantity == 2
+
+
+def test_prefetch_existing_pc_objs():
+    offer = offers_factories.OfferFactory(idAtProvider="offer-1")
+    stock1 = offers_factories.StockFactory(offer=offer, idAtProviders="stock-1")
+    stock2 = offers_factories.StockFactory(offer=offer, idAtProviders="stock-2")
+    providable_infos = [
+        ProvidableInfo(type=Offer, id_at_providers="offer-1"),
+        ProvidableInfo(type=Stock, id_at_providers="stock-1"),
+        ProvidableInfo(type=Stock, id_at_providers="stock-2"),
+        ProvidableInfo(type=Stock, id_at_providers="stock-3"),
+    ]
+
+    with assert_num_queries(2):  # one query per model type
+        prefetched = prefetch_existing_pc_objs(providable_infos)
+
+    assert prefetched == {
+        "offer-1|Offer": offer,
+        "stock-1|Stock": stock1,
+        "stock-2|Stock": stock2,
+        "stock-3|Stock": None,
+    }
+
+
+def test_prefetch_existing_pc_objs_leaves_out_ambiguous_keys():
+    offers_factories.OfferFactory(idAtProvider="offer-1")
+    offers_factories.OfferFactory(idAtProvider="offer-1")
+    providable_infos = [ProvidableInfo(type=Offer, id_at_providers="offer-1")]
+
+    prefetched = prefetch_existing_pc_objs(providable_infos)
+
+    assert prefetched == {}
+
+
+def test_get_existing_pc_obj_uses_prefetched_objects():
+    stock = offers_factories.StockFactory(idAtProviders="stock-1")
+    providable_info = ProvidableInfo(type=Stock, id_at_providers="stock-1")
+    prefetched = {"stock-1|Stock": stock, "stock-2|Stock": None}
+
+    with assert_num_queries(0):
+        assert get_existing_pc_obj(providable_info, {}, {}, prefetched) == stock
+        missing_info = ProvidableInfo(type=Stock, id_at_providers="stock-2")
+        assert get_existing_pc_obj(missing_info, {}, {}, prefetched) is None
+
+
+def test_save_chunks_with_copy_inserts_and_updates_products():
+    existing_product = offers_factories.ProductFactory(idAtProviders="1", name="Old name", extraData={"ean": "1"})
+    untouched_product = offers_factories.ProductFactory(idAtProviders="2", name="Untouched")
+    existing_product.name = "New\tname"
+    existing_product.extraData = {"ean": "1", "author": "Someone"}
+    new_product = offers_factories.ProductFactory.build(idAtProviders="3", name="New product", extraData={"ean": "3"})
+    chunk_to_insert = {"3|Product": new_product}
+    chunk_to_update = {"1|Product": existing_product, "2|Product": untouched_product}
+
+    save_chunks(chunk_to_insert, chunk_to_update, use_copy=True)
+
+    products = Product.query.order_by(Product.idAtProviders).all()
+    assert [product.name for product in products] == ["New\tname", "Untouched", "New product"]
+    assert products[0].extraData == {"ean": "1", "author": "Someone"}
+    assert products[2].id == new_product.id
+    assert products[2].extraData == {"ean": "3"}
+    assert products[2].isGcuCompatible
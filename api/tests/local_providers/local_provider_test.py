@@ -10,6 +10,7 @@ import pcapi.core.providers.factories as providers_factories
 import pcapi.core.providers.models as providers_models
 from pcapi.local_providers.local_provider import _upload_thumb
 from pcapi.local_providers.providable_info import ProvidableInfo
+from pcapi.models import db
 from pcapi.models.api_errors import ApiErrors
 from pcapi.repository import repository
 from pcapi.utils.human_ids import humanize
@@ -171,6 +172,55 @@ class UpdateObjectsTest:
         assert new_product.name == "New Product"
         assert new_product.subcategoryId == subcategories.LIVRE_PAPIER.id
 
+    @patch("pcapi.core.object_storage.store_public_object")
+    @patch("pcapi.core.search.async_index_offer_ids")
+    @patch("tests.local_providers.provider_test_utils.TestLocalProviderWithCopy.__next__")
+    def test_reindexes_and_creates_thumbs_when_saving_chunks_with_copy(
+        self, next_function, mock_async_index_offer_ids, mock_store_public_object
+    ):
+        provider = providers_factories.AllocineProviderFactory(localClass="TestLocalProviderWithCopy")
+        product = offers_factories.ThingProductFactory(
+            idAtProviders="product-1",
+            lastProvider=provider,
+            dateModifiedAtLastProvider=datetime(2000, 1, 1),
+            name="Old product name",
+        )
+        stock = offers_factories.StockFactory(
+            idAtProviders="stock-1",
+            lastProvider=provider,
+            dateModifiedAtLastProvider=datetime(2000, 1, 1),
+            quantity=1,
+        )
+        next_function.side_effect = [
+            [
+                ProvidableInfo(
+                    type=offers_models.Product,
+                    id_at_providers="product-1",
+                    date_modified_at_provider=datetime(2018, 1, 1),
+                )
+            ],
+            [
+                ProvidableInfo(
+                    type=offers_models.Stock,
+                    id_at_providers="stock-1",
+                    date_modified_at_provider=datetime(2018, 1, 1),
+                )
+            ],
+        ]
+        local_provider = provider_test_utils.TestLocalProviderWithCopy()
+
+        local_provider.updateObjects()
+
+        db.session.refresh(product)
+        db.session.refresh(stock)
+        assert product.name == "New Product"
+        assert product.thumbCount == 1
+        assert local_provider.createdThumbs == 1
+        mock_store_public_object.assert_called_once()
+        assert mock_store_public_object.call_args.kwargs["object_id"] == f"products/{humanize(product.id)}"
+        assert stock.quantity == 10
+        assert mock_async_index_offer_ids.call_args.args[0] == {stock.offerId}
+
 
 @pytest.mark.usefixtures("db_session")
 class CreateObjectTest:
@@ -266,8 +316,11 @@ class HandleThumbTest:
         )
         local_provider = provider_test_utils.TestLocalProviderWithThumb()
 
+        chunk_to_update = {}
+
         # When
-        local_provider._handle_thumb(product)
+        local_provider._handle_thumb(product, "chunk_key", chunk_to_update)
+        local_provider._collect_thumbs(chunk_to_update, wait=True)
         repository.save(product)
 
         # Then
@@ -275,6 +328,39 @@ class HandleThumbTest:
         assert local_provider.updatedThumbs == 0
         assert local_provider.createdThumbs == 1
         assert product.thumbCount == 1
+        assert chunk_to_update == {"chunk_key": product}
+
+    @patch("pcapi.core.object_storage.store_public_object")
+    def test_handle_thumb_waits_for_pending_thumb_of_same_object(self, mock_store_public_object):
+        provider = providers_factories.AllocineProviderFactory(localClass="TestLocalProviderWithThumb")
+        product = offers_factories.ThingProductFactory(lastProvider=provider)
+        local_provider = provider_test_utils.TestLocalProviderWithThumb()
+        chunk_to_update = {}
+
+        local_provider._handle_thumb(product, "chunk_key", chunk_to_update)
+        local_provider._handle_thumb(product, "chunk_key", chunk_to_update)
+        local_provider._collect_thumbs(chunk_to_update, wait=True)
+
+        assert local_provider.createdThumbs == 2
+        assert product.thumbCount == 2
+        storage_ids = {call.kwargs["object_id"] for call in mock_store_public_object.call_args_list}
+        assert storage_ids == {f"products/{humanize(product.id)}", f"products/{humanize(product.id)}_1"}
+
+    @patch("pcapi.core.object_storage.store_public_object")
+    def test_handle_thumb_error(self, mock_store_public_object):
+        mock_store_public_object.side_effect = ValueError("storage is down")
+        provider = providers_factories.AllocineProviderFactory(localClass="TestLocalProviderWithThumb")
+        product = offers_factories.ThingProductFactory(lastProvider=provider)
+        local_provider = provider_test_utils.TestLocalProviderWithThumb()
+        chunk_to_update = {}
+
+        local_provider._handle_thumb(product, "chunk_key", chunk_to_update)
+        local_provider._collect_thumbs(chunk_to_update, wait=True)
+
+        assert local_provider.createdThumbs == 0
+        assert local_provider.erroredThumbs == 1
+        assert product.thumbCount == 0
+        assert chunk_to_update == {}
 
 
 @pytest.mark.usefixtures("db_session")
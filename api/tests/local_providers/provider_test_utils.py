@@ -1,6 +1,7 @@
 from pathlib import Path
 
 from pcapi.core.categories import subcategories_v2 as subcategories
+from pcapi.core.offers.models import Stock
 from pcapi.core.providers.models import VenueProvider
 from pcapi.local_providers.local_provider import LocalProvider
 from pcapi.models import Model
@@ -103,3 +104,14 @@ class TestLocalProviderWithThumbIndexAt4(LocalProvider):
 
     def __next__(self):
         pass
+
+
+class TestLocalProviderWithCopy(TestLocalProviderWithThumb):
+    name = "LocalProvider Test With Copy"
+    use_copy_to_save_chunks = True
+
+    def fill_object_attributes(self, pc_object: Model):
+        if isinstance(pc_object, Stock):
+            pc_object.quantity = 10
+        else:
+            super().fill_object_attributes(pc_object)
@@ -0,0 +1,57 @@
+import threading
+from unittest.mock import patch
+
+from pcapi.local_providers.thumb_pipeline import ThumbPipeline
+
+
+@patch("pcapi.connectors.thumb_storage.store_thumb")
+@patch("pcapi.connectors.thumb_storage.process_thumb", side_effect=lambda image, keep_ratio: image.upper())
+class ThumbPipelineTest:
+    def test_process_and_store_thumbs(self, mock_process_thumb, mock_store_thumb):
+        pipeline = ThumbPipeline(max_workers=2)
+
+        pipeline.submit("first", storage_id="products/A", image=b"first image")
+        pipeline.submit("second", storage_id="products/B", image=b"second image", keep_ratio=True)
+        results = pipeline.collect(wait=True)
+        pipeline.shutdown()
+
+        assert sorted(results) == [("first", None), ("second", None)]
+        assert sorted(call.args for call in mock_store_thumb.call_args_list) == [
+            ("products/A", b"FIRST IMAGE"),
+            ("products/B", b"SECOND IMAGE"),
+        ]
+        assert pipeline.collect() == []
+
+    def test_return_errors(self, mock_process_thumb, mock_store_thumb):
+        mock_store_thumb.side_effect = ValueError("storage is down")
+        pipeline = ThumbPipeline(max_workers=2)
+
+        pipeline.submit("first", storage_id="products/A", image=b"first image")
+        results = pipeline.collect(wait=True)
+        pipeline.shutdown()
+
+        assert len(results) == 1
+        context, error = results[0]
+        assert context == "first"
+        assert isinstance(error, ValueError)
+
+    def test_block_when_too_many_thumbs_are_pending(self, mock_process_thumb, mock_store_thumb):
+        release = threading.Event()
+        mock_store_thumb.side_effect = lambda storage_id, image: release.wait(5)
+        pipeline = ThumbPipeline(max_workers=1, max_pending=1)
+        pipeline.submit("first", storage_id="products/A", image=b"poster")
+
+        submitted = threading.Event()
+
+        def submit_second():
+            pipeline.submit("second", storage_id="products/B", image=b"poster")
+            submitted.set()
+
+        thread = threading.Thread(target=submit_second)
+        thread.start()
+        assert not submitted.wait(0.1)
+
+        release.set()
+        thread.join(5)
+        assert submitted.is_set()
+        pipeline.shutdown()
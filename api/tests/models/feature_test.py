@@ -9,7 +9,10 @@ from pcapi.models import db
 from pcapi.models.feature import FEATURES_DISABLED_BY_DEFAULT
 from pcapi.models.feature import Feature
 from pcapi.models.feature import FeatureToggle
+from pcapi.models.feature import get_features_snapshot
 from pcapi.models.feature import install_feature_flags
+from pcapi.models.feature import invalidate_features_cache
+from pcapi.models.feature import set_feature_flags
 from pcapi.repository import repository
 
 
@@ -73,6 +76,36 @@ class FeatureToggleTest:
             FeatureToggle.DISABLE_CGR_EXTERNAL_BOOKINGS.is_active()
             FeatureToggle.ALGOLIA_BOOKINGS_NUMBER_COMPUTATION.is_active()
 
+    @patch("pcapi.settings.FEATURE_FLAGS_CACHE_TTL", 60)
+    def test_is_active_uses_process_cache_outside_request_context(self, app):
+        context = flask._request_ctx_stack.pop()
+        try:
+            with assert_num_queries(1):
+                FeatureToggle.SYNCHRONIZE_ALLOCINE.is_active()
+                FeatureToggle.SYNCHRONIZE_ALLOCINE.is_active()
+                FeatureToggle.DISABLE_CGR_EXTERNAL_BOOKINGS.is_active()
+        finally:
+            flask._request_ctx_stack.push(context)
+
+    @patch("pcapi.settings.FEATURE_FLAGS_CACHE_TTL", 60)
+    def test_invalidate_features_cache(self):
+        assert FeatureToggle.SYNCHRONIZE_ALLOCINE.is_active()
+        Feature.query.filter_by(name=FeatureToggle.SYNCHRONIZE_ALLOCINE.name).update({"isActive": False})
+        assert get_features_snapshot()[FeatureToggle.SYNCHRONIZE_ALLOCINE.name]
+
+        invalidate_features_cache()
+
+        assert not get_features_snapshot()[FeatureToggle.SYNCHRONIZE_ALLOCINE.name]
+
+    @patch("pcapi.settings.FEATURE_FLAGS_CACHE_TTL", 60)
+    def test_set_feature_flags(self):
+        assert get_features_snapshot()[FeatureToggle.SYNCHRONIZE_ALLOCINE.name]
+
+        set_feature_flags({FeatureToggle.SYNCHRONIZE_ALLOCINE.name: False})
+
+        assert not Feature.query.filter_by(name=FeatureToggle.SYNCHRONIZE_ALLOCINE.name).one().isActive
+        assert not get_features_snapshot()[FeatureToggle.SYNCHRONIZE_ALLOCINE.name]
+
 
 @pytest.mark.usefixtures("db_session")
 class FeatureTest:
@@ -678,6 +678,66 @@ class GetDeleteOfferValidationRuleFormTest(GetEndpointHelper):
         )
 
 
+class GetRuleSimulationTest(GetEndpointHelper):
+    endpoint = "backoffice_web.offer_validation_rules.get_rule_simulation"
+    endpoint_kwargs = {"rule_id": 1}
+    needed_permission = perm_models.Permissions.PRO_FRAUD_ACTIONS
+
+    # session + current user + rule + offers
+    expected_num_queries = 4
+
+    def test_simulate_rule(self, authenticated_client):
+        offerer = offerers_factories.OffererFactory()
+        flagged_offer = offers_factories.OfferFactory(
+            name="Livre très suspicious", venue__managingOfferer=offerer, subcategoryId="LIVRE_PAPIER"
+        )
+        offers_factories.OfferFactory(name="Livre très suspicious", subcategoryId="LIVRE_PAPIER")
+        offers_factories.OfferFactory(name="Livre", venue__managingOfferer=offerer, subcategoryId="LIVRE_PAPIER")
+        offers_factories.OfferFactory(
+            name="Concert suspicious", venue__managingOfferer=offerer, subcategoryId="CONCERT"
+        )
+        rule = offers_factories.OfferValidationRuleFactory(name="Livres suspects", isActive=False)
+        offers_factories.OfferValidationSubRuleFactory(
+            validationRule=rule,
+            model=offers_models.OfferValidationModel.OFFER,
+            attribute=offers_models.OfferValidationAttribute.NAME,
+            operator=offers_models.OfferValidationRuleOperator.CONTAINS,
+            comparated={"comparated": ["SUSPICIOUS"]},
+        )
+        offers_factories.OfferValidationSubRuleFactory(
+            validationRule=rule,
+            model=offers_models.OfferValidationModel.OFFER,
+            attribute=offers_models.OfferValidationAttribute.CATEGORY_ID,
+            operator=offers_models.OfferValidationRuleOperator.IN,
+            comparated={"comparated": ["LIVRE"]},
+        )
+        offers_factories.OfferValidationSubRuleFactory(
+            validationRule=rule,
+            model=offers_models.OfferValidationModel.OFFERER,
+            attribute=offers_models.OfferValidationAttribute.ID,
+            operator=offers_models.OfferValidationRuleOperator.IN,
+            comparated={"comparated": [offerer.id]},
+        )
+
+        with assert_num_queries(self.expected_num_queries):
+            response = authenticated_client.get(url_for(self.endpoint, rule_id=rule.id))
+            assert response.status_code == 200
+
+        content = html_parser.content_as_text(response.data)
+        assert "1 offre individuelle existante serait signalée par cette règle." in content
+        rows = html_parser.extract_table_rows(response.data)
+        assert [row["ID"] for row in rows] == [str(flagged_offer.id)]
+
+    def test_simulate_rule_without_matching_offer(self, authenticated_client):
+        offers_factories.OfferFactory(name="Livre")
+        rule = offers_factories.OfferValidationSubRuleFactory().validationRule
+
+        response = authenticated_client.get(url_for(self.endpoint, rule_id=rule.id))
+
+        assert response.status_code == 200
+        assert "0 offre individuelle existante serait signalée" in html_parser.content_as_text(response.data)
+
+
 class DeleteOfferValidationRuleTest(PostEndpointHelper):
     endpoint = "backoffice_web.offer_validation_rules.delete_rule"
     endpoint_kwargs = {"rule_id": 1}
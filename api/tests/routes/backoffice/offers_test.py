@@ -28,8 +28,10 @@ from pcapi.core.permissions import factories as perm_factories
 from pcapi.core.permissions import models as perm_models
 from pcapi.core.testing import assert_num_queries
 from pcapi.core.users import factories as users_factories
+from pcapi.core.users import models as users_models
 from pcapi.models import db
 from pcapi.models.offer_mixin import OfferValidationType
+from pcapi.notifications.push import testing as push_testing
 from pcapi.routes.backoffice.filters import format_date
 
 from .helpers import button as button_helpers
@@ -1231,6 +1233,60 @@ class BatchOfferRejectTest(PostEndpointHelper):
             assert offer.validation is offers_models.OfferValidationStatus.REJECTED
             assert offer.lastValidationAuthor == legit_user
 
+    @patch("pcapi.core.bookings.api.update_external_pro")
+    def test_batch_reject_offers_with_many_bookings(self, mocked_update_external_pro, authenticated_client):
+        venue = offerers_factories.VenueFactory(bookingEmail="venue@example.com")
+        offers = offers_factories.OfferFactory.create_batch(
+            2, venue=venue, validation=offers_models.OfferValidationStatus.APPROVED
+        )
+        beneficiary = users_factories.BeneficiaryGrant18Factory()
+        bookings = [
+            bookings_factories.BookingFactory(user=beneficiary, stock__offer=offers[0]),
+            bookings_factories.BookingFactory(user=beneficiary, stock__offer=offers[1]),
+            bookings_factories.BookingFactory(stock__offer=offers[1]),
+        ]
+        parameter_ids = ",".join(str(offer.id) for offer in offers)
+
+        response = self.post_to_endpoint(authenticated_client, form={"object_ids": parameter_ids})
+
+        assert response.status_code == 303
+        for booking in bookings:
+            db.session.refresh(booking)
+            assert booking.status == BookingStatus.CANCELLED
+        cancellation_notifications = [
+            request for request in push_testing.requests if request.get("group_id") == "Cancel_booking"
+        ]
+        assert len(cancellation_notifications) == 1
+        assert sorted(cancellation_notifications[0]["user_ids"]) == sorted(booking.userId for booking in bookings)
+        # External data is updated once for each user and venue.
+        beneficiary_updates = [
+            request
+            for request in push_testing.requests
+            if request.get("user_id") == beneficiary.id and "attribute_values" in request
+        ]
+        assert len(beneficiary_updates) == 1
+        mocked_update_external_pro.assert_called_once_with("venue@example.com")
+
+    def test_batch_reject_offers_sends_emails_and_deletes_favorites(self, legit_user, authenticated_client):
+        venue = offerers_factories.VenueFactory(bookingEmail="venue@example.com")
+        offers = offers_factories.OfferFactory.create_batch(
+            2, venue=venue, validation=offers_models.OfferValidationStatus.APPROVED
+        )
+        already_rejected_offer = offers_factories.OfferFactory(
+            venue=venue, validation=offers_models.OfferValidationStatus.REJECTED
+        )
+        for offer in offers + [already_rejected_offer]:
+            users_factories.FavoriteFactory(offer=offer)
+        parameter_ids = ",".join(str(offer.id) for offer in offers + [already_rejected_offer])
+
+        response = self.post_to_endpoint(authenticated_client, form={"object_ids": parameter_ids})
+
+        assert response.status_code == 303
+        assert users_models.Favorite.query.count() == 0
+        assert len(mails_testing.outbox) == 2
+        assert {mail["To"] for mail in mails_testing.outbox} == {"venue@example.com"}
+        assert {mail["params"]["OFFER_NAME"] for mail in mails_testing.outbox} == {offer.name for offer in offers}
+
 
 class GetOfferDetailsTest(GetEndpointHelper):
     endpoint = "backoffice_web.offer.get_offer_details"
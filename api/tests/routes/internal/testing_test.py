@@ -1,9 +1,12 @@
+from unittest.mock import patch
+
 from flask import url_for
 import pytest
 
 from pcapi.core.testing import override_features
 from pcapi.core.testing import override_settings
 from pcapi.models.feature import Feature
+from pcapi.models.feature import get_features_snapshot
 
 
 pytestmark = pytest.mark.usefixtures("db_session")
@@ -11,7 +14,9 @@ pytestmark = pytest.mark.usefixtures("db_session")
 
 class FeaturesToggleTest:
     @override_features(ENABLE_NATIVE_APP_RECAPTCHA=False)
+    @patch("pcapi.settings.FEATURE_FLAGS_CACHE_TTL", 60)
     def test_set_features(self, client):
+        assert not get_features_snapshot()["ENABLE_NATIVE_APP_RECAPTCHA"]
         response = client.patch(
             "/testing/features",
             json={
@@ -27,6 +32,7 @@ class FeaturesToggleTest:
         assert response.status_code == 204
         feature = Feature.query.filter_by(name="ENABLE_NATIVE_APP_RECAPTCHA").one()
         assert feature.isActive
+        assert get_features_snapshot()["ENABLE_NATIVE_APP_RECAPTCHA"]
 
 
 def test_create_adage_jwt_fake_token(client):
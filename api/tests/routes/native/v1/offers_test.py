@@ -372,6 +372,57 @@ class OffersTest:
         assert stock.remainingQuantity == 0
         assert response.json["stocks"][0]["isSoldOut"]
 
+    def _create_cds_offer(self, show_id):
+        cds_provider = get_provider_by_local_class("CDSStocks")
+        venue_provider = providers_factories.VenueProviderFactory(provider=cds_provider)
+        cinema_provider_pivot = providers_factories.CinemaProviderPivotFactory(
+            venue=venue_provider.venue,
+            provider=venue_provider.provider,
+            idAtProvider=venue_provider.venueIdAtOfferProvider,
+        )
+        providers_factories.CDSCinemaDetailsFactory(cinemaProviderPivot=cinema_provider_pivot)
+        offer_id_at_provider = f"54%{venue_provider.venue.siret}"
+        offer = offers_factories.OfferFactory(
+            subcategoryId=subcategories.SEANCE_CINE.id,
+            idAtProvider=offer_id_at_provider,
+            lastProviderId=venue_provider.providerId,
+            venue=venue_provider.venue,
+        )
+        offers_factories.EventStockFactory(offer=offer, idAtProviders=f"{offer_id_at_provider}#{show_id}/2022-12-03")
+        return offer
+
+    @override_features(ENABLE_CDS_IMPLEMENTATION=True, ENABLE_CINEMA_STOCK_BACKGROUND_REFRESH=True)
+    @patch("pcapi.core.offers.api.external_bookings_api.get_shows_stock")
+    def test_get_cds_offer_refreshes_stale_stock_once(self, mocked_get_shows_stock, app, client):
+        mocked_get_shows_stock.return_value = {"5008": 10}
+        offer = self._create_cds_offer(show_id=5008)
+
+        response = client.get(f"/native/v1/offer/{offer.id}")
+        assert response.status_code == 200
+        response = client.get(f"/native/v1/offer/{offer.id}")
+        assert response.status_code == 200
+
+        mocked_get_shows_stock.assert_called_once_with(offer.venueId, [5008])
+        key = f"cinema_stock_refresh:offer:{offer.id}"
+        assert 0 < app.redis_client.ttl(key) <= settings.CDS_STOCK_REFRESH_MAX_AGE
+
+        # Once the last refresh is too old, the next view triggers a new refresh.
+        app.redis_client.delete(key)
+        client.get(f"/native/v1/offer/{offer.id}")
+        assert mocked_get_shows_stock.call_count == 2
+
+    @override_features(ENABLE_CDS_IMPLEMENTATION=True, ENABLE_CINEMA_STOCK_BACKGROUND_REFRESH=True)
+    @patch("pcapi.core.offers.api.external_bookings_api.get_shows_stock")
+    def test_get_cds_offer_does_not_wait_for_fresh_stock(self, mocked_get_shows_stock, app, client):
+        offer = self._create_cds_offer(show_id=5008)
+        app.redis_client.set(f"cinema_stock_refresh:offer:{offer.id}", "2023-01-01T00:00:00")
+
+        response = client.get(f"/native/v1/offer/{offer.id}")
+
+        assert response.status_code == 200
+        assert not response.json["stocks"][0]["isSoldOut"]
+        mocked_get_shows_stock.assert_not_called()
+
     @freeze_time("2023-01-01")
     @override_features(ENABLE_BOOST_API_INTEGRATION=True)
     @patch("pcapi.connectors.boost.requests.get")
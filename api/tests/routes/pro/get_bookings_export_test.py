@@ -0,0 +1,56 @@
+import csv
+from io import BytesIO
+from io import StringIO
+from unittest.mock import patch
+
+import openpyxl
+import pytest
+
+import pcapi.core.bookings.factories as bookings_factories
+import pcapi.core.offerers.factories as offerers_factories
+
+
+pytestmark = pytest.mark.usefixtures("db_session")
+
+PERIOD = "bookingPeriodBeginningDate=2000-01-01&bookingPeriodEndingDate=2100-01-01"
+
+
+class Returns200Test:
+    def test_get_bookings_csv(self, client):
+        user_offerer = offerers_factories.UserOffererFactory()
+        booking = bookings_factories.BookingFactory(
+            stock__offer__venue__managingOfferer=user_offerer.offerer, quantity=2
+        )
+
+        response = client.with_session_auth(user_offerer.user.email).get(f"/bookings/csv?{PERIOD}")
+
+        assert response.status_code == 200
+        assert response.headers["Content-Type"] == "text/csv; charset=utf-8;"
+        assert response.headers["Content-Disposition"] == "attachment; filename=reservations_pass_culture.csv"
+        reader = list(csv.DictReader(StringIO(response.data.decode("utf-8-sig")), delimiter=";"))
+        assert [row["Contremarque"] for row in reader] == [booking.token, booking.token]
+        assert reader[0]["Duo"] == "Oui"
+
+    def test_get_bookings_excel(self, client):
+        user_offerer = offerers_factories.UserOffererFactory()
+        booking = bookings_factories.BookingFactory(stock__offer__venue__managingOfferer=user_offerer.offerer)
+
+        response = client.with_session_auth(user_offerer.user.email).get(f"/bookings/excel?{PERIOD}")
+
+        assert response.status_code == 200
+        sheet = openpyxl.load_workbook(BytesIO(response.data)).active
+        assert sheet.cell(row=1, column=1).value == "Lieu"
+        assert sheet.cell(row=2, column=10).value == booking.token
+        assert sheet.max_row == 2
+
+
+class Returns500Test:
+    @patch("pcapi.core.bookings.repository._iter_csv_report", side_effect=Exception("query failed"))
+    def test_export_fails_before_sending_file(self, _iter_csv_report_mock, client):
+        user_offerer = offerers_factories.UserOffererFactory()
+        bookings_factories.BookingFactory(stock__offer__venue__managingOfferer=user_offerer.offerer)
+
+        response = client.with_session_auth(user_offerer.user.email).get(f"/bookings/csv?{PERIOD}")
+
+        assert response.status_code == 500
+        assert "Content-Disposition" not in response.headers
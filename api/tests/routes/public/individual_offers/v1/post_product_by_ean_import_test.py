@@ -0,0 +1,77 @@
+import decimal
+
+import pytest
+
+from pcapi.core.categories import subcategories_v2 as subcategories
+from pcapi.core.offerers import factories as offerers_factories
+from pcapi.core.offers import ean_imports
+from pcapi.core.offers import factories as offers_factories
+from pcapi.core.offers import models as offers_models
+from pcapi.core.providers import factories as providers_factories
+
+from . import utils
+
+
+@pytest.mark.usefixtures("db_session")
+class PostProductByEanImportTest:
+    def test_import_and_follow_progress(self, client):
+        venue, _ = utils.create_offerer_provider_linked_to_venue()
+        product = offers_factories.ProductFactory(
+            subcategoryId=subcategories.SUPPORT_PHYSIQUE_MUSIQUE_CD.id,
+            extraData={"ean": "1234567890123"},
+        )
+        unknown_ean = "1234567897123"
+
+        client = client.with_explicit_token(offerers_factories.DEFAULT_CLEAR_API_KEY)
+        response = client.post(
+            "/public/offers/v1/products/ean/imports",
+            json={
+                "location": {"type": "physical", "venueId": venue.id},
+                "products": [
+                    {"ean": product.extraData["ean"], "stock": {"price": 1234, "quantity": 3}},
+                    {"ean": unknown_ean, "stock": {"price": 1234, "quantity": 3}},
+                ],
+            },
+        )
+
+        assert response.status_code == 202
+        import_id = response.json["id"]
+
+        created_offer = offers_models.Offer.query.one()
+        assert created_offer.product == product
+        assert created_offer.venue == venue
+        assert created_offer.activeStocks[0].price == decimal.Decimal("12.34")
+        assert created_offer.activeStocks[0].quantity == 3
+
+        response = client.get(f"/public/offers/v1/products/ean/imports/{import_id}")
+
+        assert response.status_code == 200
+        assert response.json == {
+            "id": import_id,
+            "status": "done",
+            "total": 2,
+            "processed": 2,
+            "errors": [
+                {"ean": unknown_ean, "errors": {"ean": ["No product with this EAN can be sold on the pass Culture"]}}
+            ],
+        }
+
+    def test_returns_404_for_unknown_import(self, client):
+        utils.create_offerer_provider_linked_to_venue()
+
+        response = client.with_explicit_token(offerers_factories.DEFAULT_CLEAR_API_KEY).get(
+            "/public/offers/v1/products/ean/imports/unknown"
+        )
+
+        assert response.status_code == 404
+
+    def test_returns_404_for_import_of_another_provider(self, client):
+        venue, _ = utils.create_offerer_provider_linked_to_venue()
+        other_provider = providers_factories.ProviderFactory()
+        import_id = ean_imports.create_import(other_provider.id, venue.id, total=1)
+
+        response = client.with_explicit_token(offerers_factories.DEFAULT_CLEAR_API_KEY).get(
+            f"/public/offers/v1/products/ean/imports/{import_id}"
+        )
+
+        assert response.status_code == 404
@@ -1,6 +1,7 @@
 import pytest
 
 from pcapi.utils.custom_logic import OPERATIONS
+from pcapi.utils.custom_logic import compile_operation
 
 
 def test_soft_equal_return_true():
@@ -234,3 +235,23 @@ def test_not_in_with_none_as_argument_return_false():
     b = ["le", "dérèglement", "climatique", None]
     result = OPERATIONS["not in"](a, b)
     assert not result
+
+
+@pytest.mark.parametrize("operator", OPERATIONS)
+@pytest.mark.parametrize(
+    "a",
+    ["Été", "ete", "ete bien", "", None, 3, 3.0, ["A", "b"], [], "foo bar"],
+)
+@pytest.mark.parametrize(
+    "b",
+    [["ete", "FOO"], ["été bien"], [], "ete", 3, ["a"], None, [3, 10], ["foo"]],
+)
+def test_compiled_operation_behaves_like_operation(operator, a, b):
+    def apply(function):
+        try:
+            return function()
+        except Exception as exc:  # pylint: disable=broad-except
+            return type(exc)
+
+    expected = apply(lambda: OPERATIONS[operator](a, b))
+    assert apply(lambda: compile_operation(operator, b)(a)) == expected
@@ -59,3 +59,27 @@ class GeneratePdfFromHtmlTest:
         # the first run, but it often failed on CI, even though
         # debugging statements showed that the cache was used (and
         # thus that the second run should be faster).
+
+    def test_shared_cache(self, example_html, css_font_http_request_mock, tmp_path):
+        pdf.PdfRenderer(cache_dir=tmp_path).render(example_html)
+        cached_files = sorted(tmp_path.iterdir())
+        assert cached_files
+
+        # Another renderer (e.g. in another process) uses cached files.
+        with mock.patch("weasyprint.default_url_fetcher") as default_url_fetcher:
+            pdf.PdfRenderer(cache_dir=tmp_path).render(example_html)
+        default_url_fetcher.assert_not_called()
+        # The shared cache is not deleted with renderers.
+        assert sorted(tmp_path.iterdir()) == cached_files
+
+
+class ImageCacheTest:
+    def test_keep_most_recently_used_images(self):
+        cache = pdf.ImageCache(max_size=2)
+        cache["logo1.png"] = "image 1"
+        cache["logo2.png"] = "image 2"
+        assert cache["logo1.png"] == "image 1"
+
+        cache["logo3.png"] = "image 3"
+
+        assert list(cache) == ["logo1.png", "logo3.png"]
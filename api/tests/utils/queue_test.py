@@ -28,3 +28,52 @@ class PopFromQueueTest:
 
         third_item = queue.pop_from_queue("test:numbers")
         assert not third_item
+
+
+class PushManyTest:
+    def test_should_push_large_number_of_items(self, app):
+        queue.push_many("test:numbers", range(2500))
+
+        assert app.redis_client.llen("test:numbers") == 2500
+        assert app.redis_client.lrange("test:numbers", 0, 1) == ["0", "1"]
+
+
+class MoveItemsTest:
+    def test_should_move_items_like_rpoplpush(self, app):
+        app.redis_client.rpush("test:source", *range(10))
+        app.redis_client.rpush("test:destination", "x")
+
+        moved = queue.move_items("test:source", "test:destination", 4)
+
+        assert moved == ["6", "7", "8", "9"]
+        assert app.redis_client.lrange("test:source", 0, -1) == ["0", "1", "2", "3", "4", "5"]
+        assert app.redis_client.lrange("test:destination", 0, -1) == ["6", "7", "8", "9", "x"]
+
+    def test_should_move_all_items(self, app):
+        app.redis_client.rpush("test:source", *range(2500))
+
+        moved = queue.move_items("test:source", "test:destination", -1)
+
+        assert moved == [str(i) for i in range(2500)]
+        assert not app.redis_client.exists("test:source")
+        assert app.redis_client.lrange("test:destination", 0, -1) == moved
+
+    def test_should_return_nothing_on_empty_queue(self, app):
+        assert queue.move_items("test:source", "test:destination", 10) == []
+        assert not app.redis_client.exists("test:destination")
+
+
+class AcknowledgeTest:
+    def test_should_remove_given_items(self, app):
+        app.redis_client.rpush("test:processing", "1", "2", "3")
+
+        queue.acknowledge("test:processing", ["1", 3])
+
+        assert app.redis_client.lrange("test:processing", 0, -1) == ["2"]
+
+    def test_should_delete_processing_queue(self, app):
+        app.redis_client.rpush("test:processing", "1", "2", "3")
+
+        queue.acknowledge("test:processing")
+
+        assert not app.redis_client.exists("test:processing")
@@ -3,6 +3,7 @@ from unittest.mock import Mock
 import pytest
 from requests import RequestException
 
+from pcapi.utils import requests
 from pcapi.utils.requests import _wrapper
 
 
@@ -36,3 +37,23 @@ class RequestWrapperTest:
         # when
         with pytest.raises(RequestException):
             _wrapper(mocked_request_function, "GET", "https://example.net")
+
+
+class SharedSessionTest:
+    def test_share_session_by_name(self):
+        session = requests.get_shared_session("test")
+
+        assert requests.get_shared_session("test") is session
+        assert requests.get_shared_session("other") is not session
+
+    def test_record_request_duration_by_endpoint(self, requests_mock):
+        requests_mock.get("https://example.net/shows/123/seatmap", cookies={"session": "secret"})
+        histogram = requests.shared_session_request_duration
+        labels = {"session": "test", "method": "GET", "endpoint": "/shows/:id/seatmap"}
+        count_before = histogram.labels(**labels)._sum.get()  # pylint: disable=protected-access
+
+        response = requests.get("https://example.net/shows/123/seatmap?api_token=abc", shared_session="test")
+
+        assert response.status_code == 200
+        assert histogram.labels(**labels)._sum.get() > count_before  # pylint: disable=protected-access
+        assert not requests.get_shared_session("test").cookies